@@ -0,0 +1,582 @@
+"""
+Kommandozeilen-Werkzeuge für Wetterweiser, die außerhalb des Streamlit-Prozesses laufen.
+
+Aufruf:
+    python cli.py worker            # Live-Daten nach Zeitplan abrufen (Dauerbetrieb)
+    python cli.py worker --einmal   # genau einen Abruf durchführen (z. B. für System-Cron)
+    python cli.py worker --einmal --standorte "Gommern,Magdeburg"
+                                    # sofortiger Abruf für bestimmte Standorte
+    python cli.py backfill daten.csv --format dwd --standort Gommern
+                                    # historische CSV-Datei blockweise importieren
+    python cli.py partitionieren    # wetterdaten.json in Standort-Partitionen aufteilen
+    python cli.py verdichten        # alte Tageswerte zu Monats-/Jahreswerten verdichten (Archiv)
+    python cli.py verdichten --rueckgaengig [--ab-jahr 2015]
+                                    # archivierte Tageswerte wiederherstellen
+
+Konfiguration (secrets.toml):
+    [worker]
+    standorte = ["Gommern", "Magdeburg"]
+    zeitplan = "0 6,18 * * *"      # Minute Stunde Tag Monat Wochentag
+    jitter_sekunden = 300
+    max_versuche = 4
+    backoff_sekunden = 30
+
+    [aufbewahrung]
+    roh_jahre = 3                  # Tageswerte der letzten 3 Kalenderjahre bleiben im Bestand
+    monat_jahre = 10               # Monatswerte für 10 Jahre, ältere nur noch als Jahreswerte
+"""
+
+import argparse  # Kommandozeilen-Argumente
+import datetime  # Datum & Uhrzeit
+import json  # Laden der GitHub-Daten
+import logging  # Protokollierung statt Streamlit-Meldungen
+import random  # für Jitter
+import time  # Warten zwischen den Läufen
+
+import requests  # für HTTP- Anfragen
+import streamlit as st  # nur für st.secrets
+
+from main import (
+    CSV_FORMATE,
+    EINHEITEN,
+    MANIFEST_PATH,
+    MONAT_JAHRE,
+    ROH_JAHRE,
+    STUNDEN_MANIFEST_PFAD,
+    STUNDEN_PFAD,
+    VERDICHTET_PFAD,
+    PartitionCache,
+    StundenWerte,
+    WetterAnalyse,
+    archiv_pfad,
+    archiv_zusammenfuehren,
+    github_datei_laden,
+    github_konfliktfrei_schreiben,
+    owm_abrufen_mehrere,
+    owm_cache,
+    sonnenstunden_aus_owm,
+    tageswerte_uebernehmen,
+    verdichten,
+    verdichtung_als_json,
+    verdichtung_zusammenfuehren,
+)
+
+log = logging.getLogger("wetterweiser.worker")
+
+
+class CronZeitplan:
+    """
+    Minimaler Cron-Ausdruck mit fünf Feldern: Minute Stunde Tag Monat Wochentag.
+
+    Unterstützt "*", Listen ("6,18"), Bereiche ("1-5") und Schritte ("*/15").
+    Wochentag: 0 = Sonntag ... 6 = Samstag (wie bei cron, 7 ist ebenfalls Sonntag).
+    """
+
+    GRENZEN = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+    def __init__(self, ausdruck):
+        felder = ausdruck.split()
+        if len(felder) != 5:
+            raise ValueError(f"Cron-Ausdruck braucht 5 Felder: '{ausdruck}'")
+        (
+            self.minuten,
+            self.stunden,
+            self.tage,
+            self.monate,
+            wochentage,
+        ) = [self._feld(f, *g) for f, g in zip(felder, self.GRENZEN)]
+        self.wochentage = {w % 7 for w in wochentage}
+        # wie bei cron: sind Tag und Wochentag eingeschränkt, reicht einer der beiden
+        self.tag_frei = felder[2] == "*"
+        self.wochentag_frei = felder[4] == "*"
+
+    @staticmethod
+    def _feld(feld, minimum, maximum):
+        werte = set()
+        for teil in feld.split(","):
+            bereich, _, schritt = teil.partition("/")
+            if bereich == "*":
+                start, ende = minimum, maximum
+            elif "-" in bereich:
+                start, ende = (int(x) for x in bereich.split("-"))
+            else:
+                start = ende = int(bereich)
+                if schritt:
+                    ende = maximum
+            if start < minimum or ende > maximum:
+                raise ValueError(f"Wert außerhalb {minimum}-{maximum}: '{teil}'")
+            werte.update(range(start, ende + 1, int(schritt) if schritt else 1))
+        return werte
+
+    def _tag_passt(self, tag):
+        tag_ok = tag.day in self.tage
+        wochentag_ok = (tag.isoweekday() % 7) in self.wochentage
+        if self.tag_frei or self.wochentag_frei:
+            return tag_ok and wochentag_ok
+        return tag_ok or wochentag_ok
+
+    def naechster_termin(self, ab):
+        """
+        Gibt den nächsten Zeitpunkt (volle Minute) strikt nach `ab` zurück.
+        Nicht passende Tage und Stunden werden übersprungen statt minutenweise geprüft.
+        """
+        t = ab.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        grenze = t + datetime.timedelta(days=366 * 5)
+        while t < grenze:
+            if t.month not in self.monate or not self._tag_passt(t):
+                t = (t + datetime.timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if t.hour not in self.stunden:
+                t = (t + datetime.timedelta(hours=1)).replace(minute=0)
+                continue
+            if t.minute not in self.minuten:
+                t += datetime.timedelta(minutes=1)
+                continue
+            return t
+        raise ValueError("Cron-Ausdruck liefert keinen Termin")
+
+
+def mit_backoff(funktion, max_versuche, backoff_sekunden, beschreibung):
+    """
+    Führt `funktion` aus und wiederholt sie bei Fehlern mit exponentiellem Backoff + Jitter.
+
+    Rückgabe:
+        Rückgabewert von `funktion`; nach dem letzten Fehlversuch wird die Exception weitergereicht.
+    """
+    for versuch in range(1, max_versuche + 1):
+        try:
+            return funktion()
+        except Exception as e:
+            if versuch == max_versuche:
+                raise
+            wartezeit = backoff_sekunden * 2 ** (versuch - 1)
+            wartezeit += random.uniform(0, wartezeit / 2)
+            log.warning(
+                "%s fehlgeschlagen (Versuch %d/%d): %s – neuer Versuch in %.0f s",
+                beschreibung,
+                versuch,
+                max_versuche,
+                e,
+                wartezeit,
+            )
+            time.sleep(wartezeit)
+
+
+def bestand_laden():
+    """
+    Lädt den aktuellen Datenbestand von GitHub (ohne Streamlit-Ausgaben).
+    Bei partitionierter Ablage wird nur das Manifest geladen; die Partitionen der
+    betroffenen Standorte werden erst bei Zugriff nachgeladen.
+    """
+    wd = WetterAnalyse()
+    manifest, sha = github_datei_laden(MANIFEST_PATH)
+    if manifest is not None:
+        cache = PartitionCache()
+        wd.partitionen_setzen(
+            json.loads(manifest.decode("utf-8")), sha, lambda _, info: cache.laden(info)
+        )
+        return wd
+    inhalt, _ = github_datei_laden()
+    if inhalt is not None:
+        wd.eintraege_uebernehmen(json.loads(inhalt.decode("utf-8")))
+    return wd
+
+
+def stunden_laden():
+    """
+    Lädt die Stundenwerte von GitHub (ohne Streamlit-Ausgaben).
+    Bei partitionierter Ablage nur das Manifest; die Monatsdateien werden erst bei Zugriff
+    geladen. Sonst die bisherige `stundenwerte.json` (wird beim nächsten Speichern migriert).
+    """
+    manifest, sha = github_datei_laden(STUNDEN_MANIFEST_PFAD)
+    if manifest is not None:
+        stunden = StundenWerte()
+        stunden.partitionen_setzen(json.loads(manifest.decode("utf-8")), sha, PartitionCache().laden)
+        return stunden
+    inhalt, _ = github_datei_laden(STUNDEN_PFAD)
+    return StundenWerte.aus_json(json.loads(inhalt.decode("utf-8")) if inhalt else {})
+
+
+class IngestionWorker:
+    """
+    Ruft Live-Daten für die konfigurierten Standorte ab und speichert sie gesammelt auf GitHub.
+
+    Funktionsweise:
+        - Lädt den aktuellen Datenstand und die Stundenwerte von GitHub.
+        - Überspringt Standorte, für die in der aktuellen Stunde schon eine Beobachtung existiert.
+        - Ruft die übrigen Standorte gemeinsam bei OpenWeatherMap ab (mit Wiederholung und Backoff).
+        - Speichert jede Abfrage als Stundenwert und leitet daraus die Tagesmessung von heute ab
+          (gleiche Regel wie die App, `tageswerte_uebernehmen`).
+        - Schreibt Stundenwerte und Tagesmessungen eines Laufs mit je einem Export.
+    """
+
+    def __init__(self, konfiguration, api_key):
+        self.standorte = list(konfiguration.get("standorte", []))
+        self.zeitplan = CronZeitplan(konfiguration.get("zeitplan", "0 6 * * *"))
+        self.jitter_sekunden = float(konfiguration.get("jitter_sekunden", 300))
+        self.max_versuche = int(konfiguration.get("max_versuche", 4))
+        self.backoff_sekunden = float(konfiguration.get("backoff_sekunden", 30))
+        self.api_key = api_key
+
+    def _abrufen(self, orte):
+        rohdaten = owm_abrufen_mehrere(orte, self.api_key)
+        for ort, data in rohdaten.items():
+            cod = str(data.get("cod", "200"))
+            # Rate-Limit und Serverfehler wiederholen, andere Fehler (z. B. 404) nicht
+            if cod == "429" or cod.startswith("5"):
+                raise requests.HTTPError(
+                    f"OpenWeatherMap {cod} ({ort}): {data.get('message')}"
+                )
+        return rohdaten
+
+    def _beobachten(self, stunden, data, ort, zeitpunkt):
+        temp = data.get("main", {}).get("temp")
+        if temp is None:
+            log.error("OpenWeatherMap-Fehler für %s: %s", ort, data.get("message"))
+            return False
+        sonnenstunden = sonnenstunden_aus_owm(data, ort, zeitpunkt)
+        stunden.hinzufuegen(
+            ort, zeitpunkt, temp, data.get("rain", {}).get("1h", 0), sonnenstunden
+        )
+        return True
+
+    def lauf(self):
+        """
+        Führt einen einzelnen Abruf-Durchlauf aus. Danach wird die Statistik des
+        OpenWeatherMap-Caches (Treffer, Fehlschläge, Trefferquote) protokolliert und für das
+        Dev-Dashboard gespeichert (`OWMCache.statistik_speichern`).
+
+        Rückgabe:
+            int: Anzahl der gespeicherten neuen Stundenwerte.
+        """
+        try:
+            return self._lauf()
+        finally:
+            log.info("OWM-Cache: %s", owm_cache().uebersicht())
+            owm_cache().statistik_speichern()  # für das Dev-Dashboard der App
+
+    def _lauf(self):
+        wd = mit_backoff(
+            bestand_laden, self.max_versuche, self.backoff_sekunden, "GitHub-Laden"
+        )
+        stunden = mit_backoff(
+            stunden_laden, self.max_versuche, self.backoff_sekunden, "GitHub-Laden (Stundenwerte)"
+        )
+        jetzt = datetime.datetime.now()
+        faellig = [o for o in self.standorte if not stunden.hat_beobachtung(o, jetzt)]
+        log.info("Fällige Standorte: %s", faellig or "keine")
+
+        if not faellig:
+            return 0
+
+        # Alle fälligen Standorte gemeinsam abrufen (OWM-Gruppenabfrage)
+        try:
+            rohdaten = mit_backoff(
+                lambda: self._abrufen(faellig),
+                self.max_versuche,
+                self.backoff_sekunden,
+                "OpenWeatherMap-Abruf",
+            )
+        except Exception as e:
+            log.error("Abruf endgültig fehlgeschlagen: %s", e)
+            return 0
+
+        erfasst = [
+            ort for ort, data in rohdaten.items() if self._beobachten(stunden, data, ort, jetzt)
+        ]
+        if not erfasst:
+            return 0
+
+        ergebnis = tageswerte_uebernehmen(wd, stunden, erfasst, jetzt.date())
+        if ergebnis["uebersprungen"]:
+            log.info("Tageswert nicht ersetzt (manueller Eintrag): %s", ergebnis["uebersprungen"])
+
+        def speichern(daten):
+            resp = daten.github_speichern()
+            if resp.status_code not in [200, 201, 304]:
+                raise requests.HTTPError(f"GitHub {resp.status_code}: {resp.text}")
+
+        mit_backoff(
+            lambda: speichern(stunden), self.max_versuche, self.backoff_sekunden, "Export (Stundenwerte)"
+        )
+        if ergebnis["aktualisiert"]:
+            mit_backoff(lambda: speichern(wd), self.max_versuche, self.backoff_sekunden, "Export")
+        log.info("%d Stundenwert(e) gespeichert", len(erfasst))
+        return len(erfasst)
+
+    def dauerbetrieb(self):
+        """
+        Wartet jeweils bis zum nächsten Termin (plus zufälligem Jitter) und startet dann einen Lauf.
+        Fehler eines Laufs beenden den Worker nicht.
+        """
+        while True:
+            termin = self.zeitplan.naechster_termin(datetime.datetime.now())
+            termin += datetime.timedelta(seconds=random.uniform(0, self.jitter_sekunden))
+            log.info("Nächster Lauf: %s", termin.strftime("%Y-%m-%d %H:%M:%S"))
+            time.sleep(max(0.0, (termin - datetime.datetime.now()).total_seconds()))
+            try:
+                self.lauf()
+            except Exception:
+                log.exception("Lauf fehlgeschlagen")
+
+
+def github_pruefen(resp):
+    """Beendet das Programm, wenn ein GitHub-Update fehlgeschlagen ist."""
+    if resp.status_code not in [200, 201, 304]:
+        raise SystemExit(f"GitHub-Update fehlgeschlagen: {resp.status_code} – {resp.text}")
+
+
+def backfill_ausfuehren(args):
+    """
+    Importiert eine historische CSV-Datei in den GitHub-Datenbestand.
+
+    Der Bestand wird einmal geladen und die Datei blockweise übernommen. Jeder Block wird
+    sofort gespeichert und danach aus dem Speicher entfernt (`block_speichern`); der
+    gespeicherte Stand wird nicht als Messungen übernommen, es bleibt nur der Tagesindex für
+    die Duplikatprüfung. Dauerhaft belegt sind so ein Block (`--chunk-zeilen`) und der Index.
+    Beim Speichern wird die Zieldatei kurzzeitig als JSON gelesen und geschrieben: bei
+    partitionierter Ablage nur die betroffenen Standorte, sonst die ganze `wetterdaten.json`.
+
+    Bricht der Import ab, bleiben die gespeicherten Blöcke erhalten; ein erneuter Aufruf
+    überspringt sie als Duplikate.
+    """
+    wd = bestand_laden()
+    wd.gespeicherte_freigeben()
+
+    def nach_batch(batch):
+        github_pruefen(wd.block_speichern())
+        log.info("Batch mit %d neuen Messungen gespeichert", len(batch))
+
+    statistik = wd.csv_backfill(
+        args.datei,
+        format=args.format,
+        spalten=dict(s.split("=", 1) for s in args.spalte),
+        einheiten=dict(e.split("=", 1) for e in args.einheit),
+        standort=args.standort,
+        chunk_zeilen=args.chunk_zeilen,
+        nach_batch=nach_batch,
+    )
+    log.info("Import: %s", statistik)
+
+
+def partitionieren_ausfuehren():
+    """
+    Teilt `wetterdaten.json` in eine Datei pro Standort plus Manifest auf.
+    Die App und der Worker verwenden danach automatisch die partitionierte Ablage;
+    die alte Datei bleibt als Sicherung liegen.
+    """
+    inhalt, _ = github_datei_laden()
+    if inhalt is None:
+        raise SystemExit("Keine wetterdaten.json auf GitHub gefunden.")
+    wd = WetterAnalyse()
+    wd.eintraege_uebernehmen(json.loads(inhalt.decode("utf-8")))
+    resp = wd.partitionen_anlegen()
+    if resp.status_code not in [200, 201, 304]:
+        raise SystemExit(f"GitHub-Update fehlgeschlagen: {resp.status_code} – {resp.text}")
+    log.info(
+        "%d Messungen in %d Partitionen gespeichert", len(wd.messungen), len(wd.standorte())
+    )
+
+
+def verdichten_ausfuehren(args):
+    """
+    Verdichtet Tageswerte, die älter als die Rohdaten-Stufe sind, zu Monats- und Jahreswerten.
+
+    Ablauf pro betroffenem Jahr (inkrementell: nur Jahre, für die noch Tageswerte im
+    Bestand liegen):
+        1. Tageswerte in die Archivdatei des Jahres übernehmen (`archiv_zusammenfuehren`).
+        2. Monats- und Jahreswerte des Jahres aus dem vollständigen Archiv neu berechnen und
+           in verdichtet.json ersetzen; Monatswerte außerhalb der Monats-Stufe entfallen.
+        3. Die archivierten Tageswerte aus dem Bestand löschen (ein Export). Tageswerte, deren
+           Tag & Ort im Archiv schon mit einer anderen Messung belegt ist, bleiben im Bestand.
+
+    Jeder Schritt lässt sich wiederholen: bricht ein Lauf ab, setzt der nächste fort.
+    """
+    heute = datetime.date.today()
+    roh_ab_jahr = heute.year - args.roh_jahre + 1
+    monat_ab_jahr = heute.year - max(args.monat_jahre, args.roh_jahre) + 1
+
+    wd = bestand_laden()
+    wd.partitionen_laden()
+    alt = [m for m in wd.messungen if m.datum.year < roh_ab_jahr]
+    nach_jahr = {}
+    for m in alt:
+        nach_jahr.setdefault(m.datum.year, []).append(m.als_dict())
+
+    monate, jahre, archiv, archiviert = [], [], {}, set()
+    for jahr, eintraege in sorted(nach_jahr.items()):
+        resp, bestand, _ = github_konfliktfrei_schreiben(
+            archiv_pfad(jahr), lambda remote, neu=eintraege: archiv_zusammenfuehren(remote, neu)
+        )
+        github_pruefen(resp)
+        archiviert |= {e.get("ID") for e in bestand}
+        archiv_wd = WetterAnalyse()
+        archiv_wd.eintraege_uebernehmen(bestand)
+        df = archiv_wd.als_dataframe()
+        monate += verdichtung_als_json(verdichten(df))
+        jahre += verdichtung_als_json(verdichten(df, monatlich=False))
+        archiv[str(jahr)] = {"pfad": archiv_pfad(jahr), "anzahl": len(bestand)}
+        log.info("%d: %d Tageswerte archiviert (Archiv: %d)", jahr, len(eintraege), len(bestand))
+
+    resp, _, _ = github_konfliktfrei_schreiben(
+        VERDICHTET_PFAD,
+        lambda remote: verdichtung_zusammenfuehren(
+            remote, monate, jahre, archiv, nach_jahr, monat_ab_jahr
+        ),
+    )
+    github_pruefen(resp)
+
+    # nur löschen, was wirklich im Archiv liegt
+    loeschen = [m.id for m in alt if m.id in archiviert]
+    if len(loeschen) < len(alt):
+        log.warning(
+            "%d Tageswerte bleiben im Bestand (Tag & Ort im Archiv schon anders belegt)",
+            len(alt) - len(loeschen),
+        )
+    if loeschen:
+        wd.aenderungen_anwenden(loeschen=loeschen)
+        github_pruefen(wd.github_speichern())
+    log.info(
+        "%d Tageswerte verdichtet (vor %d); Bestand: %d Tageswerte",
+        len(alt), roh_ab_jahr, len(wd.messungen),
+    )
+
+
+def verdichtung_aufheben(args):
+    """
+    Stellt archivierte Tageswerte ab `args.ab_jahr` wieder im Bestand her.
+
+    Die Tageswerte werden eingefügt, danach die verdichteten Werte dieser Jahre entfernt
+    und die wiederhergestellten Tageswerte aus den Archivdateien gelöscht. Tage, die im
+    Bestand schon belegt sind, bleiben unverändert; ihre archivierten Werte bleiben im
+    Archiv (der Archiv-Eintrag in verdichtet.json zählt dann nur noch diese). Damit die
+    Jahre nicht erneut verdichtet werden, muss `roh_jahre` sie abdecken.
+    """
+    inhalt, _ = github_datei_laden(VERDICHTET_PFAD)
+    archiv = json.loads(inhalt.decode("utf-8")).get("archiv", {}) if inhalt else {}
+    jahre = sorted(int(j) for j in archiv if int(j) >= args.ab_jahr)
+    if not jahre:
+        log.info("Keine archivierten Jahre ab %d.", args.ab_jahr)
+        return
+
+    wd = bestand_laden()
+    wiederhergestellt, archiv_neu = {}, {}
+    for jahr in jahre:
+        inhalt, _ = github_datei_laden(archiv_pfad(jahr))
+        archiv_wd = WetterAnalyse()
+        archiv_wd.eintraege_uebernehmen(json.loads(inhalt.decode("utf-8")) if inhalt else [])
+        neu, belegt = [], []
+        for m in archiv_wd.messungen:
+            (belegt if wd.existiert_eintrag(m.datum, m.standort) else neu).append(m)
+        wd.aenderungen_anwenden(einfuegen=neu)
+        wiederhergestellt[jahr] = {m.id for m in neu}
+        archiv_neu[str(jahr)] = (
+            {"pfad": archiv_pfad(jahr), "anzahl": len(belegt)} if belegt else None
+        )
+        log.info("%d: %d Tageswerte wiederhergestellt", jahr, len(neu))
+        if belegt:
+            log.warning(
+                "%d: %d Tageswerte bleiben im Archiv (Tag & Ort im Bestand schon belegt)",
+                jahr, len(belegt),
+            )
+    if wd.hat_aenderungen():
+        github_pruefen(wd.github_speichern())
+
+    resp, _, _ = github_konfliktfrei_schreiben(
+        VERDICHTET_PFAD,
+        lambda remote: verdichtung_zusammenfuehren(
+            remote, archiv=archiv_neu, ersetzte_jahre=jahre
+        ),
+    )
+    github_pruefen(resp)
+    for jahr in jahre:
+        # nur die wiederhergestellten Tageswerte entfernen, alles andere bleibt im Archiv
+        resp, _, _ = github_konfliktfrei_schreiben(
+            archiv_pfad(jahr),
+            lambda remote, ids=wiederhergestellt[jahr]: [
+                e for e in remote or [] if e.get("ID") not in ids
+            ],
+        )
+        github_pruefen(resp)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wetterweiser-Werkzeuge")
+    befehle = parser.add_subparsers(dest="befehl", required=True)
+
+    worker = befehle.add_parser("worker", help="Live-Daten nach Zeitplan abrufen")
+    worker.add_argument(
+        "--einmal", action="store_true", help="nur einen Durchlauf ausführen"
+    )
+    worker.add_argument(
+        "--standorte", help="kommagetrennte Standorte statt der konfigurierten"
+    )
+
+    backfill = befehle.add_parser("backfill", help="historische CSV-Datei importieren")
+    backfill.add_argument("datei", help="Pfad zur CSV-Datei")
+    backfill.add_argument("--format", default="wetterweiser", choices=list(CSV_FORMATE))
+    backfill.add_argument("--standort", help="fester Standort für alle Zeilen")
+    backfill.add_argument(
+        "--spalte",
+        action="append",
+        default=[],
+        metavar="QUELLE=ZIEL",
+        help="zusätzliche Spaltenzuordnung, z. B. TT=Temperatur",
+    )
+    backfill.add_argument(
+        "--einheit",
+        action="append",
+        default=[],
+        metavar="SPALTE=EINHEIT",
+        help=f"Einheit der Quelle, z. B. Temperatur=°F ({', '.join(EINHEITEN)})",
+    )
+    backfill.add_argument("--chunk-zeilen", type=int, default=50_000)
+
+    befehle.add_parser(
+        "partitionieren", help="wetterdaten.json in Standort-Partitionen aufteilen"
+    )
+
+    verdichtung = befehle.add_parser(
+        "verdichten", help="alte Tageswerte zu Monats-/Jahreswerten verdichten"
+    )
+    verdichtung.add_argument(
+        "--roh-jahre", type=int, default=ROH_JAHRE, help="Kalenderjahre mit Tageswerten"
+    )
+    verdichtung.add_argument(
+        "--monat-jahre", type=int, default=MONAT_JAHRE, help="Kalenderjahre mit Monatswerten"
+    )
+    verdichtung.add_argument(
+        "--rueckgaengig", action="store_true", help="archivierte Tageswerte wiederherstellen"
+    )
+    verdichtung.add_argument(
+        "--ab-jahr", type=int, default=0, help="nur Jahre ab diesem wiederherstellen"
+    )
+
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+
+    if args.befehl == "worker":
+        w = IngestionWorker(
+            st.secrets.get("worker", {}), st.secrets["Legacy91988"]["OWM_API_KEY"]
+        )
+        if args.standorte:
+            w.standorte = [o.strip() for o in args.standorte.split(",") if o.strip()]
+        if args.einmal:
+            w.lauf()
+        else:
+            w.dauerbetrieb()
+    elif args.befehl == "backfill":
+        backfill_ausfuehren(args)
+    elif args.befehl == "partitionieren":
+        partitionieren_ausfuehren()
+    elif args.befehl == "verdichten":
+        if args.rueckgaengig:
+            verdichtung_aufheben(args)
+        else:
+            verdichten_ausfuehren(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Diagramme als reine Funktionen: aggregierte Daten rein, Matplotlib-Figur bzw. PNG-Bytes raus.
+
+Das Modul importiert kein Streamlit und kann daher in Worker-Prozessen laufen
+(siehe `diagramm_pool` in main.py). `vorbereiten` wird als Initializer der Worker
+genutzt, damit Matplotlib nur einmal pro Prozess importiert wird.
+"""
+
+import io  # PNG im Speicher
+
+import matplotlib  # Backend ohne Bildschirm (Agg)
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # für Diagramme
+import numpy as np  # Balkenpositionen
+
+MONATSNAMEN = ["Jan", "Feb", "Mär", "Apr", "Mai", "Jun", "Jul", "Aug", "Sep", "Okt", "Nov", "Dez"]
+LANGZEIT_WERTE = {"Temperatur": "°C", "Niederschlag": "mm", "Sonnenstunden": "h"}
+
+
+def figur_prognose(daten, methode):
+    """Matplotlib-Figur der Prognose (Temperatur als Linie, Niederschlag als Balken)."""
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(10, 4))
+
+    ax1.plot(daten["Tag"], daten["Temperatur"], marker="o", color="red", linewidth=2)
+    ax1.set_ylabel("°C")
+    ax1.set_title(f"Temperaturprognose – {methode}")
+
+    ax2.bar(daten["Tag"], daten["Niederschlag"], color="blue", alpha=0.6)
+    ax2.set_ylabel("mm")
+    ax2.set_title(f"Niederschlagsprognose – {methode}")
+
+    plt.tight_layout()
+    return fig
+
+
+def figur_7tage(daten):
+    """Matplotlib-Figur: Niederschlag und Sonnenstunden der letzten 7 Tage."""
+    x = np.arange(len(daten))
+    width = 0.35
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 4))
+
+    ax1.bar(x, daten["Niederschlag"], width, color="blue")
+    ax1.set_xticks(x)
+    ax1.set_xticklabels(daten["Tag"])
+    ax1.set_ylabel("mm")
+    ax1.set_title("Niederschlag letzte 7 Tage")
+
+    ax2.bar(x, daten["Sonnenstunden"], width, color="orange")
+    ax2.set_xticks(x)
+    ax2.set_xticklabels(daten["Tag"])
+    ax2.set_ylabel("h")
+    ax2.set_title("Sonnenstunden letzte 7 Tage")
+
+    plt.tight_layout()
+    return fig
+
+
+def figur_monatsvergleich(daten):
+    """Matplotlib-Figur: Monatssummen des aktuellen und letzten Jahres nebeneinander."""
+    aktuelles_jahr, letztes_jahr = daten["Jahr"].unique()[:2]
+    aktuell = daten[daten["Jahr"] == aktuelles_jahr]
+    letztes = daten[daten["Jahr"] == letztes_jahr]
+    x = np.arange(len(MONATSNAMEN))
+    width = 0.35
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 4))
+    achsen = [
+        (ax1, "Niederschlag", "mm", "Monatlicher Niederschlag", ("blue", "orange")),
+        (ax2, "Sonnenstunden", "h", "Monatliche Sonnenstunden", ("yellow", "green")),
+    ]
+    for ax, spalte, einheit, titel, (farbe, farbe_vorjahr) in achsen:
+        ax.bar(x - width / 2, aktuell[spalte], width=width, label=f"{aktuelles_jahr}", color=farbe)
+        ax.bar(
+            x + width / 2,
+            letztes[spalte],
+            width=width,
+            label=f"{letztes_jahr}",
+            color=farbe_vorjahr,
+            alpha=0.7,
+        )
+        ax.set_xticks(x)
+        ax.set_xticklabels(MONATSNAMEN)
+        ax.set_ylabel(einheit)
+        ax.set_title(titel)
+        ax.legend()
+
+    plt.tight_layout()
+    return fig
+
+
+def figur_langzeit(reihen):
+    """Matplotlib-Figur des Langzeitverlaufs (ein Teildiagramm pro Messwert)."""
+    fig, achsen = plt.subplots(len(LANGZEIT_WERTE), 1, figsize=(10, 7), sharex=True)
+    for ax, (spalte, einheit) in zip(achsen, LANGZEIT_WERTE.items()):
+        for ort, reihe in reihen[reihen["Messwert"] == spalte].groupby("Standort"):
+            ax.plot(reihe["Datum"], reihe["Wert"], linewidth=0.8, label=ort)
+        ax.set_ylabel(einheit)
+        ax.set_title(spalte)
+    achsen[0].legend(loc="upper left")
+    plt.tight_layout()
+    return fig
+
+
+# Diagrammart -> Funktion, die eine Figur erzeugt
+FIGUREN = {
+    "prognose": figur_prognose,
+    "7tage": figur_7tage,
+    "monatsvergleich": figur_monatsvergleich,
+    "langzeit": figur_langzeit,
+}
+
+
+def vorbereiten():
+    """Initializer für Worker-Prozesse: lädt Matplotlib samt Schriften einmal vorab."""
+    fig = plt.figure(figsize=(1, 1))
+    fig.text(0, 0, "°C")
+    fig.canvas.draw()
+    plt.close(fig)
+
+
+def png(art, daten, dpi=100, **parameter):
+    """
+    Erzeugt ein Diagramm als PNG.
+
+    Parameter:
+        art (str): Schlüssel aus FIGUREN.
+        daten (pd.DataFrame): bereits aggregierte Daten.
+        dpi (int): Auflösung.
+        **parameter: weitere Argumente der Figur-Funktion (z. B. methode).
+
+    Rückgabe:
+        bytes: PNG-Bild.
+    """
+    fig = FIGUREN[art](daten, **parameter)
+    puffer = io.BytesIO()
+    try:
+        fig.savefig(puffer, format="png", dpi=dpi)
+    finally:
+        plt.close(fig)
+    return puffer.getvalue()
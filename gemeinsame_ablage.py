@@ -0,0 +1,354 @@
+"""
+Gemeinsame Ablage für mehrere Server-Prozesse (z. B. mehrere Streamlit-Repliken hinter einem
+Load Balancer).
+
+Jeder Prozess hält seine Caches (`st.cache_resource`) im eigenen Speicher. Die Ablage ist die
+zweite Stufe dahinter: Dateien von GitHub (nach Git-Blob-SHA), abgeleitete Auswertungen (nach
+Datenversion) und fertige Diagramm-Bilder liegen dort einmal für alle Prozesse. Ein Prozess
+holt bzw. berechnet nur, was noch kein anderer abgelegt hat.
+
+Backends (Auswahl über eine URL, siehe `ablage_oeffnen`):
+    speicher://          im Prozess (Stand-in für Tests und Einzelprozess-Betrieb)
+    sqlite:///<pfad>     SQLite-Datei, für alle Prozesse auf demselben Rechner/Volume
+                         (relativer Pfad; absolut mit vier Schrägstrichen: sqlite:////var/…)
+    redis://<host>:<port>/<db>
+                         Redis oder kompatibler Dienst (benötigt das Paket `redis`)
+
+Das Modul importiert weder Streamlit noch pandas. Werte sind Bytes; `objekt_holen` /
+`objekt_setzen` speichern Python-Objekte per pickle. Die Ablage darf daher nur von den eigenen
+Prozessen beschrieben werden.
+
+Fehler des Backends (z. B. Redis nicht erreichbar) werden nicht weitergereicht: sie gelten als
+Fehlgriff, der Aufrufer lädt bzw. rechnet selbst, und die Meldung steht in `fehler`.
+"""
+
+import pickle  # Objekte (DataFrames, Arrays) als Bytes ablegen
+import secrets  # zufällige Marke pro Sperre
+import sqlite3  # Ablage in einer Datei für mehrere Prozesse
+import threading  # Sperre für Speicher- und SQLite-Ablage
+import time  # Ablaufzeiten
+from collections import OrderedDict  # LRU-Reihenfolge der Speicher-Ablage
+
+ABLAGE_TTL = 24 * 3600  # Sekunden; Einträge sind versioniert, die TTL begrenzt nur den Platz
+SPERRE_SEKUNDEN = 60  # so lange gilt eine Berechnung als "läuft" (danach darf ein anderer)
+WARTEN_SEKUNDEN = 30  # so lange wartet ein Prozess auf das Ergebnis eines anderen
+SPEICHER_MAX_EINTRAEGE = 256
+
+# Redis: Sperre nur löschen, wenn sie noch die eigene Marke trägt (Prüfen und Löschen atomar)
+REDIS_FREIGEBEN = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+class Ablage:
+    """
+    Gemeinsame Schnittstelle aller Backends.
+
+    Unterklassen implementieren `_holen`, `_setzen`, `_sperren` und `_freigeben`;
+    alle öffentlichen Methoden fangen deren Fehler ab und zählen Treffer und Fehlgriffe.
+
+    Eine Sperre trägt eine zufällige Marke des Inhabers. `freigeben` löscht sie nur mit
+    dieser Marke – ist sie abgelaufen und hat inzwischen ein anderer Prozess die Sperre,
+    bleibt dessen Sperre bestehen.
+
+    Attribute:
+        fehler (str|None): Meldung des letzten fehlgeschlagenen Zugriffs (None = erreichbar).
+        statistik (dict): Treffer, Fehlschläge, Berechnungen und Wartevorgänge.
+    """
+
+    def __init__(self, ttl_sekunden=ABLAGE_TTL):
+        self.ttl_sekunden = ttl_sekunden
+        self.fehler = None
+        self.statistik = {"treffer": 0, "fehlschlaege": 0, "berechnet": 0, "gewartet": 0}
+        self._statistik_lock = threading.Lock()
+
+    def _zaehlen(self, art):
+        with self._statistik_lock:
+            self.statistik[art] += 1
+
+    def _ausfuehren(self, aktion, *args, ersatz=None):
+        try:
+            ergebnis = aktion(*args)
+        except Exception as e:
+            self.fehler = f"{type(e).__name__}: {e}"
+            return ersatz
+        self.fehler = None
+        return ergebnis
+
+    def holen(self, schluessel):
+        """Liefert die Bytes zu `schluessel` oder None (nicht vorhanden, abgelaufen, Fehler)."""
+        wert = self._ausfuehren(self._holen, schluessel)
+        self._zaehlen("fehlschlaege" if wert is None else "treffer")
+        return wert
+
+    def setzen(self, schluessel, wert, ttl_sekunden=None):
+        """Legt Bytes unter `schluessel` ab (überschreibt einen vorhandenen Eintrag)."""
+        self._ausfuehren(self._setzen, schluessel, bytes(wert), ttl_sekunden or self.ttl_sekunden)
+
+    def sperren(self, schluessel, sekunden=SPERRE_SEKUNDEN):
+        """
+        Reserviert `schluessel` für höchstens `sekunden` (wie Redis `SET NX EX`).
+
+        Rückgabe:
+            str|None: Marke der Sperre (für `freigeben`), wenn dieser Aufrufer sie hat, sonst
+            None. Ist die Ablage nicht erreichbar, ebenfalls eine Marke – dann rechnet eben
+            jeder Prozess selbst.
+        """
+        marke = secrets.token_hex(16)
+        erhalten = self._ausfuehren(
+            self._sperren, f"sperre:{schluessel}", marke.encode(), sekunden, ersatz=True
+        )
+        return marke if erhalten else None
+
+    def freigeben(self, schluessel, marke):
+        """Gibt die Sperre frei, sofern sie noch die Marke `marke` trägt."""
+        self._ausfuehren(self._freigeben, f"sperre:{schluessel}", marke.encode())
+
+    def objekt_holen(self, schluessel):
+        """Wie `holen`, aber für abgelegte Python-Objekte."""
+        return self._auspacken(self.holen(schluessel))
+
+    def _auspacken(self, wert):
+        if wert is None:
+            return None
+        try:
+            return (pickle.loads(wert),)
+        except Exception as e:  # z. B. Eintrag einer inkompatiblen Version
+            self.fehler = f"{type(e).__name__}: {e}"
+            return None
+
+    def objekt_setzen(self, schluessel, objekt, ttl_sekunden=None):
+        self.setzen(schluessel, pickle.dumps(objekt, protocol=pickle.HIGHEST_PROTOCOL), ttl_sekunden)
+
+    def holen_oder_berechnen(self, schluessel, berechnen, warten=WARTEN_SEKUNDEN):
+        """
+        Liefert das abgelegte Objekt oder berechnet es – einmal für alle Prozesse.
+
+        Funktionsweise:
+            - Treffer: das Objekt wird ausgepackt und zurückgegeben.
+            - Sonst versucht der Prozess, die Sperre zu bekommen. Wer sie hat, rechnet,
+              legt das Ergebnis ab und gibt die Sperre frei.
+            - Die anderen warten bis zu `warten` Sekunden auf das Ergebnis und rechnen
+              erst danach selbst (z. B. wenn der rechnende Prozess abgestürzt ist).
+              Das Nachsehen beim Warten zählt nicht als Fehlgriff (einmal "gewartet").
+        """
+        treffer = self.objekt_holen(schluessel)
+        if treffer is not None:
+            return treffer[0]
+
+        marke = self.sperren(schluessel)
+        if marke is None:
+            self._zaehlen("gewartet")
+            ende = time.monotonic() + warten
+            pause = 0.05
+            while time.monotonic() < ende:
+                time.sleep(pause)
+                pause = min(pause * 2, 1.0)
+                treffer = self._auspacken(self._ausfuehren(self._holen, schluessel))
+                if treffer is not None:
+                    return treffer[0]
+            return berechnen()
+
+        try:
+            ergebnis = berechnen()
+            self._zaehlen("berechnet")
+            self.objekt_setzen(schluessel, ergebnis)
+            return ergebnis
+        finally:
+            self.freigeben(schluessel, marke)
+
+    def uebersicht(self):
+        """Statistik inkl. Trefferquote (für das Dev-Dashboard)."""
+        with self._statistik_lock:
+            stat = dict(self.statistik)
+        anfragen = stat["treffer"] + stat["fehlschlaege"]
+        stat["trefferquote"] = round(stat["treffer"] / anfragen * 100, 1) if anfragen else 0.0
+        return stat
+
+    def _holen(self, schluessel):
+        raise NotImplementedError
+
+    def _setzen(self, schluessel, wert, ttl_sekunden):
+        raise NotImplementedError
+
+    def _sperren(self, schluessel, marke, sekunden):
+        raise NotImplementedError
+
+    def _freigeben(self, schluessel, marke):
+        raise NotImplementedError
+
+
+class SpeicherAblage(Ablage):
+    """
+    Ablage im Speicher des eigenen Prozesses (LRU, höchstens `max_eintraege` Einträge).
+
+    Verhält sich wie die anderen Backends (Ablauf, Sperren), teilt aber nichts mit anderen
+    Prozessen – als Stand-in für Redis in Tests und für Einzelprozess-Betrieb.
+    """
+
+    def __init__(self, ttl_sekunden=ABLAGE_TTL, max_eintraege=SPEICHER_MAX_EINTRAEGE):
+        super().__init__(ttl_sekunden)
+        self.max_eintraege = max_eintraege
+        self._lock = threading.Lock()
+        self._eintraege = OrderedDict()  # Schlüssel -> (Ablaufzeit, Bytes)
+
+    def _holen(self, schluessel):
+        with self._lock:
+            eintrag = self._eintraege.get(schluessel)
+            if eintrag is None:
+                return None
+            if eintrag[0] <= time.time():
+                del self._eintraege[schluessel]
+                return None
+            self._eintraege.move_to_end(schluessel)
+            return eintrag[1]
+
+    def _setzen(self, schluessel, wert, ttl_sekunden):
+        with self._lock:
+            self._eintraege[schluessel] = (time.time() + ttl_sekunden, wert)
+            self._eintraege.move_to_end(schluessel)
+            while len(self._eintraege) > self.max_eintraege:
+                self._eintraege.popitem(last=False)
+
+    def _sperren(self, schluessel, marke, sekunden):
+        with self._lock:
+            eintrag = self._eintraege.get(schluessel)
+            if eintrag is not None and eintrag[0] > time.time():
+                return False
+            self._eintraege[schluessel] = (time.time() + sekunden, marke)
+            return True
+
+    def _freigeben(self, schluessel, marke):
+        with self._lock:
+            eintrag = self._eintraege.get(schluessel)
+            if eintrag is not None and eintrag[1] == marke:
+                del self._eintraege[schluessel]
+
+
+class SQLiteAblage(Ablage):
+    """
+    Ablage in einer SQLite-Datei, gemeinsam für alle Prozesse, die die Datei sehen.
+
+    Hinweise:
+        - WAL-Modus: Leser blockieren den Schreiber nicht.
+        - Sperren sind Zeilen mit Ablaufzeit und der Marke als Wert; `BEGIN IMMEDIATE` macht
+          Prüfen und Setzen atomar, Freigeben löscht nur die Zeile mit der eigenen Marke.
+        - Abgelaufene Einträge werden beim Schreiben entfernt.
+    """
+
+    def __init__(self, pfad, ttl_sekunden=ABLAGE_TTL):
+        super().__init__(ttl_sekunden)
+        self.pfad = pfad
+        self._lock = threading.Lock()
+        self._verbindung = sqlite3.connect(
+            pfad, timeout=10, isolation_level=None, check_same_thread=False
+        )
+        self._verbindung.execute("PRAGMA journal_mode=WAL")
+        self._verbindung.execute(
+            "CREATE TABLE IF NOT EXISTS ablage (schluessel TEXT PRIMARY KEY, ablauf REAL, wert BLOB)"
+        )
+
+    def _holen(self, schluessel):
+        with self._lock:
+            zeile = self._verbindung.execute(
+                "SELECT wert FROM ablage WHERE schluessel = ? AND ablauf > ?",
+                (schluessel, time.time()),
+            ).fetchone()
+        return zeile[0] if zeile else None
+
+    def _setzen(self, schluessel, wert, ttl_sekunden):
+        jetzt = time.time()
+        with self._lock:
+            self._verbindung.execute("DELETE FROM ablage WHERE ablauf <= ?", (jetzt,))
+            self._verbindung.execute(
+                "INSERT OR REPLACE INTO ablage VALUES (?, ?, ?)",
+                (schluessel, jetzt + ttl_sekunden, sqlite3.Binary(wert)),
+            )
+
+    def _sperren(self, schluessel, marke, sekunden):
+        jetzt = time.time()
+        with self._lock:
+            self._verbindung.execute("BEGIN IMMEDIATE")
+            try:
+                self._verbindung.execute(
+                    "DELETE FROM ablage WHERE schluessel = ? AND ablauf <= ?", (schluessel, jetzt)
+                )
+                neu = self._verbindung.execute(
+                    "INSERT OR IGNORE INTO ablage VALUES (?, ?, ?)",
+                    (schluessel, jetzt + sekunden, sqlite3.Binary(marke)),
+                ).rowcount
+                self._verbindung.execute("COMMIT")
+            except Exception:
+                self._verbindung.execute("ROLLBACK")
+                raise
+        return neu == 1
+
+    def _freigeben(self, schluessel, marke):
+        with self._lock:
+            self._verbindung.execute(
+                "DELETE FROM ablage WHERE schluessel = ? AND wert = ?",
+                (schluessel, sqlite3.Binary(marke)),
+            )
+
+
+class RedisAblage(Ablage):
+    """
+    Ablage in Redis (oder einem kompatiblen Dienst), gemeinsam für alle Rechner.
+
+    Benötigt das Paket `redis`; es wird erst hier importiert, damit die anderen Backends
+    ohne es auskommen.
+    """
+
+    def __init__(self, url, ttl_sekunden=ABLAGE_TTL):
+        super().__init__(ttl_sekunden)
+        try:
+            import redis  # optional: nur für dieses Backend
+        except ImportError as e:
+            raise ImportError(
+                "Für eine Redis-Ablage wird das Paket 'redis' benötigt (pip install redis)."
+            ) from e
+        self.url = url
+        self._redis = redis.Redis.from_url(url, socket_timeout=2, socket_connect_timeout=2)
+        self._freigeben_skript = self._redis.register_script(REDIS_FREIGEBEN)
+
+    def _holen(self, schluessel):
+        return self._redis.get(schluessel)
+
+    def _setzen(self, schluessel, wert, ttl_sekunden):
+        self._redis.set(schluessel, wert, ex=int(ttl_sekunden))
+
+    def _sperren(self, schluessel, marke, sekunden):
+        return bool(self._redis.set(schluessel, marke, nx=True, ex=int(sekunden)))
+
+    def _freigeben(self, schluessel, marke):
+        self._freigeben_skript(keys=[schluessel], args=[marke])
+
+
+def ablage_oeffnen(url, ttl_sekunden=ABLAGE_TTL):
+    """
+    Öffnet die Ablage zu einer URL.
+
+    Parameter:
+        url (str): "speicher://", "sqlite:///<pfad>" oder "redis://..." bzw. "rediss://...".
+            Leer oder None: keine gemeinsame Ablage.
+        ttl_sekunden (int): Lebensdauer der Einträge.
+
+    Rückgabe:
+        Ablage|None
+
+    Hinweise:
+        - Ein unbekanntes Schema ist ein Konfigurationsfehler (ValueError).
+    """
+    if not url:
+        return None
+    schema, _, rest = url.partition("://")
+    if schema == "speicher":
+        return SpeicherAblage(ttl_sekunden)
+    if schema == "sqlite":
+        return SQLiteAblage(rest.removeprefix("/") or ".wetterweiser_ablage.db", ttl_sekunden)
+    if schema in ("redis", "rediss"):
+        return RedisAblage(url, ttl_sekunden)
+    raise ValueError(f"Unbekannte Ablage '{url}' (erwartet speicher://, sqlite:///… oder redis://…)")
@@ -0,0 +1,404 @@
+"""
+Lasttest für Wetterweiser: N gleichzeitige Sessions gegen lokale Stand-ins für GitHub und OpenWeatherMap.
+
+Jede Session ist ein eigenes `AppTest`-Objekt, das `main.py` in einem eigenen Thread ausführt –
+wie der Streamlit-Server, der pro Session einen Script-Thread im selben Prozess startet.
+Caches (`st.cache_resource`, `st.cache_data`) und Hintergrund-Uploads werden daher wie im
+Betrieb zwischen den Sessions geteilt. GitHub und OpenWeatherMap werden durch `stub_server.py`
+ersetzt; es wird kein echter Dienst aufgerufen.
+
+Aufruf:
+    python lasttest.py --sessions 8 --reruns 20
+    python lasttest.py --sessions 8 --synthetisch 20x3650 --bericht vorher.json
+    python lasttest.py --sessions 8 --synthetisch 20x3650 --vergleich vorher.json
+    python lasttest.py --sessions 8 --ablage sqlite:////tmp/ablage.db   # mit gemeinsamer Ablage
+
+Gemessen werden:
+    - Latenz pro Rerun (p50/p90/p95/p99/max, gesamt und pro Aktion)
+    - Durchsatz (Reruns pro Sekunde über alle Sessions)
+    - Spitzen-RSS des Prozesses (ohne Worker-Prozesse des Diagramm-Pools)
+    - Aufrufe der Stand-ins (GitHub GET/PUT/409, OpenWeatherMap weather/group)
+Der Bericht wird als JSON gespeichert und kann mit einem früheren Bericht verglichen werden.
+"""
+
+import argparse  # Kommandozeilen-Argumente
+import datetime  # Zeitstempel und synthetische Daten
+import json  # Bericht und Startdaten
+import math  # Jahresgang der synthetischen Temperaturen
+import os  # Pfade und Arbeitsverzeichnis
+import random  # Aktionen der Sessions
+import resource  # Spitzen-RSS (Unix)
+import subprocess  # Git-Stand für den Bericht
+import sys  # Importpfad für main.py
+import tempfile  # Arbeitsverzeichnis für lokale Dateien der App
+import threading  # gleichzeitige Sessions
+import time  # Latenzmessung
+
+import numpy as np  # Perzentile
+
+import stub_server  # lokale Stand-ins für GitHub und OpenWeatherMap
+
+VERZEICHNIS = os.path.dirname(os.path.abspath(__file__))
+APP = os.path.join(VERZEICHNIS, "main.py")
+
+# Aktionen einer Session und ihre Gewichtung (Lesen überwiegt, Schreiben ist selten)
+AKTIONEN = {"ort": 5, "tabelle": 3, "simulation": 1, "live": 1}
+PERZENTILE = [50, 90, 95, 99]
+
+
+def arbeitsverzeichnis_anlegen(port, diagramm_prozesse, ablage=""):
+    """
+    Legt ein temporäres Arbeitsverzeichnis mit `.streamlit/secrets.toml` an.
+
+    Die App schreibt ihre lokalen Schnappschüsse (wetterdaten.json, Caches) ins Arbeitsverzeichnis;
+    so bleibt das Repository unberührt. Die Secrets kommen aus der Datei statt aus
+    `AppTest.secrets`, weil AppTest dafür `st.secrets` global austauscht – das verträgt sich
+    nicht mit gleichzeitigen Sessions.
+    """
+    verzeichnis = tempfile.mkdtemp(prefix="wetterweiser-lasttest-")
+    os.makedirs(os.path.join(verzeichnis, ".streamlit"))
+    with open(os.path.join(verzeichnis, ".streamlit", "secrets.toml"), "w") as f:
+        f.write(
+            f"""[Legacy91988]
+Wetterweiser = "lasttest/wetterweiser"
+github_token = ""
+OWM_API_KEY = "lasttest"
+github_api_url = "http://127.0.0.1:{port}"
+owm_base_url = "http://127.0.0.1:{port}"
+diagramm_prozesse = {diagramm_prozesse}
+gemeinsame_ablage = "{ablage}"
+
+[dev]
+debug_password = "lasttest"
+"""
+        )
+    return verzeichnis
+
+
+def daten_erzeugen(standorte, tage, seed=0):
+    """
+    Synthetische Tageswerte im Format von `wetterdaten.json` (für Skalierungstests).
+
+    Rückgabe:
+        list[dict]: `standorte` × `tage` Einträge, der letzte Tag ist gestern.
+    """
+    rng = random.Random(seed)
+    heute = datetime.date.today()
+    eintraege = []
+    for s in range(standorte):
+        for t in range(tage):
+            datum = heute - datetime.timedelta(days=tage - t)
+            temp = round(9 + 9 * math.sin((datum.timetuple().tm_yday - 110) / 58) + rng.gauss(0, 2), 1)
+            eintraege.append(
+                {
+                    "ID": f"lasttest-{s}-{t}",
+                    "Datum": f"{datum} 12:00:00",
+                    "Temperatur": temp,
+                    "Niederschlag": round(max(0.0, rng.gauss(0.5, 2)), 1),
+                    "Sonnenstunden": round(rng.uniform(0, 12), 1),
+                    "Quelle": "simuliert",
+                    "Standort": f"Station {s + 1}",
+                    "Temp_min": round(temp - 4, 1),
+                    "Temp_max": round(temp + 4, 1),
+                }
+            )
+    return eintraege
+
+
+def rss_mb():
+    """Aktueller RSS des Prozesses in MB (0, wenn /proc nicht verfügbar ist)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return 0.0
+
+
+def kennzahlen(latenzen):
+    """Perzentile, Mittel und Maximum einer Liste von Latenzen (Sekunden) in Millisekunden."""
+    if not latenzen:
+        return {}
+    ms = np.asarray(latenzen) * 1000
+    werte = {f"p{p}": round(float(np.percentile(ms, p)), 1) for p in PERZENTILE}
+    werte["mittel"] = round(float(ms.mean()), 1)
+    werte["max"] = round(float(ms.max()), 1)
+    werte["anzahl"] = len(ms)
+    return werte
+
+
+class Session(threading.Thread):
+    """
+    Eine simulierte Browser-Session: erster Aufruf, danach `reruns` zufällige Aktionen.
+
+    Attribute:
+        messungen (list[tuple]): (Aktion, Dauer in s, Fehlermeldung oder None) pro Rerun.
+    """
+
+    def __init__(self, nummer, reruns, pause, timeout, start_signal, seed):
+        super().__init__(name=f"lasttest-session-{nummer}", daemon=True)
+        self.nummer = nummer
+        self.reruns = reruns
+        self.pause = pause
+        self.timeout = timeout
+        self.start_signal = start_signal
+        self.rng = random.Random(seed + nummer)
+        self.messungen = []
+
+    def run(self):
+        from streamlit.testing.v1 import AppTest
+
+        at = AppTest.from_file(APP, default_timeout=self.timeout)
+        self.start_signal.wait()
+        self._messen(at, "start")
+        aktionen, gewichte = list(AKTIONEN), list(AKTIONEN.values())
+        for _ in range(self.reruns):
+            aktion = self.rng.choices(aktionen, weights=gewichte)[0]
+            try:
+                getattr(self, f"_{aktion}")(at)
+            except (IndexError, KeyError, ValueError) as e:
+                # Element fehlt (z. B. nach einem Fehler im vorigen Rerun) -> neu laden
+                self.messungen.append((aktion, 0.0, f"Element nicht gefunden: {e}"))
+                self._messen(at, "start")
+            if self.pause:
+                time.sleep(self.rng.uniform(0, 2 * self.pause))
+
+    def _messen(self, at, aktion):
+        beginn = time.perf_counter()
+        try:
+            at.run()
+            fehler = at.exception[0].value if at.exception else None
+        except Exception as e:  # z. B. Timeout des Script-Threads
+            fehler = f"{type(e).__name__}: {e}"
+        self.messungen.append((aktion, time.perf_counter() - beginn, fehler))
+
+    @staticmethod
+    def _element(liste, label):
+        element = next((e for e in liste if e.label == label), None)
+        if element is None:
+            raise KeyError(label)  # wie ein fehlender Schlüssel: `run` lädt die Seite neu
+        return element
+
+    def _ort(self, at):
+        auswahl = at.selectbox(key="ort_filter")
+        auswahl.set_value(self.rng.choice(auswahl.options))
+        self._messen(at, "ort")
+
+    def _tabelle(self, at):
+        auswahl = at.selectbox(key="tabelle_sortierung")
+        auswahl.set_value(self.rng.choice(auswahl.options))
+        self._messen(at, "tabelle")
+
+    def _modus(self, at, modus):
+        radio = self._element(at.radio, "Modus")
+        if radio.value != modus:
+            radio.set_value(modus)
+            self._messen(at, "modus")
+
+    def _simulation(self, at):
+        self._modus(at, "Simulation")
+        self._element(at.text_input, "Ort").input(f"Lasttest {self.nummer}")
+        self._element(at.button, "Simulieren").click()
+        self._messen(at, "simulation")
+
+    def _live(self, at):
+        # die App zeigt Live-Daten nur an (abgerufen werden sie vom Ingestion-Worker)
+        self._modus(at, "Live-Daten")
+        self._messen(at, "live")
+
+
+def auf_uploads_warten(zustand, max_sekunden=30):
+    """Wartet, bis die Hintergrund-Uploads fertig sind (keine neuen PUTs mehr für 1 s)."""
+    ende = time.time() + max_sekunden
+    vorher = None
+    while time.time() < ende:
+        with zustand.lock:
+            jetzt = zustand.aufrufe.get("github_put", 0)
+        if jetzt == vorher:
+            return
+        vorher = jetzt
+        time.sleep(1)
+
+
+def git_stand():
+    """Kurz-Hash des aktuellen Commits (None außerhalb eines Git-Repositories)."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=VERZEICHNIS,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def lasttest(args):
+    """
+    Führt den Lasttest aus.
+
+    Rückgabe:
+        dict: Bericht (siehe Modul-Docstring).
+    """
+    server = stub_server.starten()
+    zustand = stub_server.StubHandler.zustand
+    zustand.zuruecksetzen()
+    zustand.verzoegerung = args.verzoegerung_ms / 1000
+
+    if args.synthetisch:
+        standorte, tage = (int(x) for x in args.synthetisch.lower().split("x"))
+        eintraege = daten_erzeugen(standorte, tage)
+    else:
+        with open(args.daten, encoding="utf-8") as f:
+            eintraege = json.load(f)
+    zustand.datei_setzen("wetterdaten.json", json.dumps(eintraege).encode("utf-8"))
+
+    verzeichnis = arbeitsverzeichnis_anlegen(
+        server.server_address[1], args.diagramm_prozesse, args.ablage
+    )
+    os.chdir(verzeichnis)  # vor dem Import von Streamlit: secrets.toml relativ zum Arbeitsverzeichnis
+    sys.path.insert(0, VERZEICHNIS)
+    from streamlit import logger
+
+    logger.set_log_level("error")
+
+    rss_start = rss_mb()
+    start_signal = threading.Event()
+    sessions = [
+        Session(i, args.reruns, args.pause, args.timeout, start_signal, args.seed)
+        for i in range(args.sessions)
+    ]
+    for s in sessions:
+        s.start()
+    beginn = time.perf_counter()
+    start_signal.set()
+    for s in sessions:
+        s.join()
+    dauer = time.perf_counter() - beginn
+    auf_uploads_warten(zustand)
+
+    messungen = [m for s in sessions for m in s.messungen]
+    latenzen = [d for _, d, f in messungen if f is None]
+    fehler = [f"{a}: {f}" for a, _, f in messungen if f is not None]
+    pro_aktion = {}
+    for aktion, d, f in messungen:
+        if f is None:
+            pro_aktion.setdefault(aktion, []).append(d)
+
+    with zustand.lock:
+        aufrufe = dict(zustand.aufrufe)
+    remote = zustand.datei("wetterdaten.json")
+    server.shutdown()
+
+    return {
+        "zeitpunkt": datetime.datetime.now().isoformat(timespec="seconds"),
+        "git": git_stand(),
+        "parameter": {
+            "sessions": args.sessions,
+            "reruns": args.reruns,
+            "pause": args.pause,
+            "verzoegerung_ms": args.verzoegerung_ms,
+            "daten": args.synthetisch or os.path.basename(args.daten),
+            "diagramm_prozesse": args.diagramm_prozesse,
+            "seed": args.seed,
+        },
+        "dauer_s": round(dauer, 2),
+        "reruns": len(latenzen),
+        "durchsatz_reruns_pro_s": round(len(latenzen) / dauer, 2) if dauer else 0,
+        "latenz_ms": kennzahlen(latenzen),
+        "latenz_ms_pro_aktion": {a: kennzahlen(d) for a, d in sorted(pro_aktion.items())},
+        "fehler": {"anzahl": len(fehler), "beispiele": fehler[:5]},
+        "rss_mb": {
+            "start": round(rss_start, 1),
+            "spitze": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        },
+        "upstream": aufrufe,
+        "daten": {
+            "eintraege_vorher": len(eintraege),
+            "eintraege_nachher": len(json.loads(remote)) if remote else 0,
+        },
+    }
+
+
+# Kennzahlen für den Vergleich zweier Berichte: (Beschriftung, Pfad im Bericht)
+VERGLEICH = [
+    ("Durchsatz (Reruns/s)", ("durchsatz_reruns_pro_s",)),
+    ("Latenz p50 (ms)", ("latenz_ms", "p50")),
+    ("Latenz p95 (ms)", ("latenz_ms", "p95")),
+    ("Latenz p99 (ms)", ("latenz_ms", "p99")),
+    ("Latenz max (ms)", ("latenz_ms", "max")),
+    ("RSS Spitze (MB)", ("rss_mb", "spitze")),
+    ("GitHub GET", ("upstream", "github_get")),
+    ("GitHub PUT", ("upstream", "github_put")),
+    ("GitHub 409", ("upstream", "github_409")),
+    ("OWM weather", ("upstream", "weather")),
+    ("OWM group", ("upstream", "group")),
+    ("Fehler", ("fehler", "anzahl")),
+]
+
+
+def bericht_ausgeben(bericht, alt=None):
+    """Gibt die wichtigsten Kennzahlen als Tabelle aus (optional neben einem früheren Bericht)."""
+
+    def wert(b, pfad):
+        for schluessel in pfad:
+            b = b.get(schluessel, {}) if isinstance(b, dict) else {}
+        return b if isinstance(b, (int, float)) else 0
+
+    if alt is None:
+        for beschriftung, pfad in VERGLEICH:
+            print(f"{beschriftung:<22} {wert(bericht, pfad):>10}")
+        return
+    print(f"{'':<22} {'vorher':>10} {'nachher':>10} {'Änderung':>10}")
+    for beschriftung, pfad in VERGLEICH:
+        a, n = wert(alt, pfad), wert(bericht, pfad)
+        aenderung = f"{(n - a) / a * 100:+.1f} %" if a else ""
+        print(f"{beschriftung:<22} {a:>10} {n:>10} {aenderung:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lasttest mit gleichzeitigen Sessions")
+    parser.add_argument("--sessions", type=int, default=4, help="gleichzeitige Sessions")
+    parser.add_argument("--reruns", type=int, default=10, help="Aktionen pro Session")
+    parser.add_argument("--pause", type=float, default=0, help="mittlere Denkzeit (s)")
+    parser.add_argument("--timeout", type=float, default=120, help="max. Dauer eines Reruns (s)")
+    parser.add_argument(
+        "--verzoegerung-ms", type=float, default=0, help="künstliche Antwortzeit der Stand-ins"
+    )
+    parser.add_argument(
+        "--daten",
+        default=os.path.join(VERZEICHNIS, "wetterdaten.json"),
+        help="Startinhalt der GitHub-Ablage",
+    )
+    parser.add_argument(
+        "--synthetisch", metavar="STANDORTExTAGE", help="synthetische Daten, z. B. 20x3650"
+    )
+    parser.add_argument("--diagramm-prozesse", type=int, default=0)
+    parser.add_argument(
+        "--ablage", default="", help="gemeinsame Ablage, z. B. sqlite:////tmp/ablage.db"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--bericht", help="Pfad des JSON-Berichts (Standard: lasttest_<Zeit>.json)")
+    parser.add_argument("--vergleich", help="früherer Bericht zum Vergleich")
+    args = parser.parse_args()
+
+    ausgangsverzeichnis = os.getcwd()
+    bericht = lasttest(args)
+    os.chdir(ausgangsverzeichnis)
+
+    pfad = args.bericht or f"lasttest_{datetime.datetime.now():%Y%m%d-%H%M%S}.json"
+    with open(pfad, "w", encoding="utf-8") as f:
+        json.dump(bericht, f, ensure_ascii=False, indent=2)
+
+    alt = None
+    if args.vergleich:
+        with open(args.vergleich, encoding="utf-8") as f:
+            alt = json.load(f)
+    bericht_ausgeben(bericht, alt)
+    if bericht["fehler"]["anzahl"]:
+        print("Fehler (Beispiele):", *bericht["fehler"]["beispiele"], sep="\n  ")
+    print(f"Bericht gespeichert: {pfad}")
+
+
+if __name__ == "__main__":
+    main()
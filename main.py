@@ -1,16 +1,35 @@
 import base64  # zum kodieren/decodieren der Json Daten
+import bisect  # sortierte Temperaturen der Klimanormalen
+import copy  # flache Kopien der geteilten Datenobjekte pro Session
 import datetime  # Datum & Uhrzeit
+import functools  # Metadaten der Cache-Funktionen erhalten
+import hashlib  # Git-Blob-SHA berechnen
 import json  # Laden und Speichern
+import os  # Dateien atomar ersetzen
 import random  # für die Zufallswerte
+import re  # Dateinamen für Standort-Partitionen
+import tempfile  # temporäre Dateien für atomares Schreiben
+import threading  # Sperren für gemeinsam genutzte Caches
+import time  # Zeitstempel für Cache-Ablauf
 import traceback  # für Fehlermeldungungen im Debug Modus
 import uuid  # für eindeutige ID´s
+import multiprocessing  # Prozesse für die Diagramm-Erstellung ("spawn")
+from concurrent.futures import Future  # gebündelte, parallele Anfragen
+from concurrent.futures import ProcessPoolExecutor  # Diagramme parallel erzeugen
+from concurrent.futures import ThreadPoolExecutor  # Uploads im Hintergrund
+from concurrent.futures import as_completed  # Diagramme in Fertigstellungsreihenfolge
 from enum import Enum  # Quelle der Wetterdaten
-import matplotlib.pyplot as plt  # für Diagramme
+import altair as alt  # interaktive Diagramme (Vega-Lite, im Browser gerendert)
 import numpy as np  # mathematische Berechnungen
 import pandas as pd  # für Tabellen und Daten
 import requests  # für HTTP- Anfragen
 import streamlit as st  # Web-App-Oberfläche
 
+import diagramme  # Matplotlib-Diagramme als PNG (auch in Worker-Prozessen)
+import sonne  # astronomische Tageslänge und Sonnenstunden-Schätzung (ohne API)
+from diagramme import LANGZEIT_WERTE, MONATSNAMEN  # gemeinsame Beschriftungen
+from gemeinsame_ablage import ablage_oeffnen  # gemeinsamer Cache mehrerer Server-Prozesse
+
 
 # Quelle der Wetterdaten (Enum für bessere Übersicht und Sicherheit)
 class Quelle(Enum):
@@ -37,13 +56,631 @@ Variablen:
     GITHUB_BRANCH: Branch, aus dem die Daten geladen werden (Standard: "main").
     GITHUB_TOKEN: Persönlicher Zugriffstoken für Authentifizierung.
     GITHUB_JSON_PATH: Pfad zur JSON-Datei mit den Wetterdaten im Repository.
+    GITHUB_API_URL: Basis-URL der GitHub-API (z. B. der lokale Stub für Lasttests).
     """
 
 
 GITHUB_REPO = st.secrets["Legacy91988"]["Wetterweiser"]
 GITHUB_BRANCH = st.secrets["Legacy91988"].get("branch", "main")
 GITHUB_TOKEN = st.secrets["Legacy91988"]["github_token"]
-GITHUB_JSON_PATH = "wetterdaten.json"
+GITHUB_API_URL = st.secrets["Legacy91988"].get("github_api_url", "https://api.github.com")
+GITHUB_JSON_PATH = "wetterdaten.json"  # bisherige Ablage: alle Messungen in einer Datei
+# Partitionierte Ablage: eine Datei pro Standort plus ein kleines Manifest
+PARTITION_VERZEICHNIS = "wetterdaten"
+MANIFEST_PATH = f"{PARTITION_VERZEICHNIS}/manifest.json"
+STUNDEN_PFAD = "stundenwerte.json"  # bisherige Ablage der Stundenwerte (wird beim Speichern migriert)
+# Stündliche Beobachtungen: eine Datei pro Standort und Monat plus Manifest
+STUNDEN_VERZEICHNIS = "stundenwerte"
+STUNDEN_MANIFEST_PFAD = f"{STUNDEN_VERZEICHNIS}/manifest.json"
+EXPORT_MAX_VERSUCHE = 5  # Versuche bei SHA-Konflikten (409)
+EXPORT_BACKOFF_SEKUNDEN = 0.5  # Basis für exponentiellen Backoff
+
+
+def daten_serialisieren(daten):
+    """
+    Serialisiert Einträge genau einmal in einen kompakten UTF-8-Puffer.
+
+    Derselbe Puffer wird für die lokale Datei, die Debug-Anzeige und den Upload verwendet.
+    """
+    return json.dumps(daten, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def git_blob_sha(inhalt):
+    """
+    Berechnet die Git-Blob-SHA eines Dateiinhalts – dieselbe SHA, die GitHub für die Datei meldet.
+    """
+    return hashlib.sha1(b"blob %d\0" % len(inhalt) + inhalt).hexdigest()
+
+
+def standort_dateiname(standort):
+    """
+    Dateiname eines Standorts, z. B. "Berlin-1a2b3c4d".
+    Der Hash-Anhang hält Dateinamen eindeutig, auch wenn Sonderzeichen ersetzt werden.
+    """
+    standort = standort or ""
+    name = re.sub(r"[^0-9A-Za-z_-]+", "_", standort).strip("_")[:40] or "ohne_standort"
+    kennung = hashlib.sha1(standort.encode("utf-8")).hexdigest()[:8]
+    return f"{name}-{kennung}"
+
+
+def partition_pfad(standort):
+    """Pfad der Partition eines Standorts, z. B. "wetterdaten/Berlin-1a2b3c4d.json"."""
+    return f"{PARTITION_VERZEICHNIS}/{standort_dateiname(standort)}.json"
+
+
+def stunden_partition_pfad(standort, monat):
+    """Pfad der Stundenwerte eines Standorts in einem Monat, z. B. "stundenwerte/Berlin-1a2b3c4d/2025-03.json"."""
+    return f"{STUNDEN_VERZEICHNIS}/{standort_dateiname(standort)}/{monat}.json"
+
+
+def partition_info(pfad, daten, inhalt):
+    """Manifest-Eintrag einer Partition: Pfad, Anzahl, Zeitraum und Git-Blob-SHA."""
+    tage = [e["Datum"][:10] for e in daten if e.get("Datum")]
+    return {
+        "pfad": pfad,
+        "anzahl": len(daten),
+        "von": min(tage) if tage else None,
+        "bis": max(tage) if tage else None,
+        "sha": git_blob_sha(inhalt),
+    }
+
+
+def stunden_partition_info(pfad, daten, inhalt):
+    """Manifest-Eintrag einer Monatsdatei der Stundenwerte: Pfad, Anzahl Stunden und Git-Blob-SHA."""
+    return {
+        "pfad": pfad,
+        "anzahl": sum(len(reihe.get("Stunde", [])) for reihe in daten.values()),
+        "sha": git_blob_sha(inhalt),
+    }
+
+
+def datei_atomar_schreiben(pfad, inhalt):
+    """
+    Schreibt `inhalt` (bytes) in eine temporäre Datei und benennt sie dann um.
+    Leser sehen so immer entweder die alte oder die vollständige neue Datei.
+    """
+    verzeichnis = os.path.dirname(os.path.abspath(pfad))
+    os.makedirs(verzeichnis, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=verzeichnis, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(inhalt)
+        # mkstemp legt die Datei mit 0600 an – Rechte der bisherigen Datei übernehmen
+        try:
+            os.chmod(tmp, os.stat(pfad).st_mode & 0o777)
+        except FileNotFoundError:
+            os.chmod(tmp, 0o644)
+        os.replace(tmp, pfad)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def github_datei_laden(pfad=GITHUB_JSON_PATH):
+    """
+    Lädt eine Datei über die GitHub-Contents-API.
+
+    Parameter:
+        pfad (str): Pfad der Datei im Repository.
+
+    Rückgabe:
+        tuple: (inhalt, sha) – dekodierter Dateiinhalt als bytes und die SHA der Datei.
+               Existiert die Datei noch nicht, wird (None, None) zurückgegeben.
+
+    Fehler:
+        requests.RequestException: Netzwerk- oder HTTP-Fehler.
+        ValueError: Antwort enthält keinen Dateiinhalt (z. B. Fehlermeldung der API) oder
+            die Datei hat sich zwischen den beiden Abrufen einer großen Datei geändert.
+
+    Hinweise:
+        - Dateien über 1 MB liefert die Contents-API ohne Inhalt (`encoding: "none"`);
+          sie werden dann über den Raw-Medientyp nachgeladen und gegen die SHA geprüft.
+    """
+    url = f"{GITHUB_API_URL}/repos/{GITHUB_REPO}/contents/{pfad}?ref={GITHUB_BRANCH}"
+    headers = {"Authorization": f"token {GITHUB_TOKEN}"} if GITHUB_TOKEN else {}
+
+    response = requests.get(url, headers=headers, timeout=5)
+    if response.status_code == 404:
+        return None, None
+    response.raise_for_status()
+    data_json = response.json()
+
+    if "content" not in data_json:
+        raise ValueError(
+            data_json.get("message", "Unbekannter Fehler beim Laden der Daten.")
+        )
+    if data_json.get("encoding") == "none":
+        roh = requests.get(
+            url, headers={**headers, "Accept": "application/vnd.github.raw+json"}, timeout=30
+        )
+        roh.raise_for_status()
+        if git_blob_sha(roh.content) != data_json.get("sha"):
+            raise ValueError(f"{pfad} wurde während des Ladens geändert")
+        return roh.content, data_json.get("sha")
+    return base64.b64decode(data_json["content"]), data_json.get("sha")
+
+
+def github_datei_schreiben(inhalt, sha=None, pfad=GITHUB_JSON_PATH):
+    """
+    Schreibt eine Datei über die GitHub-Contents-API (PUT).
+
+    Parameter:
+        inhalt (bytes): Neuer Dateiinhalt.
+        sha (str|None): SHA der aktuellen Datei auf GitHub; None, wenn die Datei neu ist.
+        pfad (str): Pfad der Datei im Repository.
+
+    Rückgabe:
+        requests.Response: Antwort der GitHub-API (200/201 bei Erfolg).
+    """
+    url = f"{GITHUB_API_URL}/repos/{GITHUB_REPO}/contents/{pfad}"
+    headers = {"Authorization": f"token {GITHUB_TOKEN}"} if GITHUB_TOKEN else {}
+
+    payload = {
+        "message": "Update Wetterdaten",
+        "branch": GITHUB_BRANCH,
+        "content": base64.b64encode(inhalt).decode(),
+    }
+    if sha:
+        payload["sha"] = sha  # SHA nur hinzufügen, wenn Datei existiert
+
+    return requests.put(url, headers=headers, data=json.dumps(payload), timeout=30)
+
+
+def github_konfliktfrei_schreiben(pfad, zusammenfuehren):
+    """
+    Lädt `pfad`, führt per `zusammenfuehren(remote)` zusammen und lädt mit der geladenen SHA hoch.
+
+    Parameter:
+        pfad (str): Datei im Repository.
+        zusammenfuehren (callable): Remote-Inhalt (geparstes JSON oder None) -> neue Daten.
+
+    Rückgabe:
+        tuple: (Antwort, zusammengeführte Daten, serialisierter Inhalt). Status 304, wenn der
+        Inhalt bereits identisch auf GitHub liegt (kein PUT).
+
+    Fehler:
+        ValueError: Die Datei existiert, aber GitHub liefert keinen Inhalt (nur 404 gilt als
+        "noch nicht vorhanden").
+
+    Hinweise:
+        - Bei einem SHA-Konflikt (409) wird mit Backoff neu geladen und erneut zusammengeführt.
+    """
+    for versuch in range(1, EXPORT_MAX_VERSUCHE + 1):
+        inhalt, sha = github_datei_laden(pfad)
+        if inhalt is None:
+            remote = None  # 404: Datei existiert noch nicht
+        elif not inhalt:
+            # Leerer Inhalt ist kein "neu anlegen" – sonst überschriebe der PUT die Remote-Datei
+            raise ValueError(f"{pfad}: GitHub lieferte einen leeren Dateiinhalt")
+        else:
+            remote = json.loads(inhalt.decode("utf-8"))
+        daten = zusammenfuehren(remote)
+        neu = daten_serialisieren(daten)
+
+        if sha is not None and git_blob_sha(neu) == sha:
+            # Inhalt ist bereits identisch auf GitHub -> kein PUT nötig
+            resp = requests.Response()
+            resp.status_code = 304
+        else:
+            resp = github_datei_schreiben(neu, sha, pfad=pfad)
+
+        if resp.status_code != 409 or versuch == EXPORT_MAX_VERSUCHE:
+            return resp, daten, neu
+
+        # SHA-Konflikt: jemand anderes hat geschrieben -> neu laden und erneut zusammenführen
+        wartezeit = EXPORT_BACKOFF_SEKUNDEN * 2 ** (versuch - 1)
+        time.sleep(wartezeit + random.uniform(0, wartezeit))
+    return resp, daten, neu
+
+
+class UploadHandle:
+    """
+    Status eines Hintergrund-Uploads.
+
+    Attribute:
+        pfad (str): Zieldatei im Repository.
+        beschreibung (str): Kurzbeschreibung für die Anzeige.
+        paket (WetterDaten): Die hochzuladenden Änderungen (für einen erneuten Versuch).
+        gestartet (float): Zeitstempel des Auftrags.
+        beendet (float|None): Zeitstempel des Abschlusses; setzt der Upload-Thread, bevor
+            das Future als erledigt gilt.
+        future (Future|None): Ergebnis des Uploads (setzt `UploadManager.starten`).
+    """
+
+    def __init__(self, pfad, beschreibung, paket):
+        self.pfad = pfad
+        self.beschreibung = beschreibung
+        self.paket = paket
+        self.gestartet = time.time()
+        self.beendet = None
+        self.debug = False
+        self.future = None
+
+    def status(self):
+        """'laeuft', 'erfolgreich' oder 'fehlgeschlagen'."""
+        if not self.future.done():
+            return "laeuft"
+        if self.future.exception() is None and self.future.result().status_code in [
+            200,
+            201,
+            304,
+        ]:
+            return "erfolgreich"
+        return "fehlgeschlagen"
+
+    def meldung(self):
+        """Fehlermeldung eines fehlgeschlagenen Uploads (sonst leer)."""
+        if not self.future.done() or self.status() == "erfolgreich":
+            return ""
+        fehler = self.future.exception()
+        if fehler is not None:
+            return f"Fehler beim Zugriff auf GitHub: {fehler}"
+        resp = self.future.result()
+        if resp.status_code == 409:
+            return "GitHub-Update nach mehreren Versuchen abgelehnt (gleichzeitige Änderungen)."
+        return f"Fehler beim GitHub-Update: {resp.status_code} – {resp.text}"
+
+
+class UploadManager:
+    """
+    Führt GitHub-Uploads im Hintergrund aus, damit das Speichern die Oberfläche nicht blockiert.
+
+    Pro Zieldatei gibt es genau einen Worker-Thread: Uploads auf dieselbe Datei laufen
+    nacheinander und konkurrieren so nie um dieselbe SHA.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ausfuehrer = {}  # Pfad -> ThreadPoolExecutor mit einem Worker
+
+    def starten(self, paket, pfad=GITHUB_JSON_PATH, beschreibung="Wetterdaten"):
+        """
+        Reiht den Upload der Änderungen in `paket` ein und kehrt sofort zurück.
+
+        Rückgabe:
+            UploadHandle: Status des Uploads.
+        """
+        with self._lock:
+            ausfuehrer = self._ausfuehrer.get(pfad)
+            if ausfuehrer is None:
+                ausfuehrer = self._ausfuehrer[pfad] = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix=f"upload-{pfad}"
+                )
+        speicher = speicher_je_ablage()
+
+        handle = UploadHandle(pfad, beschreibung, paket)
+
+        def hochladen():
+            try:
+                resp = paket.github_speichern()
+                if resp.status_code in [200, 201, 304]:
+                    # eigener Stand sofort sichtbar
+                    speicher[paket.nutzlast_pfad].uebernehmen(paket.nutzlast)
+                return resp
+            finally:
+                # vor dem Abschluss des Futures (ein done-Callback liefe evtl. erst danach)
+                handle.beendet = time.time()
+
+        handle.future = ausfuehrer.submit(hochladen)
+        return handle
+
+
+DATEN_TTL = 300  # Sekunden, nach denen der Stand im Hintergrund mit GitHub abgeglichen wird
+
+# Gemeinsame Ablage für mehrere Server-Prozesse, z. B. "sqlite:///.wetterweiser_ablage.db"
+# oder "redis://localhost:6379/0" (leer = jeder Prozess lädt und rechnet für sich)
+GEMEINSAME_ABLAGE_URL = st.secrets["Legacy91988"].get("gemeinsame_ablage", "")
+
+
+@st.cache_resource
+def gemeinsame_ablage():
+    """
+    Die gemeinsame Ablage (`gemeinsame_ablage.Ablage`) oder None, wenn keine konfiguriert ist.
+    Eine Verbindung pro Server-Prozess; Schlüssel enthalten immer die Datenversion.
+    """
+    return ablage_oeffnen(GEMEINSAME_ABLAGE_URL)
+
+
+class DatenSpeicher:
+    """
+    Gemeinsamer Datenstand pro Server-Prozess (Stale-while-revalidate).
+
+    Beim Start wird sofort der lokale Schnappschuss (`wetterdaten.json` bzw. das Manifest
+    der Partitionen) gelesen. Der Abgleich
+    mit GitHub läuft in einem Hintergrund-Thread; ein neuerer Stand wird atomar ausgetauscht
+    und wieder lokal gespeichert, damit der nächste Start schon aktuell ist.
+
+    Mit gemeinsamer Ablage (`ablage`) fragt pro TTL nur ein Prozess bei GitHub nach und legt
+    den Inhalt unter seiner Git-Blob-SHA ab; die anderen Prozesse übernehmen ihn von dort.
+
+    Attribute:
+        geprueft (float): Zeitpunkt des letzten Abgleichversuchs mit GitHub.
+        fehler (str|None): Fehlermeldung des letzten fehlgeschlagenen Abgleichs.
+    """
+
+    def __init__(self, datei=GITHUB_JSON_PATH, ttl_sekunden=DATEN_TTL, ablage=None):
+        self.datei = datei
+        self.ttl_sekunden = ttl_sekunden
+        self.ablage = ablage
+        self.geprueft = 0.0
+        self.fehler = None
+        self._lock = threading.Lock()
+        self._laeuft = False
+        # (Version = Git-Blob-SHA, Einträge, Zeitpunkt des Stands, Quelle "lokal"/"github")
+        self._stand = (None, [], None, None)
+        self._generation = 0  # zählt übernommene Stände (erkennt Abrufe, die inzwischen überholt sind)
+        self._lokal_laden()
+
+    def _lokal_laden(self):
+        try:
+            with open(self.datei, "rb") as f:
+                inhalt = f.read()
+            eintraege = json.loads(inhalt.decode("utf-8"))
+        except (OSError, ValueError):
+            return
+        self._stand = (git_blob_sha(inhalt), eintraege, os.path.getmtime(self.datei), "lokal")
+
+    def schnappschuss(self):
+        """Gibt (version, eintraege, zeitpunkt, quelle) des aktuellen Stands zurück."""
+        with self._lock:
+            return self._stand
+
+    def uebernehmen(self, inhalt, eintraege=None, zeitpunkt=None, teilen=True, generation=None):
+        """
+        Tauscht den Stand gegen einen frisch von/zu GitHub übertragenen Inhalt aus.
+        Mit `teilen` wird er auch in der gemeinsamen Ablage abgelegt.
+
+        Parameter:
+            generation (int|None): Nur austauschen, wenn seitdem kein anderer Stand übernommen
+                wurde (Wert von `_generation` vor dem Abruf).
+
+        Rückgabe:
+            bool: False, wenn der Inhalt wegen eines neueren Stands verworfen wurde.
+        """
+        if eintraege is None:
+            eintraege = json.loads(inhalt.decode("utf-8"))
+        version = git_blob_sha(inhalt)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return False
+            self._stand = (version, eintraege, zeitpunkt or time.time(), "github")
+            self._generation += 1
+            self.geprueft = time.time()
+            self.fehler = None
+        if teilen:
+            self._teilen(version, inhalt)
+        return True
+
+    def _teilen(self, version, inhalt=None):
+        # Inhalt nach SHA, dazu der Stand (SHA + Zeitpunkt des GitHub-Abgleichs) pro Datei
+        if self.ablage is None:
+            return
+        if inhalt is not None:
+            self.ablage.setzen(f"datei:{version}", inhalt)
+        self.ablage.objekt_setzen(f"stand:{self.datei}", (version, time.time()))
+
+    def _aus_ablage_uebernehmen(self):
+        """
+        Übernimmt den Stand, den ein anderer Prozess in der gemeinsamen Ablage hinterlegt hat.
+
+        Rückgabe:
+            tuple[bool, str|None]: (übernommen – kein GitHub-Abruf nötig, Marke der Sperre für
+            den Abruf oder None).
+
+        Hinweise:
+            - Ist der abgelegte Stand älter als die TTL, gleicht der Prozess mit der Sperre
+              mit GitHub ab; die anderen zeigen bis dahin den abgelegten Stand und sehen
+              kurz darauf wieder nach.
+        """
+        treffer = self.ablage.objekt_holen(f"stand:{self.datei}")
+        frisch = treffer is not None and time.time() - treffer[0][1] < self.ttl_sekunden
+        if not frisch:
+            marke = self.ablage.sperren(f"abgleich:{self.datei}")
+            if marke is not None:
+                return False, marke
+        if treffer is None:
+            return False, None
+
+        version, zeitpunkt = treffer[0]
+        with self._lock:
+            eigene_version = self._stand[0]
+        if version != eigene_version:
+            inhalt = self.ablage.holen(f"datei:{version}")
+            if inhalt is None or git_blob_sha(inhalt) != version:
+                return False, None
+            self.uebernehmen(inhalt, zeitpunkt=zeitpunkt, teilen=False)
+            try:
+                datei_atomar_schreiben(self.datei, inhalt)
+            except OSError:
+                pass
+        with self._lock:
+            self._stand = self._stand[:2] + (zeitpunkt, "github")
+            self.fehler = None
+            # veralteter Stand: bald erneut nachsehen, ob der andere Prozess fertig ist
+            self.geprueft = zeitpunkt if frisch else time.time() - self.ttl_sekunden + 30
+        return True, None
+
+    def aktualisieren(self):
+        """Gleicht den Stand blockierend mit GitHub ab (Fehler werden in `fehler` vermerkt)."""
+        marke = None
+        if self.ablage is not None:
+            uebernommen, marke = self._aus_ablage_uebernehmen()
+            if uebernommen:
+                return
+        try:
+            self._von_github_laden()
+        finally:
+            if marke is not None:
+                self.ablage.freigeben(f"abgleich:{self.datei}", marke)
+
+    def _von_github_laden(self):
+        # Hat während des Abrufs z. B. ein Upload einen neueren Stand übernommen, ist die
+        # Antwort veraltet und wird verworfen (weder übernommen noch lokal oder geteilt).
+        with self._lock:
+            generation = self._generation
+        try:
+            inhalt, sha = github_datei_laden(self.datei)
+        except Exception as e:
+            with self._lock:
+                if self._generation == generation:
+                    self.fehler = str(e)
+                    # nach einem Fehler früher erneut versuchen
+                    self.geprueft = time.time() - self.ttl_sekunden + 30
+            return
+
+        if inhalt is None:
+            with self._lock:
+                self.geprueft = time.time()
+            return
+        with self._lock:
+            if self._generation != generation:
+                return
+            version, eintraege, _, _ = self._stand
+            unveraendert = version == sha
+            if unveraendert:
+                self._stand = (version, eintraege, time.time(), "github")
+                self.geprueft = time.time()
+                self.fehler = None
+        if unveraendert:
+            self._teilen(sha, inhalt)
+            return
+        if not self.uebernehmen(inhalt, generation=generation):
+            return
+        try:
+            datei_atomar_schreiben(self.datei, inhalt)
+        except OSError:
+            pass
+
+    def im_hintergrund_aktualisieren(self):
+        """Startet einen Abgleich im Hintergrund, falls der Stand älter als die TTL ist."""
+        with self._lock:
+            if self._laeuft or time.time() - self.geprueft < self.ttl_sekunden:
+                return
+            self._laeuft = True
+
+        def lauf():
+            try:
+                self.aktualisieren()
+            finally:
+                with self._lock:
+                    self._laeuft = False
+
+        threading.Thread(target=lauf, daemon=True, name="daten-abgleich").start()
+
+
+@st.cache_resource
+def daten_speicher():
+    """Ein gemeinsamer Datenstand pro Server-Prozess (für alle Sessions)."""
+    return DatenSpeicher(ablage=gemeinsame_ablage())
+
+
+@st.cache_resource
+def manifest_speicher():
+    """Gemeinsames Manifest der Standort-Partitionen pro Server-Prozess."""
+    return DatenSpeicher(MANIFEST_PATH, ablage=gemeinsame_ablage())
+
+
+@st.cache_resource
+def stunden_speicher():
+    """Gemeinsames Manifest der Stundenwerte (Monatsdateien pro Standort) pro Server-Prozess."""
+    return DatenSpeicher(STUNDEN_MANIFEST_PFAD, ablage=gemeinsame_ablage())
+
+
+@st.cache_resource
+def stunden_alt_speicher():
+    """Bisherige `stundenwerte.json` (nur gelesen, solange es noch kein Manifest gibt)."""
+    return DatenSpeicher(STUNDEN_PFAD, ablage=gemeinsame_ablage())
+
+
+def speicher_je_ablage():
+    """Datenstand des Prozesses je Ablage (ganze Datei bzw. Manifest der Partitionen)."""
+    return {
+        GITHUB_JSON_PATH: daten_speicher(),
+        MANIFEST_PATH: manifest_speicher(),
+        STUNDEN_MANIFEST_PFAD: stunden_speicher(),
+    }
+
+
+class PartitionCache:
+    """
+    Lädt Standort-Partitionen erst beim ersten Zugriff und hält sie im Speicher.
+
+    Funktionsweise:
+        - Schlüssel ist der Pfad, gültig ist ein Eintrag nur für die SHA aus dem Manifest;
+          ein neues Manifest macht geänderte Partitionen so automatisch ungültig.
+        - Passt die lokale Kopie zur SHA, wird nichts heruntergeladen.
+        - Sonst kommt die Datei aus der gemeinsamen Ablage (`ablage`, Schlüssel = SHA) oder
+          von GitHub und wird lokal gespiegelt. Ist GitHub nicht erreichbar, wird die
+          (ältere) lokale Kopie verwendet und `fehler` gesetzt.
+    """
+
+    def __init__(self, ablage=None):
+        self.ablage = ablage
+        self._lock = threading.Lock()
+        self._daten = {}  # Pfad -> (SHA laut Manifest, Einträge)
+        self.fehler = None
+
+    def laden(self, info):
+        """
+        Liefert die Einträge der Partition zum Manifest-Eintrag `info` (pfad, sha).
+        """
+        pfad, sha = info["pfad"], info.get("sha")
+        with self._lock:
+            treffer = self._daten.get(pfad)
+        if treffer is not None and treffer[0] == sha:
+            return treffer[1]
+
+        try:
+            with open(pfad, "rb") as f:
+                lokal = f.read()
+        except OSError:
+            lokal = None
+        inhalt, aktuell = lokal, lokal is not None and git_blob_sha(lokal) == sha
+        if not aktuell and self.ablage is not None and sha:
+            geteilt = self.ablage.holen(f"datei:{sha}")
+            if geteilt is not None and git_blob_sha(geteilt) == sha:
+                inhalt, aktuell = geteilt, True
+                try:
+                    datei_atomar_schreiben(pfad, inhalt)
+                except OSError:
+                    pass
+        if not aktuell:
+            try:
+                inhalt, _ = github_datei_laden(pfad)
+            except Exception as e:
+                self.fehler = str(e)
+            else:
+                aktuell = True
+                if inhalt is not None:
+                    if self.ablage is not None:
+                        self.ablage.setzen(f"datei:{git_blob_sha(inhalt)}", inhalt)
+                    try:
+                        datei_atomar_schreiben(pfad, inhalt)
+                    except OSError:
+                        pass
+
+        eintraege = json.loads(inhalt.decode("utf-8")) if inhalt else []
+        if aktuell:
+            with self._lock:
+                self._daten[pfad] = (sha, eintraege)
+        return eintraege
+
+
+@st.cache_resource
+def partition_cache():
+    """Ein gemeinsamer Partitions-Cache pro Server-Prozess (für alle Sessions)."""
+    return PartitionCache(gemeinsame_ablage())
+
+
+def partition_laden(standort, info):
+    """Lader für `WetterDaten.partitionen_setzen`: Einträge einer Standort-Partition."""
+    return partition_cache().laden(info)
+
+
+@st.cache_resource
+def upload_manager():
+    """Ein gemeinsamer Upload-Manager pro Server-Prozess (für alle Sessions)."""
+    return UploadManager()
 
 
 class WetterMessung:
@@ -57,7 +694,7 @@ class WetterMessung:
         temp_min (float|None): Minimale Temperatur
         temp_max (float|None): Maximale Temperatur
         niederschlag (float): Niederschlag in mm
-        sonnenstunden (float): Sonnenstunden (falls None, wird zufällig erzeugt)
+        sonnenstunden (float): Sonnenstunden (falls None, aus Tageslänge von Standort und Datum geschätzt)
         quelle (str): Herkunft der Daten ("manuell", "simuliert", "live")
         standort (str): Ort der Messung
     """
@@ -81,9 +718,10 @@ class WetterMessung:
         self.sonnenstunden = (
             sonnenstunden
             if sonnenstunden is not None
-            else round(random.uniform(0, 12), 1)
+            else sonne.sonnenstunden_schaetzen(standort_breite(standort), self.datum)
         )
-        self.quelle = quelle.value if isinstance(quelle, Quelle) else quelle
+        # getattr statt isinstance: auch Enum-Werte eines früheren Skriptlaufs (geteilte Objekte)
+        self.quelle = getattr(quelle, "value", quelle)
         self.standort = standort
 
         # min/max Temperaturen speichern
@@ -127,167 +765,1476 @@ class WetterMessung:
         }
 
 
-class WetterDaten:
+def temperaturen_reparieren(temp_min, temp_max, temperatur):
     """
-    Verwaltung mehrerer Wettermessungen
+    Repariert alte Einträge: fehlen Temp_min/Temp_max, wird die Temperatur eingesetzt.
 
-    Speichert, fügt hinzu, ersetzt, löscht und wandelt Messungen in DataFrames um.
-    """
+    Funktioniert für Einzelwerte und vektorisiert für pandas Series (CSV-Import).
 
-    def __init__(self):
-        self.messungen = []  # Liste aller Messung
+    Rückgabe:
+        tuple: (temp_min, temp_max)
+    """
+    if isinstance(temperatur, pd.Series):
+        return temp_min.fillna(temperatur), temp_max.fillna(temperatur)
+    if (temp_min is None or temp_max is None) and temperatur is not None:
+        temp_min = temp_min if temp_min is not None else temperatur
+        temp_max = temp_max if temp_max is not None else temperatur
+    return temp_min, temp_max
+
+
+# Vorlagen für den CSV-Import (Quellspalte -> Spalte in Wetterweiser)
+CSV_FORMATE = {
+    # eigener Export aus download_wetterdaten_csv
+    "wetterweiser": {
+        "spalten": {},
+        "trennzeichen": ",",
+        "datum_format": None,
+        "fehlwerte": [],
+        "einheiten": {},
+    },
+    # DWD Tageswerte (produkt_klima_tag_*.txt)
+    "dwd": {
+        "spalten": {
+            "STATIONS_ID": "Standort",
+            "MESS_DATUM": "Datum",
+            "TMK": "Temperatur",
+            "TNK": "Temp_min",
+            "TXK": "Temp_max",
+            "RSK": "Niederschlag",
+            "SDK": "Sonnenstunden",
+        },
+        "trennzeichen": ";",
+        "datum_format": "%Y%m%d",
+        "fehlwerte": [-999],
+        "einheiten": {},
+    },
+}
+
+# Umrechnungen in die Einheiten von Wetterweiser (°C, mm, h)
+EINHEITEN = {
+    "°C": lambda s: s,
+    "0.1°C": lambda s: s / 10,
+    "°F": lambda s: (s - 32) * 5 / 9,
+    "K": lambda s: s - 273.15,
+    "mm": lambda s: s,
+    "0.1mm": lambda s: s / 10,
+    "in": lambda s: s * 25.4,
+    "h": lambda s: s,
+    "min": lambda s: s / 60,
+}
+
+MESSWERT_SPALTEN = ["Temperatur", "Temp_min", "Temp_max", "Niederschlag", "Sonnenstunden"]
+# Spalten von `WetterMessung.als_dict` bzw. `WetterDaten.als_dataframe`
+MESSUNG_SPALTEN = [
+    "ID", "Datum", "Temperatur", "Niederschlag", "Sonnenstunden", "Quelle", "Standort",
+    "Temp_min", "Temp_max",
+]
+
+# Plausible Wertebereiche für die manuelle Eingabe (°C, mm, h)
+EINGABE_GRENZEN = {
+    "Temp_min": (-90.0, 60.0),
+    "Temp_max": (-90.0, 60.0),
+    "Niederschlag": (0.0, 500.0),
+    "Sonnenstunden": (0.0, 24.0),
+}
+
+
+def eingabe_pruefen(df):
+    """
+    Prüft eine Eingabetabelle (z. B. aus dem Data-Editor) vektorisiert auf Fehler.
 
-    def hinzufuegen(self, messung: WetterMessung):
-        """
-        Fügt eine Wettermessung zur Liste hinzu
-        """
-        self.messungen.append(messung)
+    Parameter:
+        df (pd.DataFrame): Spalten Datum, Temp_min, Temp_max, Niederschlag, Sonnenstunden, Standort.
 
-    # prüfen ob für einen Ort oder Datum ein Eintrag existiert
-    def existiert_eintrag(self, datum, standort):
-        for m in self.messungen:
-            if m.standort == standort and m.datum.date() == datum.date():
-                return True
-        return False
+    Rückgabe:
+        tuple[pd.DataFrame, pd.DataFrame]:
+            - normalisierte Daten (Datum als Timestamp, Messwerte als float, Standort ohne Leerzeichen)
+            - Fehlerbericht mit den Spalten Zeile (1-basiert), Spalte, Fehler; leer, wenn alles gültig ist
 
-    def ersetze_eintrag(self, datum, standort, neue_messung):
-        """
-        Prüft, ob bereits eine Wettermessung für ein bestimmtes Datum und einen bestimmten Ort existiert
+    Hinweise:
+        - Geprüft werden Datum, Zahlenformat, EINGABE_GRENZEN, Temp_min ≤ Temp_max,
+          fehlender Standort und doppelte Standort/Tag-Kombinationen innerhalb der Eingabe.
+        - Komplett leere Zeilen werden ignoriert.
+    """
+    zeilen = pd.Series(np.arange(1, len(df) + 1), index=df.index)  # Zeilennummern im Editor
+    df = df.dropna(how="all")
+    daten = pd.DataFrame(index=df.index)
+    pruefungen = []
+
+    # Datum: ISO (Editor, 2025-03-01) oder deutsch (01.03.2025)
+    roh = df.get("Datum", pd.Series(None, index=df.index, dtype=object))
+    datum = pd.to_datetime(roh, errors="coerce", format="ISO8601")
+    deutsch = pd.to_datetime(roh.astype(str).str.strip(), errors="coerce", format="%d.%m.%Y")
+    daten["Datum"] = datum.fillna(deutsch)
+    pruefungen.append((daten["Datum"].isna(), "Datum", "fehlt oder ungültig"))
+
+    for spalte, (unten, oben) in EINGABE_GRENZEN.items():
+        roh = df.get(spalte, pd.Series(None, index=df.index, dtype=object))
+        werte = pd.to_numeric(roh, errors="coerce")
+        leer = roh.isna() | (roh.astype(str).str.strip() == "")
+        pruefungen.append((werte.isna() & ~leer, spalte, "keine Zahl"))
+        pruefungen.append(
+            (werte.notna() & ~werte.between(unten, oben), spalte, f"außerhalb {unten:g} bis {oben:g}")
+        )
+        daten[spalte] = werte.astype(float)
+    pruefungen.append(
+        (daten["Temp_min"] > daten["Temp_max"], "Temp_min", "größer als Temp_max")
+    )
 
-        Args:
-            datum (datetime-like): Das Datum der zu prüfenden Messung.
-            standort (str): Der Name des Standorts.
+    standort = df.get("Standort", pd.Series(None, index=df.index, dtype=object))
+    daten["Standort"] = standort.fillna("").astype(str).str.strip()
+    ohne_standort = daten["Standort"] == ""
+    pruefungen.append((ohne_standort, "Standort", "fehlt"))
 
-        Returns:
-            bool: True, wenn ein Eintrag existiert, sonst False.
-        """
+    tage = pd.DataFrame({"s": daten["Standort"], "t": daten["Datum"].dt.normalize()})
+    doppelt = tage.duplicated(keep=False) & daten["Datum"].notna() & ~ohne_standort
+    pruefungen.append((doppelt, "Standort", "Standort/Tag mehrfach in der Eingabe"))
 
-        # alte Messung entfernen
-        self.messungen = [
-            m
-            for m in self.messungen
-            if not (m.standort == standort and m.datum.date() == datum.date())
+    fehler = pd.concat(
+        [
+            pd.DataFrame({"Zeile": zeilen[maske[maske].index], "Spalte": spalte, "Fehler": text})
+            for maske, spalte, text in pruefungen
+            if maske.any()
         ]
-        # neue Messung hinzufügen
-        self.hinzufuegen(neue_messung)
+        or [pd.DataFrame(columns=["Zeile", "Spalte", "Fehler"])],
+        ignore_index=True,
+    )
+    daten = daten.reset_index(drop=True)
+    return daten, fehler.sort_values("Zeile", kind="stable").reset_index(drop=True)
 
-    def als_dataframe(self):
-        """
-        Wandelt alle gespeicherten Wettermessungen in ein pandas DataFrame um
-        DataFrame mit allen Messungen, sortiert nach Datum
-        Spalten: ID, Datum, Temperatur, Temp_min, Temp_max,
-        Niederschlag, Sonnenstunden, Quelle, Standort
-        """
 
-        df = pd.DataFrame([m.als_dict() for m in self.messungen])
-        if not df.empty:
-            df["Datum"] = pd.to_datetime(df["Datum"])
-            df = df.sort_values("Datum")  # nach Datum sortieren
-        return df
+# Spalten der Stundenwerte (Reihenfolge der Werte-Matrix)
+STUNDEN_WERTE = ["Temperatur", "Niederschlag", "Sonnenstunden"]
 
-    def loeschen(self, messung_id):
+
+class StundenWerte:
+    """
+    Stündliche Beobachtungen (Live-Abrufe, Stationsdaten) in kompakter Spaltenform.
+
+    Funktionsweise:
+        - Pro Standort ein sortiertes int32-Array der Stunden seit 1970 (lokale Uhrzeit) und
+          eine float32-Matrix mit Temperatur, Niederschlag (mm in dieser Stunde) und
+          Sonnenstunden (Tagesschätzung zum Zeitpunkt der Beobachtung) – 16 Byte pro Stunde
+          statt eines Objekts pro Messung.
+        - Einzelne Beobachtungen landen in einem Puffer und werden beim nächsten Lesen in
+          einem Schritt einsortiert; eine spätere Beobachtung derselben Stunde ersetzt die frühere.
+        - Tageswerte werden vektorisiert über `reduceat` auf den sortierten Arrays berechnet
+          (`tageswerte`) und als gewöhnliche Tagesmessung in `WetterDaten` geschrieben
+          (`tageswerte_uebernehmen`); alle Tagesansichten bleiben so unverändert.
+        - Gespeichert wird spaltenweise, eine Datei pro Standort und Monat
+          (`stunden_partition_pfad`) plus Manifest; beim Upload werden nur die neuen Stunden
+          in die betroffenen Monatsdateien eingearbeitet. Gelesen wird nur das Manifest,
+          die Monatsdateien erst bei Zugriff (`partitionen_laden`).
+    """
+
+    def __init__(self):
+        self._reihen = {}  # Standort -> (Stunden int32, Werte float32 n×3), sortiert
+        self._puffer = {}  # Standort -> {Stunde: Werte}, noch nicht einsortiert
+        self._neu = {}  # Standort -> (Stunden, Werte), noch nicht gespeichert
+        # Partitionierte Ablage: Standort -> {Monat: Manifest-Eintrag} (None = alles geladen)
+        self._partitionen = None
+        self._geladen = set()  # bereits geladene (Standort, Monat)
+        self._lader = None  # Manifest-Eintrag -> Inhalt der Monatsdatei
+        self.nutzlast = b""  # zuletzt gespeicherter, serialisierter Stand
+        self.nutzlast_pfad = STUNDEN_MANIFEST_PFAD
+        self.version = str(uuid.uuid4())
+
+    def kopie(self):
+        """Flache Kopie (die Arrays werden nie verändert, nur ersetzt)."""
+        neu = copy.copy(self)
+        neu._reihen = dict(self._reihen)
+        neu._puffer = {standort: dict(zeilen) for standort, zeilen in self._puffer.items()}
+        neu._neu = dict(self._neu)
+        neu._geladen = set(self._geladen)
+        return neu
+
+    def partitionen_setzen(self, manifest, version, lader):
         """
-        Löscht eine Wettermessung anhand ihrer eindeutigen ID.
+        Verbindet das Objekt mit dem Manifest der Stundenwerte; Monatsdateien werden erst
+        bei Zugriff geladen.
+
+        Parameter:
+            manifest (dict): Inhalt des Manifests ({"partitionen": {Standort: {Monat: Eintrag}}}).
+            version (str): Version des Manifests (Git-Blob-SHA).
+            lader (callable): Manifest-Eintrag -> Inhalt der Monatsdatei.
         """
-        self.messungen = [m for m in self.messungen if m.id != messung_id]
+        self._partitionen = {
+            standort: dict(monate) for standort, monate in manifest.get("partitionen", {}).items()
+        }
+        self._geladen = set()
+        self._lader = lader
+        self.version = version
 
-    def import_github_json(self):
+    def partitionen_laden(self, standorte=None, ab_stunde=None):
         """
-        Lädt Wettermessungen aus einer GitHub-JSON-Datei und fügt sie der App hinzu
-        Vorgehensweise:
-            1. Ruft die JSON-Datei über die GitHub-API ab.
-            2. Dekodiert den Base64-Inhalt.
-            3. Erstellt für jeden Eintrag ein WetterMessung-Objekt.
-            4. Fügt nur Einträge hinzu, die noch nicht für Datum + Ort existieren.
-            - Zeigt eine Info-Meldung an, dass die GitHub-Daten übernommen wurden.
+        Lädt die Monatsdateien der Standorte (None = alle) ab dem Monat von `ab_stunde`
+        (None = alle Monate), sofern noch nicht geschehen. Ohne Manifest passiert nichts.
         """
-
-        url = f"https://api.github.com/repos/{GITHUB_REPO}/contents/{GITHUB_JSON_PATH}?ref={GITHUB_BRANCH}"
-        headers = {"Authorization": f"token {GITHUB_TOKEN}"} if GITHUB_TOKEN else {}
-
-        try:
-            response = requests.get(url, headers=headers, timeout=5)
-            response.raise_for_status()
-            data_json = response.json()
-        except requests.RequestException as e:
-            st.error(f"Fehler beim Zugriff auf GitHub: {e}")
-            return
-
-        if "content" not in data_json:
-            msg = data_json.get("message", "Unbekannter Fehler beim Laden der Daten.")
-            st.warning(f"GitHub-API meldet: {msg}")
+        if self._partitionen is None:
             return
+        ab_monat = None if ab_stunde is None else self.monate([ab_stunde])[0]
+        kandidaten = self._partitionen if standorte is None else {s or "" for s in standorte}
+        for standort in sorted(kandidaten):
+            for monat, info in sorted(self._partitionen.get(standort, {}).items()):
+                if (ab_monat is not None and monat < ab_monat) or (standort, monat) in self._geladen:
+                    continue
+                self._geladen.add((standort, monat))
+                for s, (stunden, werte) in self._reihen_aus_json(self._lader(info) or {}):
+                    # noch nicht gespeicherte Stunden gewinnen gegen den geladenen Stand
+                    self._reihen[s] = self._vereinigen(stunden, werte, *self._reihen.get(s, self._leer()))
 
-        try:
-            content = base64.b64decode(data_json["content"]).decode("utf-8")
-            data = json.loads(content)
-        except Exception as e:
-            st.error(f"Fehler beim Dekodieren der GitHub-Daten: {e}")
-            return
+    @staticmethod
+    def _leer():
+        return np.empty(0, np.int32), np.empty((0, len(STUNDEN_WERTE)), np.float32)
 
-        hinzugefuegte = 0
-        for eintrag in data:
-            temp_min = eintrag.get("Temp_min")
-            temp_max = eintrag.get("Temp_max")
-            temperatur = eintrag.get("Temperatur")
+    @staticmethod
+    def monate(stunden):
+        """Monat ("JJJJ-MM") jeder Stunde seit 1970."""
+        return np.datetime_as_string(
+            np.asarray(stunden, dtype=np.int64).astype("datetime64[h]").astype("datetime64[M]")
+        )
 
-            # Alte Monatswerte reparieren: falls Temp_min/Temp_max None, setze auf Temperatur
-            if (temp_min is None or temp_max is None) and temperatur is not None:
-                temp_min = temp_min if temp_min is not None else temperatur
-                temp_max = temp_max if temp_max is not None else temperatur
+    @staticmethod
+    def stunde(zeitpunkt):
+        """Stunden seit 1970 (lokale Uhrzeit) eines Zeitpunkts."""
+        return int(np.datetime64(pd.Timestamp(zeitpunkt).floor("h"), "h").astype(np.int64))
 
-            messung = WetterMessung(
-                id=eintrag.get("ID"),
-                datum=eintrag.get("Datum"),
-                temperatur=temperatur,
-                niederschlag=eintrag.get("Niederschlag"),
-                sonnenstunden=eintrag.get("Sonnenstunden"),
-                quelle=eintrag.get("Quelle"),
-                standort=eintrag.get("Standort"),
-                temp_min=temp_min,
-                temp_max=temp_max,
+    @staticmethod
+    def _vereinigen(stunden_alt, werte_alt, stunden_neu, werte_neu):
+        # sortierte Vereinigung; np.unique liefert das erste Vorkommen -> neue Werte gewinnen
+        stunden, index = np.unique(np.concatenate([stunden_neu, stunden_alt]), return_index=True)
+        return stunden.astype(np.int32), np.concatenate([werte_neu, werte_alt])[index]
+
+    def _uebernehmen(self, standort, stunden, werte, neu=True):
+        # bei doppelten Stunden gewinnt die letzte Zeile der Eingabe
+        stunden, werte = stunden[::-1], werte[::-1]
+        ziele = [self._reihen, self._neu] if neu else [self._reihen]
+        for ziel in ziele:
+            ziel[standort] = self._vereinigen(*ziel.get(standort, self._leer()), stunden, werte)
+        self.version = str(uuid.uuid4())
+
+    def _einsortieren(self):
+        puffer, self._puffer = self._puffer, {}
+        for standort, zeilen in puffer.items():
+            self._uebernehmen(
+                standort,
+                np.fromiter(zeilen, dtype=np.int32, count=len(zeilen)),
+                np.array(list(zeilen.values()), dtype=np.float32),
             )
 
-            # Nur hinzufügen, wenn noch kein Eintrag für diesen Tag & Ort existiert
-            if not self.existiert_eintrag(messung.datum, messung.standort):
-                self.hinzufuegen(messung)
-
-        st.info(f"GitHub-Daten wurden geladen und in die App übernommen.")
+    def hinzufuegen(self, standort, zeitpunkt, temperatur, niederschlag=0, sonnenstunden=None):
+        """Fügt eine Beobachtung hinzu (eine spätere Beobachtung derselben Stunde ersetzt sie)."""
+        self._puffer.setdefault(standort or "", {})[self.stunde(zeitpunkt)] = (
+            temperatur,
+            niederschlag or 0,
+            sonnenstunden,
+        )
+        self.version = str(uuid.uuid4())
 
-    @staticmethod
-    def load_github_data(debug=False):
+    def hinzufuegen_mehrere(self, df):
         """
-        Lädt die Wetterdaten aus GitHub und gibt ein WetterAnalyse-Objekt zurück.
+        Übernimmt viele Beobachtungen auf einmal (z. B. Stationsdaten), ohne Python-Schleife pro Zeile.
 
         Parameter:
-            debug (bool): Wenn True, werden die Daten direkt geladen ohne Caching.
-                          Wenn False, werden die Daten für 5 Minuten gecached.
-
-        Rückgabe:
-            WetterAnalyse: Objekt mit allen geladenen Messungen.
-
-        Hinweise:
-            - Verwendet intern `import_github_json`, um die Messungen zu übernehmen.
-            - Durch Caching wird die GitHub-Abfrage bei wiederholtem Aufruf reduziert.
+            df (pd.DataFrame): Spalten Standort, Zeit, Temperatur und optional
+                               Niederschlag, Sonnenstunden.
         """
+        if df.empty:
+            return
+        stunden = (
+            pd.to_datetime(df["Zeit"]).dt.floor("h").values.astype("datetime64[h]").astype(np.int64)
+        )
+        werte = np.column_stack(
+            [
+                pd.to_numeric(df[spalte], errors="coerce").to_numpy(np.float32)
+                if spalte in df
+                else np.full(len(df), 0 if spalte == "Niederschlag" else np.nan, np.float32)
+                for spalte in STUNDEN_WERTE
+            ]
+        )
+        for standort, index in df["Standort"].fillna("").groupby(df["Standort"].fillna("")).indices.items():
+            self._uebernehmen(standort, stunden[index].astype(np.int32), werte[index])
+
+    def anzahl(self):
+        """Anzahl der gespeicherten Stunden über alle Standorte (lädt alle Monatsdateien)."""
+        self._einsortieren()
+        self.partitionen_laden()
+        return sum(len(stunden) for stunden, _ in self._reihen.values())
+
+    def hat_beobachtung(self, standort, zeitpunkt):
+        """True, wenn für den Standort in der Stunde von `zeitpunkt` schon eine Beobachtung existiert."""
+        self._einsortieren()
+        stunde = self.stunde(zeitpunkt)
+        self.partitionen_laden([standort], ab_stunde=stunde)
+        stunden = self._reihen.get(standort or "", self._leer())[0]
+        i = np.searchsorted(stunden, stunde)
+        return bool(i < len(stunden) and stunden[i] == stunde)
+
+    def beobachtungen(self, standort, von=None):
+        """
+        Stündliche Beobachtungen eines Standorts als DataFrame (Spalten Zeit + STUNDEN_WERTE).
 
-        def _load_data():
-            # Neues WetterAnalyse-Objekt erstellen
-            wd = WetterAnalyse()
-            wd.import_github_json()  # Messungen von GitHub hinzufügen
-            return wd  # Korrekt: komplettes Objekt zurückgeben
-
-        if debug:
-            wd = _load_data()
+        Parameter:
+            von (datetime|None): nur Beobachtungen ab diesem Zeitpunkt.
+        """
+        self._einsortieren()
+        self.partitionen_laden([standort], ab_stunde=None if von is None else self.stunde(von))
+        stunden, werte = self._reihen.get(standort or "", self._leer())
+        if von is not None:
+            ab = np.searchsorted(stunden, self.stunde(von))
+            stunden, werte = stunden[ab:], werte[ab:]
+        df = pd.DataFrame(werte, columns=STUNDEN_WERTE)
+        df.insert(0, "Zeit", pd.to_datetime(stunden.astype("datetime64[h]")))
+        return df
+
+    def tageswerte(self, standorte=None, von=None):
+        """
+        Leitet Tageswerte aus den Stundenwerten ab (vektorisiert pro Standort).
+
+        Parameter:
+            standorte (iterable[str]|None): None = alle Standorte.
+            von (date|datetime|None): nur Tage ab diesem Tag (lädt nur die Monatsdateien ab dort).
+
+        Rückgabe:
+            pd.DataFrame: Standort, Datum, Temperatur (Mittel), Temp_min, Temp_max,
+                Niederschlag (Summe), Sonnenstunden (Mittel der Tagesschätzungen),
+                Beobachtungen (Anzahl Stunden) und Zuletzt (Zeit der letzten Beobachtung).
+        """
+        self._einsortieren()
+        ab_stunde = None if von is None else self.stunde(pd.Timestamp(von).normalize())
+        self.partitionen_laden(standorte, ab_stunde=ab_stunde)
+        teile = []
+        for standort in sorted(self._reihen) if standorte is None else standorte:
+            stunden, werte = self._reihen.get(standort or "", self._leer())
+            if ab_stunde is not None:
+                ab = np.searchsorted(stunden, ab_stunde)
+                stunden, werte = stunden[ab:], werte[ab:]
+            if not len(stunden):
+                continue
+            # Stunden sind sortiert -> jeder Tag ist ein zusammenhängender Block
+            tage = stunden // 24
+            anfang = np.flatnonzero(np.r_[True, tage[1:] != tage[:-1]])
+            anzahl = np.diff(np.r_[anfang, len(tage)])
+            werte = werte.astype(np.float64)
+            gueltig = ~np.isnan(werte)
+            summen = np.add.reduceat(np.where(gueltig, werte, 0), anfang)
+            zaehler = np.add.reduceat(gueltig, anfang)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mittel = summen / zaehler
+            teile.append(
+                pd.DataFrame(
+                    {
+                        "Standort": standort,
+                        "Datum": pd.to_datetime(tage[anfang].astype("datetime64[D]")),
+                        "Temperatur": mittel[:, 0].round(1),
+                        "Temp_min": np.fmin.reduceat(werte[:, 0], anfang).round(1),
+                        "Temp_max": np.fmax.reduceat(werte[:, 0], anfang).round(1),
+                        "Niederschlag": summen[:, 1].round(1),
+                        "Sonnenstunden": mittel[:, 2].round(1),
+                        "Beobachtungen": anzahl,
+                        "Zuletzt": pd.to_datetime(
+                            stunden[anfang + anzahl - 1].astype("datetime64[h]")
+                        ),
+                    }
+                )
+            )
+        if not teile:
+            return pd.DataFrame(
+                columns=["Standort", "Datum", "Temp_min", "Temp_max", "Beobachtungen", "Zuletzt"]
+                + STUNDEN_WERTE
+            )
+        return pd.concat(teile, ignore_index=True)
+
+    def tagesmessungen(self, standorte, tag, quelle=Quelle.LIVE):
+        """
+        Tagesmessungen (WetterMessung) der Standorte für einen Tag, abgeleitet aus den Stundenwerten.
+        Standorte ohne Beobachtung an diesem Tag fehlen im Ergebnis.
+        """
+        df = self.tageswerte(standorte, von=tag)
+        df = df[df["Datum"] == pd.Timestamp(tag)]
+        return [
+            WetterMessung(
+                datum=z.Zuletzt,
+                temperatur=float(z.Temperatur),
+                temp_min=float(z.Temp_min),
+                temp_max=float(z.Temp_max),
+                niederschlag=float(z.Niederschlag),
+                sonnenstunden=0 if pd.isna(z.Sonnenstunden) else float(z.Sonnenstunden),
+                quelle=quelle,
+                standort=z.Standort,
+            )
+            for z in df.itertuples()
+        ]
+
+    def als_json(self):
+        """Spaltenweise Darstellung (Format der Monatsdateien): {Standort: {"Stunde": [...], ...}}."""
+        self._einsortieren()
+        self.partitionen_laden()
+        return {standort: self._reihe_als_json(*self._reihen[standort]) for standort in sorted(self._reihen)}
+
+    @staticmethod
+    def _reihe_als_json(stunden, werte):
+        reihe = {"Stunde": stunden.tolist()}
+        for i, spalte in enumerate(STUNDEN_WERTE):
+            # float32 -> gerundete Python-Floats, fehlende Werte als null
+            spalte_werte = werte[:, i].astype(np.float64).round(2)
+            reihe[spalte] = np.where(np.isnan(spalte_werte), None, spalte_werte).tolist()
+        return reihe
+
+    @staticmethod
+    def _reihen_aus_json(daten):
+        # (Standort, (Stunden, Werte)) pro Standort der spaltenweisen Darstellung
+        for standort, reihe in daten.items():
+            stunden = np.asarray(reihe.get("Stunde", []), dtype=np.int32)
+            werte = np.column_stack(
+                [np.array(reihe.get(s, [None] * len(stunden)), dtype=np.float32) for s in STUNDEN_WERTE]
+            ).reshape(len(stunden), len(STUNDEN_WERTE))
+            yield standort, (stunden, werte)
+
+    @classmethod
+    def aus_json(cls, daten):
+        """
+        Erstellt das Objekt aus der spaltenweisen Darstellung (Monatsdatei oder bisherige
+        `stundenwerte.json`), ohne lokale Änderungen.
+        """
+        obj = cls()
+        for standort, (stunden, werte) in cls._reihen_aus_json(daten):
+            obj._uebernehmen(standort, stunden, werte, neu=False)
+        return obj
+
+    def hat_aenderungen(self):
+        """True, wenn es Beobachtungen gibt, die noch nicht gespeichert wurden."""
+        return bool(self._puffer or self._neu)
+
+    def aenderungen_abgeben(self):
+        """
+        Übergibt die noch nicht gespeicherten Stunden an ein neues Objekt (für einen
+        Hintergrund-Upload) und setzt sie hier zurück.
+        """
+        self._einsortieren()
+        paket = type(self)()
+        paket._neu, self._neu = self._neu, {}
+        return paket
+
+    def zusammenfuehren(self, remote, standort=None, monat=None):
+        """
+        Arbeitet die neuen Stunden in den Remote-Stand ein (gleiche Stunde: lokaler Wert gewinnt).
+
+        Parameter:
+            remote (dict): Inhalt der Remote-Datei (spaltenweise Darstellung).
+            standort (str|None): Nur neue Stunden dieses Standorts übernehmen (für eine Monatsdatei).
+            monat (str|None): Nur neue Stunden dieses Monats ("JJJJ-MM") übernehmen.
+
+        Rückgabe:
+            dict: Zusammengeführter Inhalt im selben Format.
+        """
+        ergebnis = self.aus_json(remote)
+        for s, (stunden, werte) in self._neu.items():
+            if standort is not None and s != standort:
+                continue
+            if monat is not None:
+                im_monat = self.monate(stunden) == monat
+                stunden, werte = stunden[im_monat], werte[im_monat]
+            ergebnis._uebernehmen(s, stunden[::-1], werte[::-1], neu=False)
+        return ergebnis.als_json()
+
+    def github_speichern(self):
+        """
+        Speichert die neuen Stunden auf GitHub und lokal (Fallback), ohne Streamlit-Ausgaben.
+
+        Rückgabe:
+            requests.Response: Antwort des Manifest-Uploads bzw. des ersten fehlgeschlagenen
+            Uploads einer Monatsdatei (304, wenn nichts zu ändern war).
+
+        Funktionsweise:
+            - Nur Monatsdateien mit neuen Stunden werden gelesen und geschrieben (gleiche
+              Optimistic Concurrency wie `WetterAnalyse.github_speichern`), danach das Manifest
+              mit Anzahl und SHA der geschriebenen Dateien.
+            - Gibt es noch kein Manifest, wird die bisherige `stundenwerte.json` einmalig mit
+              übernommen (Migration); die alte Datei bleibt als Sicherung liegen.
+            - Schlägt ein Upload fehl, bleiben die Änderungen erhalten; ein erneuter Aufruf
+              führt bereits geschriebene Monatsdateien ohne PUT (304) zusammen.
+        """
+        self._einsortieren()
+        if github_datei_laden(STUNDEN_MANIFEST_PFAD)[0] is None:
+            alt, _ = github_datei_laden(STUNDEN_PFAD)
+            if alt is not None:
+                for standort, reihe in self._reihen_aus_json(json.loads(alt.decode("utf-8"))):
+                    self._neu[standort] = self._vereinigen(
+                        *reihe, *self._neu.get(standort, self._leer())
+                    )
+
+        eintraege = {}
+        for standort, (stunden, _) in sorted(self._neu.items()):
+            for monat in np.unique(self.monate(stunden)).tolist():
+                pfad = stunden_partition_pfad(standort, monat)
+                resp, daten, inhalt = github_konfliktfrei_schreiben(
+                    pfad,
+                    lambda remote, s=standort, m=monat: self.zusammenfuehren(remote or {}, s, m),
+                )
+                if resp.status_code not in [200, 201, 304]:
+                    return resp
+                datei_atomar_schreiben(pfad, inhalt)
+                eintraege[(standort, monat)] = stunden_partition_info(pfad, daten, inhalt)
+
+        def manifest_zusammenfuehren(remote):
+            partitionen = {
+                s: dict(monate) for s, monate in (remote or {}).get("partitionen", {}).items()
+            }
+            for (s, monat), info in eintraege.items():
+                partitionen.setdefault(s, {})[monat] = info
+            return {
+                "partitionen": {
+                    s: dict(sorted(monate.items())) for s, monate in sorted(partitionen.items())
+                }
+            }
+
+        resp, manifest, self.nutzlast = github_konfliktfrei_schreiben(
+            STUNDEN_MANIFEST_PFAD, manifest_zusammenfuehren
+        )
+        self.nutzlast_pfad = STUNDEN_MANIFEST_PFAD
+        if resp.status_code in [200, 201, 304]:
+            datei_atomar_schreiben(STUNDEN_MANIFEST_PFAD, self.nutzlast)
+            self._neu = {}
+            if self._partitionen is not None:
+                self._partitionen = manifest["partitionen"]
+        return resp
+
+
+@st.cache_resource(max_entries=3, show_spinner=False)
+def _stunden_fuer_version(version, _inhalt):
+    """
+    Baut das StundenWerte-Objekt einmal pro Version der bisherigen `stundenwerte.json` auf
+    (geteilt – Sessions arbeiten auf einer `kopie`).
+    """
+    stunden = StundenWerte.aus_json(_inhalt)
+    stunden.version = version or stunden.version
+    return stunden
+
+
+@st.cache_resource(max_entries=3, show_spinner=False)
+def _stunden_fuer_manifest(version, _manifest):
+    """
+    StundenWerte-Objekt zu einer Version des Manifests; die Monatsdateien lädt jede
+    Session-Kopie bei Zugriff über den gemeinsamen `partition_cache`.
+    """
+    stunden = StundenWerte()
+    stunden.partitionen_setzen(_manifest, version, partition_cache().laden)
+    return stunden
+
+
+def stundenwerte_laden():
+    """
+    Liefert die Stundenwerte (Stale-while-revalidate wie `WetterAnalyse.load_github_data`).
+    Abgeglichen wird nur das Manifest; solange es keins gibt (noch nicht migriert), die
+    bisherige `stundenwerte.json`.
+    """
+    speicher = stunden_speicher()
+    if speicher.schnappschuss()[0] is None and not speicher.geprueft:
+        speicher.aktualisieren()
+    else:
+        speicher.im_hintergrund_aktualisieren()
+    version, inhalt, _, _ = speicher.schnappschuss()
+    if version is not None and isinstance(inhalt, dict):
+        return _stunden_fuer_manifest(version, inhalt).kopie()
+
+    speicher = stunden_alt_speicher()
+    if speicher.schnappschuss()[0] is None and not speicher.geprueft:
+        speicher.aktualisieren()
+    else:
+        speicher.im_hintergrund_aktualisieren()
+    version, inhalt, _, _ = speicher.schnappschuss()
+    return _stunden_fuer_version(version, inhalt if isinstance(inhalt, dict) else {}).kopie()
+
+
+def tageswerte_uebernehmen(wd, stunden, standorte, tag, quelle=Quelle.LIVE):
+    """
+    Schreibt die aus den Stundenwerten abgeleiteten Tageswerte als Tagesmessung in `wd`.
+
+    Parameter:
+        wd (WetterDaten): Ziel der Tagesmessungen.
+        stunden (StundenWerte): Quelle der Stundenwerte.
+        standorte (iterable[str]): betroffene Standorte.
+        tag (datetime.date): Tag, für den die Tageswerte neu berechnet werden.
+
+    Rückgabe:
+        dict: "aktualisiert" (Standorte mit neuer Tagesmessung) und "uebersprungen"
+              (Standorte, für die an diesem Tag schon ein manueller/simulierter Eintrag existiert).
+
+    Hinweise:
+        - Ein vorhandener Eintrag derselben Quelle wird ersetzt (Upsert), andere Einträge bleiben.
+        - Speichert nichts; der Aufrufer exportiert danach genau einmal.
+    """
+    standorte = set(standorte)
+    wd.partitionen_laden(standorte)
+    wert = getattr(quelle, "value", quelle)
+    fremd = {
+        m.standort
+        for m in wd.messungen
+        if m.standort in standorte and m.quelle != wert and m.datum.date() == tag
+    }
+    messungen = stunden.tagesmessungen(sorted(standorte - fremd), tag, quelle)
+    wd.aenderungen_anwenden(ersetzen=messungen)
+    return {"aktualisiert": sorted(m.standort for m in messungen), "uebersprungen": sorted(fremd)}
+
+
+# Aufbewahrung in Stufen: Tageswerte der letzten `roh_jahre` Kalenderjahre bleiben im
+# Datenbestand; ältere werden verdichtet (Monatswerte für die letzten `monat_jahre` Jahre,
+# Jahreswerte für alle) und unverändert in ARCHIV_VERZEICHNIS abgelegt (eine Datei pro Jahr,
+# wird von der App nicht geladen). Verdichtet wird mit `python cli.py verdichten`.
+AUFBEWAHRUNG = st.secrets.get("aufbewahrung", {})
+ROH_JAHRE = AUFBEWAHRUNG.get("roh_jahre", 3)
+MONAT_JAHRE = AUFBEWAHRUNG.get("monat_jahre", 10)
+VERDICHTET_PFAD = "verdichtet.json"
+ARCHIV_VERZEICHNIS = "archiv"
+# Kennzahlen pro Messwert: Spaltenname -> pandas-Aggregation
+VERDICHTUNG_STATISTIKEN = {"summe": "sum", "mittel": "mean", "min": "min", "max": "max", "anzahl": "count"}
+VERDICHTUNG_DATUMSSPALTEN = ["Temp_max_Datum", "Temp_min_Datum"]
+
+
+def archiv_pfad(jahr):
+    """Archivdatei mit den Tageswerten eines verdichteten Jahres."""
+    return f"{ARCHIV_VERZEICHNIS}/{int(jahr)}.json"
+
+
+def verdichten(df, monatlich=True):
+    """
+    Fasst Tageswerte pro Standort, Quelle, Jahr (und Monat) zusammen.
+
+    Parameter:
+        df (pd.DataFrame): Messungen wie `WetterDaten.als_dataframe`.
+        monatlich (bool): True = eine Zeile pro Monat, False = pro Jahr.
+
+    Rückgabe:
+        pd.DataFrame: Schlüsselspalten, Tage (Tage mit Messung), für jeden Messwert
+            `<Wert>_summe/_mittel/_min/_max/_anzahl` sowie die Tage der Extremwerte
+            (Temp_max_Datum, Temp_min_Datum).
+
+    Hinweise:
+        - Ein groupby für alle Gruppen; die Tage der Extremwerte kommen aus je einer Sortierung.
+    """
+    schluessel = ["Standort", "Quelle", "Jahr"] + (["Monat"] if monatlich else [])
+    df = df.assign(
+        Standort=df["Standort"].fillna(""),
+        Quelle=df["Quelle"].fillna(""),
+        Jahr=df["Datum"].dt.year,
+        Monat=df["Datum"].dt.month,
+        Tag=df["Datum"].dt.normalize(),
+    )
+    gruppen = df.groupby(schluessel, sort=True)
+    werte = gruppen[MESSWERT_SPALTEN].agg(list(VERDICHTUNG_STATISTIKEN.values()))
+    namen = {agg: name for name, agg in VERDICHTUNG_STATISTIKEN.items()}
+    werte.columns = [f"{spalte}_{namen[agg]}" for spalte, agg in werte.columns]
+    werte.insert(0, "Tage", gruppen["Tag"].nunique())
+
+    for spalte, letzte in [("Temp_max", "last"), ("Temp_min", "first")]:
+        extrem = (
+            df.dropna(subset=[spalte])
+            .sort_values(spalte, kind="stable")
+            .drop_duplicates(schluessel, keep=letzte)
+            .set_index(schluessel)["Tag"]
+        )
+        werte[f"{spalte}_Datum"] = extrem
+    return werte.reset_index()
+
+
+def archiv_zusammenfuehren(remote, eintraege):
+    """
+    Übernimmt Tageswerte (JSON-Form) in eine Archivdatei.
+
+    Einträge, deren ID oder Tag & Ort schon im Archiv liegt, werden übersprungen –
+    ein wiederholter Lauf ändert das Archiv daher nicht.
+
+    Rückgabe:
+        list[dict]: Archivinhalt, sortiert nach Datum und Standort.
+    """
+    archiv = list(remote or [])
+    ids = {e.get("ID") for e in archiv}
+    tage = {(e.get("Standort"), str(e.get("Datum"))[:10]) for e in archiv}
+    for e in eintraege:
+        tag = (e.get("Standort"), str(e.get("Datum"))[:10])
+        if e.get("ID") in ids or tag in tage:
+            continue
+        ids.add(e.get("ID"))
+        tage.add(tag)
+        archiv.append(e)
+    return sorted(archiv, key=lambda e: (str(e.get("Datum")), str(e.get("Standort"))))
+
+
+def verdichtung_als_json(df):
+    """Verdichtete Werte als JSON-Liste (Tage als "JJJJ-MM-TT", Fehlwerte als null)."""
+    df = df.copy()
+    for spalte in VERDICHTUNG_DATUMSSPALTEN:
+        df[spalte] = pd.to_datetime(df[spalte]).dt.strftime("%Y-%m-%d")
+    return json.loads(df.to_json(orient="records", force_ascii=False))
+
+
+def verdichtung_zusammenfuehren(remote, monate=(), jahre=(), archiv=None, ersetzte_jahre=(), monat_ab_jahr=None):
+    """
+    Führt neue verdichtete Werte in den Inhalt von VERDICHTET_PFAD ein.
+
+    Parameter:
+        remote (dict|None): bisheriger Inhalt ({"monate": [...], "jahre": [...], "archiv": {...}}).
+        monate, jahre (list[dict]): neue Werte (JSON-Form) für `ersetzte_jahre`.
+        archiv (dict|None): Jahr (str) -> Archiv-Eintrag; None als Wert entfernt den Eintrag.
+        ersetzte_jahre (iterable[int]): Jahre, deren bisherige Werte ersetzt bzw. entfernt werden.
+        monat_ab_jahr (int|None): Monatswerte älterer Jahre entfallen (nur noch Jahreswerte).
+
+    Rückgabe:
+        dict: neuer Inhalt, sortiert nach Standort, Quelle, Jahr, Monat.
+    """
+    remote = remote or {}
+    ersetzte_jahre = set(ersetzte_jahre)
+
+    def sortiert(eintraege, monatlich):
+        behalten = [
+            e for e in eintraege
+            if not (monatlich and monat_ab_jahr is not None and e["Jahr"] < monat_ab_jahr)
+        ]
+        return sorted(
+            behalten, key=lambda e: (e["Standort"], e["Quelle"], e["Jahr"], e.get("Monat", 0))
+        )
+
+    archiv_neu = dict(remote.get("archiv", {}))
+    for jahr, eintrag in (archiv or {}).items():
+        if eintrag is None:
+            archiv_neu.pop(jahr, None)
         else:
+            archiv_neu[jahr] = eintrag
+    return {
+        "monate": sortiert(
+            [e for e in remote.get("monate", []) if e["Jahr"] not in ersetzte_jahre] + list(monate),
+            True,
+        ),
+        "jahre": sortiert(
+            [e for e in remote.get("jahre", []) if e["Jahr"] not in ersetzte_jahre] + list(jahre),
+            False,
+        ),
+        "archiv": dict(sorted(archiv_neu.items())),
+    }
+
+
+@st.cache_resource
+def verdichtung_speicher():
+    """Gemeinsamer Stand der verdichteten Monats- und Jahreswerte (`verdichtet.json`)."""
+    return DatenSpeicher(VERDICHTET_PFAD, ablage=gemeinsame_ablage())
+
+
+@st.cache_resource(max_entries=3, show_spinner=False)
+def _verdichtet_fuer_version(version, _inhalt):
+    """
+    Baut die Tabellen der verdichteten Werte einmal pro Version auf (geteilt, nicht verändern).
+    """
+    tabellen = {}
+    for art in ["monate", "jahre"]:
+        df = pd.DataFrame(_inhalt.get(art, []))
+        for spalte in VERDICHTUNG_DATUMSSPALTEN:
+            if spalte in df:
+                df[spalte] = pd.to_datetime(df[spalte])
+        tabellen[art] = df
+    return tabellen
 
-            @st.cache_data(ttl=300)
-            def cached_load_data():
-                return _load_data()
 
-            wd = cached_load_data()
+def verdichtete_werte():
+    """
+    Liefert die verdichteten Werte als {"monate": DataFrame, "jahre": DataFrame}
+    (Stale-while-revalidate wie `WetterAnalyse.load_github_data`; leer, solange nicht verdichtet wurde).
+    """
+    speicher = verdichtung_speicher()
+    if speicher.schnappschuss()[0] is None and not speicher.geprueft:
+        speicher.aktualisieren()
+    else:
+        speicher.im_hintergrund_aktualisieren()
+    version, inhalt, _, _ = speicher.schnappschuss()
+    return _verdichtet_fuer_version(version, inhalt if isinstance(inhalt, dict) else {})
 
-        return wd
+
+def verdichtung_filtern(df, ort_filter="Alle", quelle_filter="Alle"):
+    """Filtert verdichtete Werte wie die Tageswerte nach Ort und Quelle."""
+    if df.empty:
+        return df
+    if ort_filter != "Alle":
+        df = df[df["Standort"] == ort_filter]
+    if quelle_filter != "Alle":
+        df = df[df["Quelle"] == quelle_filter]
+    return df
+
+
+PRUEFSUMMEN_MODUL = 2**160  # Prüfsummen pro Standort: Summe der SHA-1 der Messungen
+
+
+class WetterDaten:
+    """
+    Verwaltung mehrerer Wettermessungen
+
+    Speichert, fügt hinzu, ersetzt, löscht und wandelt Messungen in DataFrames um.
+    """
+
+    def __init__(self):
+        self.messungen = []  # Liste aller Messung
+        self._tage = {}  # (Standort, Tag) -> Anzahl Messungen, für schnelle Duplikatprüfung
+        self._pruefsummen = {}  # Standort -> Prüfsumme der Messungen (erkennt geänderte Standorte)
+        # Summen für die Klimanormalen, bei jeder Änderung fortgeschrieben (`klima_summe_aendern`)
+        self._klima_tage = {}  # (Standort, Kalendertag) -> Summen
+        self._klima_monate = {}  # (Standort, Jahr, Monat) -> Summen
+        # Lokale Änderungen seit dem letzten Laden/Speichern (für das Zusammenführen beim Export)
+        self._geaendert = {}  # ID -> neue oder ersetzte Messung
+        self._geloescht = {}  # ID -> Standort gelöschter Messungen (Tombstones)
+        self.nutzlast = b""  # zuletzt gespeicherter, serialisierter Stand
+        self.nutzlast_pfad = GITHUB_JSON_PATH  # Datei, zu der `nutzlast` gehört
+        # Partitionierte Ablage: Standort -> Manifest-Eintrag (None = alles in einer Datei)
+        self._partitionen = None
+        self._geladen = set()  # bereits geladene Partitionen
+        self._lader = None  # (standort, info) -> Einträge
+        self._manifest_version = None
+        # Datenversion: Git-Blob-SHA des geladenen Stands, nach lokalen Änderungen eine neue UUID
+        # (Schlüssel für Caches, die pro Datenstand berechnet werden)
+        self.version = str(uuid.uuid4())
+
+    def kopie(self):
+        """
+        Flache Kopie mit eigenen Listen und Indizes; die Messungen selbst werden geteilt
+        (sie werden nie verändert, sondern nur ersetzt). Für geteilte, gecachte Objekte.
+        """
+        neu = copy.copy(self)
+        neu.messungen = list(self.messungen)
+        neu._tage = dict(self._tage)
+        neu._pruefsummen = dict(self._pruefsummen)
+        neu._klima_tage = dict(self._klima_tage)
+        neu._klima_monate = dict(self._klima_monate)
+        neu._geaendert = dict(self._geaendert)
+        neu._geloescht = dict(self._geloescht)
+        neu._geladen = set(self._geladen)
+        if self._partitionen is not None:
+            neu._partitionen = dict(self._partitionen)
+        return neu
+
+    def _tag_zaehlen(self, messung, delta):
+        key = (messung.standort, messung.datum.date())
+        anzahl = self._tage.get(key, 0) + delta
+        if anzahl > 0:
+            self._tage[key] = anzahl
+        else:
+            self._tage.pop(key, None)
+        # Prüfsumme pro Standort: Summe der SHA-1 aller Messungen (modulo 2^160), O(1) pro Änderung
+        zeile = messung.als_dict()
+        digest = hashlib.sha1(json.dumps(zeile, sort_keys=True, default=str).encode("utf-8"))
+        self._pruefsummen[messung.standort] = (
+            self._pruefsummen.get(messung.standort, 0)
+            + delta * int.from_bytes(digest.digest(), "big")
+        ) % PRUEFSUMMEN_MODUL
+        # Klimanormalen: Summen pro Kalendertag sowie pro Jahr und Monat
+        datum = messung.datum
+        kalendertag = datum.dayofyear - int(datum.is_leap_year and datum.dayofyear >= 60)
+        werte = [zeile[spalte] for spalte in KLIMA_WERTE]
+        for summen, key in (
+            (self._klima_tage, (messung.standort, kalendertag)),
+            (self._klima_monate, (messung.standort, datum.year, datum.month)),
+        ):
+            neu = klima_summe_aendern(summen.get(key), werte, delta)
+            if neu is None:
+                summen.pop(key, None)
+            else:
+                summen[key] = neu
+
+    def _einfuegen(self, messung, geaendert=True):
+        self.messungen.append(messung)
+        self._tag_zaehlen(messung, 1)
+        if geaendert:
+            self._geaendert[messung.id] = messung
+            self._geloescht.pop(messung.id, None)
+            self.version = str(uuid.uuid4())
+
+    def _entfernt(self, messung):
+        self._tag_zaehlen(messung, -1)
+        self._geaendert.pop(messung.id, None)
+        self._geloescht[messung.id] = messung.standort
+        self.version = str(uuid.uuid4())
+
+    def standorte(self):
+        """
+        Sortierte Liste aller Standorte (aus dem Tagesindex, ohne DataFrame).
+        Bei partitionierter Ablage stammen sie aus dem Manifest, auch für noch nicht geladene Partitionen.
+        """
+        orte = {standort for standort, _ in self._tage if standort}
+        if self._partitionen is not None:
+            orte |= {standort for standort in self._partitionen if standort}
+        return sorted(orte)
+
+    def partitioniert(self):
+        """True, wenn die Messungen aus Standort-Partitionen (Manifest) geladen werden."""
+        return self._partitionen is not None
+
+    def partitionen_setzen(self, manifest, version, lader):
+        """
+        Verbindet das Objekt mit einem Manifest; die Partitionen werden erst bei Zugriff geladen.
+
+        Parameter:
+            manifest (dict): Inhalt von `manifest.json` ({"partitionen": {Standort: Eintrag}}).
+            version (str): Version des Manifests (Git-Blob-SHA).
+            lader (callable): (standort, eintrag) -> Liste der Einträge der Partition.
+        """
+        self._partitionen = dict(manifest.get("partitionen", {}))
+        self._manifest_version = version
+        self._lader = lader
+        self._geladen = set()
+        self.version = self._partition_version()
+
+    def partitionen_laden(self, standorte=None):
+        """
+        Lädt die Partitionen der angegebenen Standorte (None = alle), sofern noch nicht geschehen.
+        Ohne partitionierte Ablage passiert nichts.
+        """
+        if self._partitionen is None:
+            return
+        kandidaten = self._partitionen if standorte is None else standorte
+        fehlend = [
+            s for s in {(s or "") for s in kandidaten}
+            if s in self._partitionen and s not in self._geladen
+        ]
+        if not fehlend:
+            return
+        for standort in sorted(fehlend):
+            self._geladen.add(standort)  # vorher markieren: eintraege_uebernehmen prüft erneut
+            self.eintraege_uebernehmen(self._lader(standort, self._partitionen[standort]))
+        self.version = str(uuid.uuid4()) if self.hat_aenderungen() else self._partition_version()
+
+    def _partition_version(self):
+        # gleiche Auswahl aus gleichem Manifest -> gleiche Version (Caches bleiben gültig)
+        schluessel = json.dumps([self._manifest_version, sorted(self._geladen)])
+        return hashlib.sha1(schluessel.encode("utf-8")).hexdigest()
+
+    def _standorte_sicherstellen(self, standorte):
+        # lädt fehlende Partitionen nach, bevor Duplikate geprüft oder Änderungen angewendet werden
+        if self._partitionen is not None:
+            self.partitionen_laden(standorte)
+
+    def standort_pruefsummen(self):
+        """
+        Prüfsumme pro Standort (unabhängig von Reihenfolge und Prozess).
+        Ändert sich, sobald eine Messung des Standorts hinzukommt, ersetzt oder gelöscht wird.
+        """
+        vorhanden = {standort for standort, _ in self._tage}
+        return {s: summe for s, summe in self._pruefsummen.items() if s in vorhanden}
+
+    def klima_summen(self, standort):
+        """
+        Summen der Klimanormalen eines Standorts (siehe `klima_summe_aendern`).
+
+        Rückgabe:
+            tuple[dict, dict]: Kalendertag -> Summen und (Jahr, Monat) -> Summen.
+        """
+        tage = {key[1]: summe for key, summe in self._klima_tage.items() if key[0] == standort}
+        monate = {
+            key[1:]: summe for key, summe in self._klima_monate.items() if key[0] == standort
+        }
+        return tage, monate
+
+    def hinzufuegen(self, messung: WetterMessung):
+        """
+        Fügt eine Wettermessung zur Liste hinzu
+        """
+        self._einfuegen(messung)
+
+    def hinzufuegen_mehrere(self, messungen):
+        """
+        Fügt mehrere Wettermessungen auf einmal hinzu (z. B. ein Batch aus dem CSV-Import).
+        """
+        self.aenderungen_anwenden(einfuegen=messungen)
+
+    # prüfen ob für einen Ort oder Datum ein Eintrag existiert
+    def existiert_eintrag(self, datum, standort):
+        if self._partitionen is not None and (standort or "") not in self._geladen:
+            self._standorte_sicherstellen([standort])
+        return (standort, datum.date()) in self._tage
+
+    def tage_vorhanden(self, standorte, tage):
+        """
+        Prüft viele (Standort, Tag)-Paare auf einmal gegen den Tagesindex.
+
+        Parameter:
+            standorte (iterable[str]): Standorte.
+            tage (iterable[datetime.date]): Tage, gleich lang wie `standorte`.
+
+        Rückgabe:
+            np.ndarray[bool]: True, wenn für das Paar bereits eine Messung existiert.
+        """
+        standorte = list(standorte)
+        self._standorte_sicherstellen(set(standorte))
+        paare = pd.MultiIndex.from_arrays([standorte, list(tage)])
+        if not self._tage or paare.empty:
+            return np.zeros(len(paare), dtype=bool)
+        return paare.isin(list(self._tage))
+
+    def ersetze_eintrag(self, datum, standort, neue_messung):
+        """
+        Ersetzt alle Wettermessungen eines Ortes am selben Tag durch `neue_messung`.
+
+        Args:
+            datum (datetime-like): Das Datum der zu ersetzenden Messung.
+            standort (str): Der Name des Standorts.
+            neue_messung (WetterMessung): Die neue Messung.
+        """
+        if (standort, datum.date()) != (neue_messung.standort, neue_messung.datum.date()):
+            # abweichender Tag/Ort: alten Tag räumen, neue Messung einfach anhängen
+            self._tag_entfernen(standort, datum.date())
+            self.aenderungen_anwenden(einfuegen=[neue_messung])
+            return
+        self.aenderungen_anwenden(ersetzen=[neue_messung])
+
+    def _tag_entfernen(self, standort, tag):
+        behalten = []
+        for m in self.messungen:
+            if m.standort == standort and m.datum.date() == tag:
+                self._entfernt(m)
+            else:
+                behalten.append(m)
+        self.messungen = behalten
+
+    def aenderungen_anwenden(self, einfuegen=(), ersetzen=(), loeschen=()):
+        """
+        Wendet Einfügungen, Ersetzungen und Löschungen gemeinsam in einem Durchlauf an.
+
+        Parameter:
+            einfuegen (iterable[WetterMessung]): Messungen, die ohne Prüfung angehängt werden.
+            ersetzen (iterable[WetterMessung]): Messungen, die alle vorhandenen Einträge
+                desselben Ortes am selben Tag ersetzen (Upsert).
+            loeschen (iterable[str]): IDs der zu löschenden Messungen.
+
+        Rückgabe:
+            dict: Zusammenfassung mit den Zählern "eingefuegt", "ersetzt" und "geloescht"
+                  sowie der Liste "entfernt" (die entfernten Messungen).
+
+        Hinweise:
+            - Die Messungsliste wird höchstens einmal durchlaufen (O(n + k)); ohne
+              Ersetzungen/Löschungen entfällt der Durchlauf ganz.
+            - Alle Schlüssel werden vor der ersten Änderung berechnet, ein ungültiger
+              Eintrag lässt den Bestand daher unverändert.
+            - Speichert nichts; der Aufrufer exportiert danach genau einmal.
+        """
+        einfuegen = list(einfuegen)
+        ersetzen = list(ersetzen)
+        loesch_ids = set(loeschen)
+        self._standorte_sicherstellen({m.standort for m in einfuegen + ersetzen})
+        ersetz_tage = {(m.standort, m.datum.date()) for m in ersetzen}
+        for m in einfuegen:
+            m.datum.date()  # Datum prüfen, bevor etwas verändert wird
+
+        zusammenfassung = {"eingefuegt": len(einfuegen), "ersetzt": 0, "geloescht": 0, "entfernt": []}
+        if loesch_ids or (ersetz_tage and any(t in self._tage for t in ersetz_tage)):
+            behalten = []
+            for m in self.messungen:
+                if m.id in loesch_ids:
+                    zusammenfassung["geloescht"] += 1
+                elif ersetz_tage and (m.standort, m.datum.date()) in ersetz_tage:
+                    zusammenfassung["ersetzt"] += 1
+                else:
+                    behalten.append(m)
+                    continue
+                self._entfernt(m)
+                zusammenfassung["entfernt"].append(m)
+            self.messungen = behalten
+
+        for m in ersetzen + einfuegen:
+            self._einfuegen(m)
+        return zusammenfassung
+
+    def als_dataframe(self):
+        """
+        Wandelt alle gespeicherten Wettermessungen in ein pandas DataFrame um
+        DataFrame mit allen Messungen, sortiert nach Datum
+        Spalten: ID, Datum, Temperatur, Temp_min, Temp_max,
+        Niederschlag, Sonnenstunden, Quelle, Standort
+        """
+
+        df = pd.DataFrame([m.als_dict() for m in self.messungen])
+        if df.empty:
+            # leer, aber mit allen Spalten (z. B. wenn nur verdichtete Werte vorliegen)
+            return pd.DataFrame(columns=MESSUNG_SPALTEN).astype({"Datum": "datetime64[ns]"})
+        df["Datum"] = pd.to_datetime(df["Datum"])
+        df = df.sort_values("Datum")  # nach Datum sortieren
+        return df
+
+    def loeschen(self, messung_id):
+        """
+        Löscht eine Wettermessung anhand ihrer eindeutigen ID.
+        Für mehrere IDs besser `aenderungen_anwenden(loeschen=...)` verwenden.
+        """
+        self.aenderungen_anwenden(loeschen=[messung_id])
+
+    def aenderungen_abgeben(self):
+        """
+        Übergibt die lokalen Änderungen an ein neues, eigenständiges Objekt (z. B. für einen
+        Hintergrund-Upload) und setzt sie hier zurück.
+
+        Rückgabe:
+            WetterDaten: Objekt gleichen Typs, das nur die Änderungen enthält.
+        """
+        paket = type(self)()
+        paket._geaendert, self._geaendert = self._geaendert, {}
+        paket._geloescht, self._geloescht = self._geloescht, {}
+        return paket
+
+    def hat_aenderungen(self):
+        """True, wenn es lokale Änderungen gibt, die noch nicht gespeichert wurden."""
+        return bool(self._geaendert or self._geloescht)
+
+    def importziel(self):
+        """
+        Kopie ohne Messungen und ohne lokale Änderungen, aber mit Tagesindex und Partitionen;
+        Ziel für blockweise Importe, die den Bestand selbst nicht verändern sollen.
+        """
+        neu = self.kopie()
+        neu.messungen = []
+        neu._geaendert = {}
+        neu._geloescht = {}
+        return neu
+
+    def gespeicherte_freigeben(self):
+        """
+        Gibt die bereits gespeicherten Messungen frei (z. B. nach jedem Block eines Massenimports).
+
+        Rückgabe:
+            int: Anzahl der freigegebenen Messungen.
+
+        Hinweise:
+            - Der Tagesindex bleibt erhalten: Duplikate (Tag + Ort) werden weiterhin erkannt.
+            - Nicht gespeicherte Änderungen bleiben im Bestand.
+        """
+        vorher = len(self.messungen)
+        self.messungen = [m for m in self.messungen if m.id in self._geaendert]
+        return vorher - len(self.messungen)
+
+    def zusammenfuehren(self, remote, standort=None):
+        """
+        Führt die lokalen Änderungen mit dem aktuellen Remote-Stand zusammen.
+
+        Parameter:
+            remote (list[dict]): Einträge der Remote-Datei (Format wie `wetterdaten.json`).
+            standort (str|None): Nur Änderungen dieses Standorts übernehmen (für eine Partition).
+
+        Rückgabe:
+            list[dict]: Zusammengeführte Einträge.
+
+        Funktionsweise:
+            - Basis ist der Remote-Stand (Änderungen anderer Instanzen bleiben erhalten).
+            - Gelöschte IDs (Tombstones) werden entfernt.
+            - Neue oder ersetzte Messungen überschreiben den Eintrag mit gleicher ID
+              bzw. werden angehängt.
+            - Hat eine andere Instanz für denselben Tag & Ort eine Messung mit anderer ID
+              gespeichert, gewinnt die lokale Änderung; der Remote-Eintrag entfällt wie ein
+              Tombstone (sonst lägen zwei Messungen für einen Tag in der Datei).
+        """
+        geaendert = {
+            id: m
+            for id, m in self._geaendert.items()
+            if standort is None or (m.standort or "") == standort
+        }
+        neu = {id: m.als_dict() for id, m in geaendert.items()}
+        belegt = {(m.standort, m.datum.date()): id for id, m in geaendert.items()}
+        orte = {ort for ort, _ in belegt}
+        ergebnis = []
+        for eintrag in remote:
+            eid = eintrag.get("ID")
+            if eid in self._geloescht:
+                continue
+            if eid not in neu and eintrag.get("Standort") in orte:
+                tag = pd.to_datetime(eintrag.get("Datum")).date()
+                if belegt.get((eintrag.get("Standort"), tag), eid) != eid:
+                    continue  # Tag & Ort lokal neu belegt
+            ergebnis.append(neu.pop(eid, eintrag))
+        ergebnis.extend(neu.values())
+        return ergebnis
+
+    def geaenderte_standorte(self):
+        """Standorte, die von den lokalen Änderungen betroffen sind (für segmentierte Ablage)."""
+        return {m.standort for m in self._geaendert.values()} | set(
+            self._geloescht.values()
+        )
+
+    def stand_uebernehmen(self, eintraege, version=None):
+        """
+        Ersetzt alle Messungen durch den gespeicherten Stand und verwirft die lokalen Änderungen.
+
+        Parameter:
+            eintraege (list[dict]): Einträge im Format von `wetterdaten.json`.
+            version (str|None): Version des Stands (Git-Blob-SHA), falls bekannt.
+        """
+        self.messungen = []
+        self._tage = {}
+        self._pruefsummen = {}
+        self._klima_tage = {}
+        self._klima_monate = {}
+        self._geaendert = {}
+        self._geloescht = {}
+        self._partitionen = None
+        self._geladen = set()
+        self.eintraege_uebernehmen(eintraege)
+        self.version = version or str(uuid.uuid4())
+
+    def import_github_json(self):
+        """
+        Lädt Wettermessungen aus einer GitHub-JSON-Datei und fügt sie der App hinzu
+        Vorgehensweise:
+            1. Ruft die JSON-Datei über die GitHub-API ab.
+            2. Dekodiert den Base64-Inhalt.
+            3. Erstellt für jeden Eintrag ein WetterMessung-Objekt.
+            4. Fügt nur Einträge hinzu, die noch nicht für Datum + Ort existieren.
+            - Zeigt eine Info-Meldung an, dass die GitHub-Daten übernommen wurden.
+        """
+
+        try:
+            inhalt, _ = github_datei_laden()
+        except requests.RequestException as e:
+            st.error(f"Fehler beim Zugriff auf GitHub: {e}")
+            return
+        except ValueError as e:
+            st.warning(f"GitHub-API meldet: {e}")
+            return
+
+        if inhalt is None:
+            st.warning("GitHub-API meldet: Not Found")
+            return
+
+        try:
+            data = json.loads(inhalt.decode("utf-8"))
+        except Exception as e:
+            st.error(f"Fehler beim Dekodieren der GitHub-Daten: {e}")
+            return
+
+        self.eintraege_uebernehmen(data)
+        st.info(f"GitHub-Daten wurden geladen und in die App übernommen.")
+
+    def eintraege_uebernehmen(self, data):
+        """
+        Übernimmt Einträge aus der JSON-Liste (Format wie `wetterdaten.json`).
+
+        Parameter:
+            data (list[dict]): Einträge mit den Feldern ID, Datum, Temperatur, ...
+
+        Rückgabe:
+            int: Anzahl der hinzugefügten Messungen.
+
+        Hinweise:
+            - Alte Einträge ohne Temp_min/Temp_max werden mit der Temperatur repariert.
+            - Nur Einträge, für deren Tag & Ort noch keine Messung existiert, werden übernommen.
+        """
+        hinzugefuegte = 0
+        for eintrag in data:
+            temperatur = eintrag.get("Temperatur")
+
+            # Alte Monatswerte reparieren: falls Temp_min/Temp_max None, setze auf Temperatur
+            temp_min, temp_max = temperaturen_reparieren(
+                eintrag.get("Temp_min"), eintrag.get("Temp_max"), temperatur
+            )
+
+            messung = WetterMessung(
+                id=eintrag.get("ID"),
+                datum=eintrag.get("Datum"),
+                temperatur=temperatur,
+                niederschlag=eintrag.get("Niederschlag"),
+                sonnenstunden=eintrag.get("Sonnenstunden"),
+                quelle=eintrag.get("Quelle"),
+                standort=eintrag.get("Standort"),
+                temp_min=temp_min,
+                temp_max=temp_max,
+            )
+
+            # Nur hinzufügen, wenn noch kein Eintrag für diesen Tag & Ort existiert
+            if not self.existiert_eintrag(messung.datum, messung.standort):
+                self._einfuegen(messung, geaendert=False)
+                hinzugefuegte += 1
+        return hinzugefuegte
+
+    def csv_backfill(
+        self,
+        datei,
+        format="wetterweiser",
+        spalten=None,
+        einheiten=None,
+        standort=None,
+        quelle=Quelle.MANUELL,
+        chunk_zeilen=50_000,
+        nach_batch=None,
+    ):
+        """
+        Importiert historische Wetterdaten aus einer (großen) CSV-Datei in Blöcken.
+
+        Parameter:
+            datei (str | file-like): CSV-Datei, z. B. DWD-Tageswerte oder eigener CSV-Export.
+            format (str): Vorlage aus CSV_FORMATE ("wetterweiser" oder "dwd").
+            spalten (dict|None): Zusätzliche Zuordnung Quellspalte -> Zielspalte.
+            einheiten (dict|None): Zielspalte -> Einheit der Quelle (Schlüssel aus EINHEITEN).
+            standort (str|None): Setzt den Standort für alle Zeilen (z. B. statt DWD-Stations-ID).
+            quelle (Quelle|str): Quelle für Zeilen ohne eigene Quelle-Spalte.
+            chunk_zeilen (int): Zeilen pro Block; begrenzt den Speicherbedarf.
+            nach_batch (callable|None): Wird nach jedem Block mit der Liste der neuen Messungen
+                aufgerufen (z. B. zum Speichern und Freigeben, siehe `cli.py backfill`).
+
+        Rückgabe:
+            dict: Zähler gelesen, uebernommen, duplikate, ungueltig.
+
+        Funktionsweise:
+            - Liest nur die benötigten Spalten blockweise mit pandas (`chunksize`).
+            - Rechnet Einheiten um, ersetzt Fehlwerte und repariert Temp_min/Temp_max
+              wie `eintraege_uebernehmen` – alles vektorisiert pro Block.
+            - Duplikate (Standort + Tag) werden über den Tagesindex erkannt, auch innerhalb der Datei.
+            - Fehlende Sonnenstunden werden pro Block aus der Tageslänge (Breite des Standorts,
+              Datum) geschätzt – ohne API-Aufruf (`sonne.sonnenstunden_schaetzen`).
+            - Neue Messungen werden pro Block gesammelt hinzugefügt.
+        """
+        vorlage = CSV_FORMATE[format]
+        zuordnung = {**vorlage["spalten"], **(spalten or {})}
+        umrechnung = {**vorlage["einheiten"], **(einheiten or {})}
+        ziele = set(zuordnung.values()) | set(MESSWERT_SPALTEN)
+        ziele |= {"ID", "Datum", "Standort", "Quelle"}
+        quelle = getattr(quelle, "value", quelle)
+
+        statistik = {"gelesen": 0, "uebernommen": 0, "duplikate": 0, "ungueltig": 0}
+        leser = pd.read_csv(
+            datei,
+            sep=vorlage["trennzeichen"],
+            chunksize=chunk_zeilen,
+            skipinitialspace=True,
+            usecols=lambda c: c.strip() in zuordnung or c.strip() in ziele,
+            dtype=str,
+        )
+
+        for chunk in leser:
+            chunk.columns = chunk.columns.str.strip()
+            chunk = chunk.rename(columns=zuordnung)
+            statistik["gelesen"] += len(chunk)
+
+            # Standort, Datum und Messwerte normalisieren
+            if standort:
+                chunk["Standort"] = standort
+            elif "Standort" in chunk:
+                chunk["Standort"] = chunk["Standort"].str.strip()
+            else:
+                chunk["Standort"] = None
+            chunk["Datum"] = pd.to_datetime(
+                chunk["Datum"].str.strip(),
+                format=vorlage["datum_format"],
+                errors="coerce",
+            )
+            for spalte in MESSWERT_SPALTEN:
+                werte = (
+                    pd.to_numeric(chunk[spalte], errors="coerce")
+                    if spalte in chunk
+                    else pd.Series(np.nan, index=chunk.index)
+                )
+                werte = werte.mask(werte.isin(vorlage["fehlwerte"]))
+                if spalte in umrechnung:
+                    werte = EINHEITEN[umrechnung[spalte]](werte)
+                chunk[spalte] = werte.round(1)
+            chunk["Temp_min"], chunk["Temp_max"] = temperaturen_reparieren(
+                chunk["Temp_min"], chunk["Temp_max"], chunk["Temperatur"]
+            )
+
+            # Ungültige Zeilen (ohne Datum oder Standort) verwerfen
+            gueltig = chunk["Datum"].notna() & chunk["Standort"].notna()
+            gueltig &= chunk["Standort"].astype(str).str.len() > 0
+            statistik["ungueltig"] += int((~gueltig).sum())
+            chunk = chunk[gueltig]
+
+            # Duplikate: innerhalb der Datei und gegen vorhandene Messungen
+            tage = chunk["Datum"].dt.date
+            neu = ~pd.DataFrame({"s": chunk["Standort"], "t": tage}).duplicated()
+            neu &= ~self.tage_vorhanden(chunk["Standort"], tage)
+            statistik["duplikate"] += int((~neu).sum())
+            chunk = chunk[neu]
+
+            # Fehlende Sonnenstunden aus der Tageslänge schätzen (ein Aufruf pro Block)
+            fehlt = chunk["Sonnenstunden"].isna().to_numpy()
+            if fehlt.any():
+                chunk = chunk.copy()
+                chunk.loc[fehlt, "Sonnenstunden"] = sonne.sonnenstunden_schaetzen(
+                    standort_breiten(chunk.loc[fehlt, "Standort"]),
+                    chunk.loc[fehlt, "Datum"],
+                    niederschlag=chunk.loc[fehlt, "Niederschlag"].fillna(0).to_numpy(),
+                )
+
+            chunk = chunk.astype(object).where(chunk.notna(), None)
+            batch = [
+                WetterMessung(
+                    id=zeile.get("ID"),
+                    datum=zeile["Datum"],
+                    temperatur=zeile["Temperatur"],
+                    niederschlag=zeile["Niederschlag"] or 0,
+                    sonnenstunden=zeile["Sonnenstunden"],
+                    quelle=zeile.get("Quelle") or quelle,
+                    standort=zeile["Standort"],
+                    temp_min=zeile["Temp_min"],
+                    temp_max=zeile["Temp_max"],
+                )
+                for zeile in chunk.to_dict("records")
+            ]
+            self.hinzufuegen_mehrere(batch)
+            statistik["uebernommen"] += len(batch)
+            if nach_batch and batch:
+                nach_batch(batch)
+
+        return statistik
+
+    @staticmethod
+    def load_github_data(debug=False, ort_filter=None):
+        """
+        Liefert die Wetterdaten als WetterAnalyse-Objekt, ohne auf GitHub zu warten.
+
+        Parameter:
+            debug (bool): Wenn True, wird synchron mit GitHub abgeglichen und ohne Cache geladen.
+                          Wenn False, wird der aktuelle Schnappschuss aus `daten_speicher()`
+                          verwendet und bei Bedarf im Hintergrund aktualisiert.
+            ort_filter (str|None): Nur bei partitionierter Ablage: zu ladender Standort
+                          ("Alle" = alle Partitionen, None = erster Standort des Manifests).
+
+        Rückgabe:
+            WetterAnalyse: Objekt mit allen geladenen Messungen.
+
+        Hinweise:
+            - Stale-while-revalidate: Sofort wird der vorhandene Stand (lokale Datei oder
+              letzter GitHub-Abruf) angezeigt; ist er älter als DATEN_TTL, holt ein
+              Hintergrund-Thread den neuen Stand und tauscht ihn atomar aus.
+            - Nur wenn noch gar kein Stand vorhanden ist, wird einmalig blockierend geladen.
+            - Pro Datenversion wird das Objekt nur einmal aufgebaut (`st.cache_resource`);
+              jede Session erhält eine flache Kopie (`kopie`), die sie verändern darf.
+            - Gibt es ein Manifest (`MANIFEST_PATH`), wird nur das kleine Manifest abgeglichen
+              und nur die Partition(en) des gewählten Standorts geladen; weitere Standorte
+              werden bei Bedarf nachgeladen (`partitionen_laden`).
+        """
+        manifest = manifest_speicher()
+        if debug or (manifest.schnappschuss()[0] is None and not manifest.geprueft):
+            manifest.aktualisieren()
+        else:
+            manifest.im_hintergrund_aktualisieren()
+        version, inhalt, _, _ = manifest.schnappschuss()
+        if version is not None and isinstance(inhalt, dict):
+            partitionen = sorted(inhalt.get("partitionen", {}))
+            if ort_filter == "Alle":
+                standorte = tuple(partitionen)
+            elif ort_filter in partitionen:
+                standorte = (ort_filter,)
+            else:
+                standorte = tuple(partitionen[:1])
+            if debug:
+                wd = WetterAnalyse()
+                wd.partitionen_setzen(inhalt, version, partition_laden)
+                wd.partitionen_laden(standorte)
+                return wd
+            return _analyse_fuer_partitionen(version, standorte, inhalt).kopie()
+
+        speicher = daten_speicher()
+        if debug or (speicher.schnappschuss()[0] is None and not speicher.geprueft):
+            speicher.aktualisieren()
+        else:
+            speicher.im_hintergrund_aktualisieren()
+
+        version, eintraege, _, _ = speicher.schnappschuss()
+        if debug:
+            wd = WetterAnalyse()
+            wd.stand_uebernehmen(eintraege, version=version)
+            return wd
+        return _analyse_fuer_version(version, eintraege).kopie()
 
 
 # Analyse & Diagramme
@@ -334,6 +2281,8 @@ class WetterAnalyse(WetterDaten):
             - Extremwerte: heißester Tag (Maximaltemperatur) und kältester Tag (Minimaltemperatur)
         Hinweise:
             - Verwendet Temp_min und Temp_max für Extremwertberechnung.
+            - Bereits verdichtete Jahre (`verdichtete_werte`, Jahreswerte) werden mit
+              Summen, Anzahlen und Extremwerten einbezogen, ohne ihre Tageswerte zu laden.
             - Gibt nichts zurück, Daten werden direkt über Streamlit angezeigt.
         """
 
@@ -341,27 +2290,52 @@ class WetterAnalyse(WetterDaten):
         df = self.als_dataframe()
         if ort_filter != "Alle":
             df = df[df["Standort"] == ort_filter]
-        if df.empty:
+        jahre = verdichtung_filtern(verdichtete_werte()["jahre"], ort_filter)
+        if df.empty and jahre.empty:
             st.info("Keine Daten vorhanden")
             return
 
-        # Durchschnittswerte und Summen anzeigen (nur gültige Werte)
-        temp_mean = df["Temperatur"].mean()
+        # Durchschnittswerte und Summen anzeigen (nur gültige Werte, inkl. verdichteter Jahre)
+        temp_anzahl = df["Temperatur"].count()
+        temp_summe = df["Temperatur"].sum()
         nied_sum = df["Niederschlag"].sum()
         sonne_sum = df["Sonnenstunden"].sum()
+        if not jahre.empty:
+            temp_anzahl += jahre["Temperatur_anzahl"].sum()
+            temp_summe += jahre["Temperatur_summe"].sum()
+            nied_sum += jahre["Niederschlag_summe"].sum()
+            sonne_sum += jahre["Sonnenstunden_summe"].sum()
+            st.caption(
+                f"Inklusive verdichteter Jahre {jahre['Jahr'].min()}–{jahre['Jahr'].max()} "
+                "(Monats-/Jahreswerte)."
+            )
+        temp_mean = temp_summe / temp_anzahl if temp_anzahl else float("nan")
 
         st.write(f"Durchschnittstemperatur: {temp_mean:.2f} °C")
         st.write(f"Gesamtniederschlag: {nied_sum:.2f} mm")
         st.write(f"Gesamte Sonnenstunden: {sonne_sum:.2f} h")
 
         # Extremwerte (heißester und kältester Tag) berechnen
-        df_extrem = df.dropna(subset=["Temp_min", "Temp_max"])
-        if df_extrem.empty:
+        extreme = df.dropna(subset=["Temp_min", "Temp_max"])[["Datum", "Temp_min", "Temp_max"]]
+        if not jahre.empty:
+            extreme = pd.concat(
+                [
+                    extreme,
+                    jahre[["Temp_max_Datum", "Temp_max_max"]].set_axis(
+                        ["Datum", "Temp_max"], axis=1
+                    ),
+                    jahre[["Temp_min_Datum", "Temp_min_min"]].set_axis(
+                        ["Datum", "Temp_min"], axis=1
+                    ),
+                ],
+                ignore_index=True,
+            )
+        if extreme[["Temp_min", "Temp_max"]].isna().all().any():
             st.info("Keine Temperaturdaten für Extremwert-Berechnung.")
             return
 
-        max_tag = df_extrem.loc[df_extrem["Temp_max"].idxmax()]
-        min_tag = df_extrem.loc[df_extrem["Temp_min"].idxmin()]
+        max_tag = extreme.loc[extreme["Temp_max"].idxmax()]
+        min_tag = extreme.loc[extreme["Temp_min"].idxmin()]
 
         st.success(
             f"Heißester Tag: {max_tag['Datum'].date()} mit Max: {max_tag['Temp_max']}°C"
@@ -372,10 +2346,10 @@ class WetterAnalyse(WetterDaten):
 
     def regenwahrscheinlichkeit(self, tage=7, ort_filter="Alle"):
         """
-        Berechnet die Regenwahrscheinlichkeit für die letzten Tage
+        Berechnet die Regenwahrscheinlichkeit für die letzten Kalendertage
 
         Parameter:
-            tage (int): Anzahl der letzten Tage, die betrachtet werden. Standard: 7
+            tage (int): Anzahl der letzten Kalendertage (bis heute). Standard: 7
             ort_filter (str): Optional. Filter für einen bestimmten Ort
                               Standard: "Alle" (alle Standorte berücksichtigen)
 
@@ -384,36 +2358,97 @@ class WetterAnalyse(WetterDaten):
 
         Hinweise:
             - Ein Tag zählt als "Regen", wenn der Niederschlag > 0 mm ist.
-            - Nutzt nur die vorhandenen Wetterdaten im DataFrame.
+            - Bezugsgröße sind die Tage mit Messung im Zeitraum (pro Standort), nicht die Zeilenanzahl.
+            - Nutzt die pro Datenversion gecachten Tageswerte aus `rollende_kennzahlen`.
         """
-
-        df = self.als_dataframe()
-        if df.empty:
+        tageswerte = self.rollende_kennzahlen()
+        if tageswerte.empty:
             return 0
         if ort_filter != "Alle":
-            df = df[df["Standort"] == ort_filter]
-        letzte_tage = df.sort_values("Datum").tail(tage)
-        regen_tage = letzte_tage[letzte_tage["Niederschlag"] > 0]  # Tage mit Regen
-        wahrscheinlichkeit = len(regen_tage) / tage * 100  # % Regen
-        return round(wahrscheinlichkeit, 1)
+            tageswerte = tageswerte[tageswerte["Standort"] == ort_filter]
+        heute = pd.Timestamp.now().normalize()
+        zeitraum = tageswerte[
+            (tageswerte["Datum"] > heute - pd.Timedelta(days=tage))
+            & (tageswerte["Datum"] <= heute)
+        ]
+        if zeitraum.empty:
+            return 0
+        return round(zeitraum["Regen"].mean() * 100, 1)
+
+    def rollende_kennzahlen(self, fenster=7):
+        """
+        Gleitende Kennzahlen über Kalendertage für alle Standorte.
+
+        Parameter:
+            fenster (int): Fensterlänge in Kalendertagen. Standard: 7
+
+        Rückgabe:
+            pd.DataFrame: eine Zeile pro Standort und Tag mit den Spalten
+                Standort, Datum, Temperatur, Sonnenstunden, Niederschlag, Regen,
+                Temperatur_Mittel, Sonnenstunden_Mittel, Regenwahrscheinlichkeit (%),
+                Messtage (Tage mit Messung im Fenster) und Regenserie (aufeinanderfolgende Regentage).
+
+        Hinweise:
+            - Ein Durchlauf über alle Standorte, zwischengespeichert pro Datenversion und Fenster.
+            - Das Fenster umfasst Kalendertage: fehlende Tage verkürzen es, statt ältere Zeilen nachzuziehen.
+            - Das Ergebnis ist geteilt und darf nicht verändert werden.
+        """
+        return _rollend_fuer_version(self.version, self, fenster)
+
+    def prognose_backtest(self, tage=3):
+        """
+        Spielt alle Prognose-Methoden über die gesamte Historie jedes Standorts nach.
+
+        Parameter:
+            tage (int): Prognosehorizont in Tagen (Messtagen). Standard: 3
+
+        Rückgabe:
+            pd.DataFrame: eine Zeile pro Standort ("Alle" = alle Standorte zusammen), Größe
+                (Temperatur/Niederschlag), Methode und Horizont mit MAE, RMSE und Anzahl.
+
+        Hinweise:
+            - Zwischengespeichert pro Datenversion (`_backtest_fuer_version`).
+            - Siehe `prognose_rueckblick` für die Berechnung.
+        """
+        return _backtest_fuer_version(self.version, self, tage)
+
+    def standortvergleich(self, tage=None):
+        """
+        Kennzahlen aller Standorte für einen Zeitraum, berechnet in einem gruppierten Durchlauf.
+
+        Parameter:
+            tage (int|None): Länge des Zeitraums in Kalendertagen bis zum letzten Messtag
+                             aller Standorte. None = gesamter Zeitraum.
+
+        Rückgabe:
+            pd.DataFrame: eine Zeile pro Standort, siehe `_vergleich_fuer_version`.
+
+        Hinweise:
+            - Zwischengespeichert pro Datenversion und Zeitraum; das Ergebnis ist geteilt
+              und darf nicht verändert werden.
+        """
+        return _vergleich_fuer_version(self.version, self, tage)
 
     def export_github_json(self, debug_mode=False):
         """
         Exportiert aktuelle Wetterdaten als JSON auf GitHub und lokal.
 
         Parameter:
-            debug_mode (bool): Wenn True, zeigt die JSON-Payload in Streamlit an.
+            debug_mode (bool): Wenn True, zeigt `upload_status` nach dem Upload die JSON-Payload an.
 
         Funktionsweise:
-            - Alte GitHub-Daten werden geladen.
-            - Neue Messungen + alte Messungen zusammengeführt, Duplikate per ID entfernt.
-            - JSON-Datei lokal gespeichert (als Fallback).
-            - Prüft, ob die Datei bereits auf GitHub existiert:
-                - Wenn ja, wird die aktuelle SHA der Datei abgerufen und im Update-Payload
-                  verwendet, damit GitHub die Datei korrekt überschreiben kann.
-                - Wenn nein, wird ein neues File erstellt.
+            - Aktuelle GitHub-Daten werden geladen (inkl. SHA).
+            - Nur die lokalen Änderungen (neu, ersetzt, gelöscht) werden per ID in diesen
+              Stand eingearbeitet – Änderungen anderer Instanzen bleiben erhalten.
             - JSON wird Base64-codiert und mit einem PUT-Request auf GitHub hochgeladen.
-            - Statusmeldung in Streamlit angezeigt (Erfolg oder Fehler).
+            - Bei einem SHA-Konflikt (409) wird neu geladen, erneut zusammengeführt und
+              mit Backoff wiederholt (siehe `github_speichern`).
+            - JSON-Datei lokal gespeichert (als Fallback).
+            - Der Upload läuft im Hintergrund (`upload_manager`); die Funktion kehrt sofort
+              zurück. Der Status wird über `upload_status` angezeigt.
+
+        Rückgabe:
+            UploadHandle|None: Status des Uploads; None, wenn es keine Änderungen gibt.
 
         SHA (Secure Hash Algorithm):
             - GitHub speichert zu jeder Datei einen SHA-1 Hash.
@@ -424,55 +2459,141 @@ class WetterAnalyse(WetterDaten):
             - GitHub prüft so, ob man wirklich die neueste Version der Datei überschreibt.
             - Ohne SHA würde ein Update fehlschlagen oder es könnte zu Konflikten kommen.
         """
-        #Alte GitHub Daten laden
-        #alt_wd = WetterAnalyse()
-        #alt_wd.import_github_json()
+        if not self.hat_aenderungen():
+            return None
 
-        #kombi = list({m.id: m for m in (alt_wd.messungen + self.messungen)}.values())
-        #daten = [m.als_dict() for m in kombi]
+        anzahl = len(self._geaendert) + len(self._geloescht)
+        handle = upload_manager().starten(
+            self.aenderungen_abgeben(), beschreibung=f"{anzahl} Änderung(en)"
+        )
+        handle.debug = debug_mode  # Payload nach dem Upload in `upload_status` anzeigen
+        st.session_state.setdefault("uploads", []).append(handle)
+        st.info("Speichern auf GitHub läuft im Hintergrund …")
+        return handle
 
-        # Nur aktuelle Messungen exportieren
-        daten = [m.als_dict() for m in self.messungen]
+    def github_speichern(self, uebernehmen=True):
+        """
+        Speichert die lokalen Änderungen auf GitHub und lokal (Fallback), ohne Streamlit-Ausgaben.
 
-        if debug_mode:
-            st.text_area(
-                "🔍 GitHub-Payload (Debug)", json.dumps(daten, indent=2), height=250
-            )
+        Parameter:
+            uebernehmen (bool): Nach dem Speichern den zusammengeführten Stand übernehmen.
+                Mit False werden nur die lokalen Änderungen zurückgesetzt; die Messungen
+                anderer Instanzen werden nicht aufgebaut (für blockweise Importe, `block_speichern`).
 
-        # Lokaler Fallback
-        with open("wetterdaten.json", "w", encoding="utf-8") as f:
-            json.dump(daten, f, ensure_ascii=False, indent=2)
+        Rückgabe:
+            requests.Response: Antwort des letzten PUT-Requests; Status 304, wenn der
+            zusammengeführte Inhalt bereits identisch auf GitHub liegt (kein PUT).
+
+        Funktionsweise (Optimistic Concurrency):
+            1. Aktuellen Remote-Stand inkl. SHA laden.
+            2. Lokale Änderungen per ID zusammenführen (`zusammenfuehren`, Tombstones für Löschungen).
+            3. Ergebnis einmal kompakt serialisieren (`daten_serialisieren`) und die Git-Blob-SHA
+               lokal berechnen. Stimmt sie mit der Remote-SHA überein, entfällt der Upload.
+            4. Mit der geladenen SHA hochladen. Hat eine andere Instanz die Datei inzwischen
+               geändert, antwortet GitHub mit 409 – dann mit Backoff ab Schritt 1 wiederholen.
+            5. Nach Erfolg wird derselbe Puffer atomar als lokale Datei geschrieben und der
+               zusammengeführte Stand übernommen (inkl. fremder Änderungen).
+            Der hochgeladene Puffer steht danach in `self.nutzlast` (z. B. für die Debug-Anzeige).
 
-        # GitHub URL & Header
-        url = f"https://api.github.com/repos/{GITHUB_REPO}/contents/{GITHUB_JSON_PATH}"
-        headers = {"Authorization": f"token {GITHUB_TOKEN}"} if GITHUB_TOKEN else {}
+        Hinweise:
+            - Wird von `export_github_json` und vom Ingestion-Worker (`cli.py worker`) genutzt.
+            - Liegt auf GitHub ein Manifest, wird stattdessen partitioniert gespeichert
+              (`_partitionen_speichern`); `self.nutzlast` ist dann das Manifest.
+        """
+        if github_datei_laden(MANIFEST_PATH)[0] is not None:
+            return self._partitionen_speichern()
 
-        # SHA holen (für Update)
-        try:
-            resp = requests.get(f"{url}?ref={GITHUB_BRANCH}", headers=headers)
-            resp.raise_for_status()
-            sha = resp.json().get("sha")
-        except Exception:
-            sha = None  # Datei existiert noch nicht
-
-        # Content vorbereiten
-        content = base64.b64encode(json.dumps(daten, indent=2).encode()).decode()
-
-        # Payload für PUT
-        payload = {
-            "message": "Update Wetterdaten",
-            "branch": GITHUB_BRANCH,
-            "content": content,
-        }
-        if sha:
-            payload["sha"] = sha  # SHA nur hinzufügen, wenn Datei existiert
+        resp, daten, self.nutzlast = github_konfliktfrei_schreiben(
+            GITHUB_JSON_PATH, lambda remote: self.zusammenfuehren(remote or [])
+        )
+        self.nutzlast_pfad = GITHUB_JSON_PATH
+        if resp.status_code in [200, 201, 304]:
+            # Lokaler Fallback
+            datei_atomar_schreiben(GITHUB_JSON_PATH, self.nutzlast)
+            if uebernehmen:
+                self.stand_uebernehmen(daten, version=git_blob_sha(self.nutzlast))
+            else:
+                self._geaendert = {}
+                self._geloescht = {}
+        return resp
 
-        # PUT-Request
-        resp = requests.put(url, headers=headers, data=json.dumps(payload))
-        if resp.status_code in [200, 201]:
-            st.success("Wetterdaten erfolgreich auf GitHub aktualisiert!")
-        else:
-            st.error(f"Fehler beim GitHub-Update: {resp.status_code} – {resp.text}")
+    def block_speichern(self):
+        """
+        Speichert die Änderungen eines Import-Blocks und gibt die gespeicherten Messungen frei.
+
+        Rückgabe:
+            requests.Response: Antwort von `github_speichern`.
+
+        Hinweise:
+            - Der Remote-Stand wird nicht übernommen (`uebernehmen=False`); im Speicher
+              bleiben nur der Tagesindex für die Duplikatprüfung und ungespeicherte Änderungen.
+            - Die Remote-Datei (bzw. die Partitionen der betroffenen Standorte) wird beim
+              Zusammenführen trotzdem einmal pro Block gelesen und geschrieben.
+        """
+        resp = self.github_speichern(uebernehmen=False)
+        if resp.status_code in [200, 201, 304]:
+            self.gespeicherte_freigeben()
+        return resp
+
+    def _partitionen_speichern(self):
+        """
+        Speichert die Änderungen in die Partitionen der betroffenen Standorte und
+        trägt deren neue Kennzahlen (Anzahl, Zeitraum, SHA) ins Manifest ein.
+
+        Rückgabe:
+            requests.Response: Antwort des Manifest-Uploads bzw. des ersten fehlgeschlagenen
+            Partition-Uploads.
+
+        Hinweise:
+            - Nicht betroffene Partitionen werden weder gelesen noch geschrieben.
+            - Schlägt ein Upload fehl, bleiben die Änderungen erhalten; ein erneuter Aufruf
+              führt bereits geschriebene Partitionen ohne PUT (304) zusammen.
+            - Leere Partitionen werden aus dem Manifest entfernt.
+        """
+        eintraege = {}
+        for standort in sorted({s or "" for s in self.geaenderte_standorte()}):
+            pfad = partition_pfad(standort)
+            resp, daten, inhalt = github_konfliktfrei_schreiben(
+                pfad, lambda remote, s=standort: self.zusammenfuehren(remote or [], standort=s)
+            )
+            if resp.status_code not in [200, 201, 304]:
+                return resp
+            datei_atomar_schreiben(pfad, inhalt)
+            eintraege[standort] = partition_info(pfad, daten, inhalt)
+
+        def manifest_zusammenfuehren(remote):
+            partitionen = dict((remote or {}).get("partitionen", {}))
+            partitionen.update(eintraege)
+            return {
+                "partitionen": {
+                    s: info for s, info in sorted(partitionen.items()) if info["anzahl"]
+                }
+            }
+
+        resp, manifest, self.nutzlast = github_konfliktfrei_schreiben(
+            MANIFEST_PATH, manifest_zusammenfuehren
+        )
+        self.nutzlast_pfad = MANIFEST_PATH
+        if resp.status_code in [200, 201, 304]:
+            datei_atomar_schreiben(MANIFEST_PATH, self.nutzlast)
+            self._geaendert = {}
+            self._geloescht = {}
+            if self._partitionen is not None:
+                self._partitionen = manifest["partitionen"]
+                self._manifest_version = git_blob_sha(self.nutzlast)
+                self.version = self._partition_version()
+        return resp
+
+    def partitionen_anlegen(self):
+        """
+        Migriert den geladenen Bestand in die partitionierte Ablage (eine Datei pro Standort
+        plus Manifest). `wetterdaten.json` bleibt unverändert liegen.
+
+        Rückgabe:
+            requests.Response: Antwort des Manifest-Uploads (siehe `_partitionen_speichern`).
+        """
+        self._geaendert = {m.id: m for m in self.messungen}
+        return self._partitionen_speichern()
 
     def prognose_mittelwert(self, serie, tage=3):
         """
@@ -595,7 +2716,7 @@ class WetterAnalyse(WetterDaten):
             return []
         return self.prognose_trend(df["Niederschlag"], tage, is_precipitation=True)
 
-    def plot_3tage_prognose(self, ort_filter="Alle"):
+    def plot_3tage_prognose(self, ort_filter="Alle", zeichner=None):
         """
         Erstellt ein 3-Tage-Prognose-Diagramm für Temperatur und Niederschlag.
 
@@ -637,20 +2758,29 @@ class WetterAnalyse(WetterDaten):
                 st.info(f"Keine Daten für Quelle '{quelle_filter}'.")
                 return
 
-        # Prognose-Methode auswählen
+        # Prognose-Methode auswählen (Vorauswahl: genaueste Methode laut Backtest)
+        beste = beste_prognose_methode(self, ort_filter)
         methode = st.selectbox(
             "Prognose-Methode wählen:",
-            ["Mittelwert-Prognose", "Trendbasierte Prognose", "Überraschungsprognose"],
+            PROGNOSE_METHODEN,
+            index=PROGNOSE_METHODEN.index(beste) if beste else 0,
             key="prognose_methode",
         )
 
-        tage = 3
+        daten = self.prognose_daten(df, methode)
+        (zeichner or DiagrammZeichner()).zeigen("prognose", daten, methode=methode)
+
+    def prognose_daten(self, df, methode, tage=3):
+        """
+        Berechnet die Prognose für die nächsten Tage als Tabelle (Aggregationsschritt).
+
+        Rückgabe:
+            pd.DataFrame: Spalten Tag ("TT-MM"), Temperatur, Niederschlag.
+        """
         labels = [
             (datetime.datetime.now() + datetime.timedelta(days=i)).strftime("%d-%m")
             for i in range(1, tage + 1)
         ]
-
-        # Prognosen erstellen
         if methode == "Mittelwert-Prognose":
             temp = self.prognose_mittelwert(df["Temperatur"], tage)
             nied = self.prognose_mittelwert(df["Niederschlag"], tage)
@@ -659,25 +2789,12 @@ class WetterAnalyse(WetterDaten):
             nied = self.prognose_trend(df["Niederschlag"], tage, is_precipitation=True)
         else:  # Überraschungsprognose
             temp = self.prognose_ueberraschung(df["Temperatur"], tage)
-            nied = self.prognose_ueberraschung(
-                df["Niederschlag"], tage, is_precipitation=True
-            )
-
-        # Diagramm: Temperatur und Niederschlag nebeneinander
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(10, 4))
-
-        ax1.plot(labels, temp, marker="o", color="red", linewidth=2)
-        ax1.set_ylabel("°C")
-        ax1.set_title(f"Temperaturprognose – {methode}")
-
-        ax2.bar(labels, nied, color="blue", alpha=0.6)
-        ax2.set_ylabel("mm")
-        ax2.set_title(f"Niederschlagsprognose – {methode}")
-
-        plt.tight_layout()
-        st.pyplot(fig)
+            nied = self.prognose_ueberraschung(
+                df["Niederschlag"], tage, is_precipitation=True
+            )
+        return pd.DataFrame({"Tag": labels, "Temperatur": temp, "Niederschlag": nied})
 
-    def plot_7tage_vergleich(self, ort_filter="Alle"):
+    def plot_7tage_vergleich(self, ort_filter="Alle", zeichner=None):
         """
         Visualisiert Niederschlag und Sonnenstunden der letzten 7 Tage.
 
@@ -721,42 +2838,38 @@ class WetterAnalyse(WetterDaten):
                 st.info(f"Keine Daten für Quelle '{quelle_filter}'.")
                 return
 
-        heute = pd.Timestamp(datetime.datetime.now())
-        letzte7 = [heute - pd.Timedelta(days=i) for i in range(6, -1, -1)]
-        nied, sonne = [], []
-        for tag in letzte7:
-            row = df[df["Datum"].dt.date == tag.date()]
-            nied.append(row["Niederschlag"].sum() if not row.empty else 0)
-            sonne.append(row["Sonnenstunden"].sum() if not row.empty else 0)
-
-        if sum(nied) == 0 and sum(sonne) == 0:
+        daten = self.daten_7tage(df)
+        if daten["Niederschlag"].sum() == 0 and daten["Sonnenstunden"].sum() == 0:
             st.info("Keine Messwerte für die letzten 7 Tage.")
             return
 
-        labels = [tag.strftime("%d-%m") for tag in letzte7]
-        x = np.arange(len(labels))
-        width = 0.35
+        (zeichner or DiagrammZeichner()).zeigen("7tage", daten)
 
-        # Zwei nebeneinanderliegende plots
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 4))
-
-        ax1.bar(x, nied, width, color="blue")
-        ax1.set_xticks(x)
-        ax1.set_xticklabels(labels)
-        ax1.set_ylabel("mm")
-        ax1.set_title("Niederschlag letzte 7 Tage")
-
-        ax2.bar(x, sonne, width, color="orange")
-        ax2.set_xticks(x)
-        ax2.set_xticklabels(labels)
-        ax2.set_ylabel("h")
-        ax2.set_title("Sonnenstunden letzte 7 Tage")
+    @staticmethod
+    def daten_7tage(df):
+        """
+        Tägliche Summen von Niederschlag und Sonnenstunden der letzten 7 Tage (Aggregationsschritt).
 
-        plt.tight_layout()
-        st.pyplot(fig)
+        Rückgabe:
+            pd.DataFrame: Spalten Tag ("TT-MM"), Niederschlag, Sonnenstunden; fehlende Tage mit 0.
+        """
+        heute = pd.Timestamp(datetime.datetime.now()).normalize()
+        letzte7 = pd.date_range(heute - pd.Timedelta(days=6), heute)
+        summen = (
+            df.groupby(df["Datum"].dt.normalize())[["Niederschlag", "Sonnenstunden"]]
+            .sum()
+            .reindex(letzte7, fill_value=0)
+        )
+        return pd.DataFrame(
+            {
+                "Tag": letzte7.strftime("%d-%m"),
+                "Niederschlag": summen["Niederschlag"].to_numpy(),
+                "Sonnenstunden": summen["Sonnenstunden"].to_numpy(),
+            }
+        )
 
     # Vergleich der Monate (Niederschlag und Sonnenstuunden)
-    def plot_monatsvergleich(self, ort_filter="Alle"):
+    def plot_monatsvergleich(self, ort_filter="Alle", zeichner=None):
         """
         Zeigt den Monatsvergleich von Niederschlag und Sonnenstunden für aktuelles und
         letztes Jahr an.
@@ -771,154 +2884,1267 @@ class WetterAnalyse(WetterDaten):
             - Summiert für jeden Monat:
                 - Niederschlag (mm)
                 - Sonnenstunden (h)
+            - Bereits verdichtete Monate kommen direkt aus den Monatswerten (`verdichtete_werte`).
             - Erstellt zwei nebeneinanderliegende Balkendiagramme:
                 - Linkes Diagramm: Niederschlag – aktuelles Jahr vs letztes Jahr
                 - Rechtes Diagramm: Sonnenstunden – aktuelles Jahr vs letztes Jahr
             - Zeigt informative Meldungen an, falls keine Daten vorhanden sind.
         """
 
-        st.subheader("Monatsvergleich – Niederschlag & Sonnenstunden")
-        df = self.als_dataframe()
-        if df.empty:
-            st.info("Keine Daten vorhanden.")
-            return
+        st.subheader("Monatsvergleich – Niederschlag & Sonnenstunden")
+        df = self.als_dataframe()
+        monate = verdichtete_werte()["monate"]
+        if df.empty and monate.empty:
+            st.info("Keine Daten vorhanden.")
+            return
+
+        # Filter nach Ort
+        if ort_filter != "Alle":
+            df = df[df["Standort"] == ort_filter]
+            monate = verdichtung_filtern(monate, ort_filter)
+            if df.empty and monate.empty:
+                st.info("Keine Daten für diesen Ort.")
+                return
+
+        # Filter nach Quelle
+        quelle_filter = st.selectbox(
+            "Quelle auswählen:",
+            ["Alle", "manuell", "simuliert", "live"],
+            key="quelle_monatsvergleich",
+        )
+        if quelle_filter != "Alle":
+            df = df[df["Quelle"] == quelle_filter]
+            monate = verdichtung_filtern(monate, quelle_filter=quelle_filter)
+            if df.empty and monate.empty:
+                st.info(f"Keine Daten für Quelle '{quelle_filter}'.")
+                return
+
+        aktuelles_jahr = datetime.datetime.now().year
+        daten = self.daten_monatsvergleich(df, [aktuelles_jahr, aktuelles_jahr - 1], monate)
+        if daten[["Niederschlag", "Sonnenstunden"]].to_numpy().sum() == 0:
+            st.info("Keine Messwerte für die Monatsvergleiche.")
+            return
+
+        (zeichner or DiagrammZeichner()).zeigen("monatsvergleich", daten)
+
+    @staticmethod
+    def daten_monatsvergleich(df, jahre, monate=None):
+        """
+        Monatssummen von Niederschlag und Sonnenstunden für die angegebenen Jahre (Aggregationsschritt).
+
+        Parameter:
+            monate (pd.DataFrame|None): verdichtete Monatswerte (bereits gefiltert); ihre
+                Summen werden zu denen der Tageswerte addiert.
+
+        Rückgabe:
+            pd.DataFrame: Spalten Jahr, Monat (1–12), Niederschlag, Sonnenstunden;
+                          eine Zeile pro Jahr und Monat, fehlende Monate mit 0.
+        """
+        index = pd.MultiIndex.from_product([jahre, range(1, 13)], names=["Jahr", "Monat"])
+        df = df[df["Datum"].dt.year.isin(jahre)]
+        summen = (
+            df.groupby([df["Datum"].dt.year.rename("Jahr"), df["Datum"].dt.month.rename("Monat")])[
+                ["Niederschlag", "Sonnenstunden"]
+            ]
+            .sum()
+            .reindex(index, fill_value=0)
+        )
+        if monate is not None and not monate.empty:
+            verdichtet = (
+                monate[monate["Jahr"].isin(jahre)]
+                .groupby(["Jahr", "Monat"])[["Niederschlag_summe", "Sonnenstunden_summe"]]
+                .sum()
+                .reindex(index, fill_value=0)
+            )
+            summen += verdichtet.to_numpy()
+        return summen.reset_index()
+
+
+# Diagramme: Darstellung aus vorab aggregierten Tabellen
+# - "vega-lite": Altair-Spezifikation, gerendert und interaktiv im Browser (Tooltips, Zoom, Legende)
+# - "matplotlib": statische Bilder, z. B. für Exporte (PNG aus dem Prozesspool, siehe diagramm_pool)
+DIAGRAMM_BACKENDS = {
+    "Interaktiv (Vega-Lite)": "vega-lite",
+    "Statisch (Matplotlib)": "matplotlib",
+}
+DIAGRAMM_BACKEND = st.secrets["Legacy91988"].get("diagramm_backend", "vega-lite")
+
+
+def vega_prognose(daten, methode):
+    """Vega-Lite-Diagramm der Prognose."""
+    basis = alt.Chart(daten).encode(x=alt.X("Tag:O", sort=None, title=None))
+    temperatur = (
+        basis.mark_line(point=True, color="red")
+        .encode(y=alt.Y("Temperatur:Q", title="°C"), tooltip=["Tag", "Temperatur"])
+        .properties(title=f"Temperaturprognose – {methode}")
+    )
+    niederschlag = (
+        basis.mark_bar(color="blue", opacity=0.6)
+        .encode(y=alt.Y("Niederschlag:Q", title="mm"), tooltip=["Tag", "Niederschlag"])
+        .properties(title=f"Niederschlagsprognose – {methode}")
+    )
+    return alt.hconcat(temperatur, niederschlag)
+
+
+def vega_7tage(daten):
+    """Vega-Lite-Diagramm: Niederschlag und Sonnenstunden der letzten 7 Tage."""
+    basis = alt.Chart(daten).encode(x=alt.X("Tag:O", sort=None, title=None))
+    niederschlag = (
+        basis.mark_bar(color="blue")
+        .encode(y=alt.Y("Niederschlag:Q", title="mm"), tooltip=["Tag", "Niederschlag"])
+        .properties(title="Niederschlag letzte 7 Tage")
+    )
+    sonne = (
+        basis.mark_bar(color="orange")
+        .encode(y=alt.Y("Sonnenstunden:Q", title="h"), tooltip=["Tag", "Sonnenstunden"])
+        .properties(title="Sonnenstunden letzte 7 Tage")
+    )
+    return alt.hconcat(niederschlag, sonne)
+
+
+def vega_monatsvergleich(daten):
+    """Vega-Lite-Diagramm: Monatssummen je Jahr; Jahre über die Legende ein-/ausblendbar."""
+    daten = daten.assign(Monatsname=[MONATSNAMEN[m - 1] for m in daten["Monat"]])
+    auswahl = alt.selection_point(fields=["Jahr"], bind="legend")
+    basis = alt.Chart(daten).encode(
+        x=alt.X("Monatsname:O", sort=MONATSNAMEN, title=None),
+        xOffset="Jahr:N",
+        color=alt.Color("Jahr:N"),
+        opacity=alt.condition(auswahl, alt.value(1.0), alt.value(0.15)),
+    )
+    diagramme = [
+        basis.mark_bar()
+        .encode(
+            y=alt.Y(f"{spalte}:Q", title=einheit),
+            tooltip=["Jahr:N", "Monatsname", f"{spalte}:Q"],
+        )
+        .properties(title=titel)
+        for spalte, einheit, titel in [
+            ("Niederschlag", "mm", "Monatlicher Niederschlag"),
+            ("Sonnenstunden", "h", "Monatliche Sonnenstunden"),
+        ]
+    ]
+    # Auswahl nur einmal definieren; die gemeinsame Legende steuert beide Diagramme
+    diagramme[0] = diagramme[0].add_params(auswahl)
+    return alt.hconcat(*diagramme)
+
+
+def geteilt(art):
+    """
+    Legt das Ergebnis einer Auswertung `funktion(version, _wd, *parameter)` zusätzlich in der
+    gemeinsamen Ablage ab, damit es pro Datenversion nur ein Prozess berechnet.
+
+    Steht unter `@st.cache_resource`: der Prozess-Cache bleibt die erste Stufe, die Ablage wird
+    nur bei einem Fehlgriff gefragt. Versionen lokaler, ungespeicherter Änderungen (uuid4)
+    gibt es nur in einem Prozess; sie werden nicht abgelegt.
+    """
+
+    def dekorator(funktion):
+        @functools.wraps(funktion)
+        def mit_ablage(version, _wd, *parameter):
+            ablage = gemeinsame_ablage()
+            if ablage is None or not re.fullmatch(r"[0-9a-f]{40}", str(version)):
+                return funktion(version, _wd, *parameter)
+            return ablage.holen_oder_berechnen(
+                f"{art}:{version}:{parameter!r}", lambda: funktion(version, _wd, *parameter)
+            )
+
+        return mit_ablage
+
+    return dekorator
+
+
+# cache_resource + kopie() statt cache_data: Pickle scheitert, sobald parallele Sessions die
+# Klassen im Skriptmodul neu definieren ("Cannot serialize"), und eine flache Kopie ist schneller.
+@st.cache_resource(max_entries=3, show_spinner=False)
+def _analyse_fuer_version(version, _eintraege):
+    """
+    Baut das WetterAnalyse-Objekt einmal pro Datenversion auf (geteilt, nicht verändern).
+    `_eintraege` wird von Streamlit nicht gehasht; der Schlüssel ist nur die Version.
+    """
+    wd = WetterAnalyse()
+    wd.stand_uebernehmen(_eintraege, version=version)
+    return wd
+
+
+@st.cache_resource(max_entries=3, show_spinner=False)
+def _analyse_fuer_partitionen(version, standorte, _manifest):
+    """
+    Baut das WetterAnalyse-Objekt einmal pro Manifest-Version und Standortauswahl auf (geteilt).
+    Die Partitionen selbst kommen aus dem gemeinsamen `partition_cache()`.
+    """
+    wd = WetterAnalyse()
+    wd.partitionen_setzen(_manifest, version, partition_laden)
+    wd.partitionen_laden(standorte)
+    return wd
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+@geteilt("rollend")
+def _rollend_fuer_version(version, _wd, fenster):
+    """
+    Berechnet `WetterAnalyse.rollende_kennzahlen` einmal pro Datenversion und Fenster.
+    `_wd` wird von Streamlit nicht gehasht; das Ergebnis wird ohne Kopie geteilt.
+    """
+    spalten = [
+        "Standort", "Datum", "Temperatur", "Sonnenstunden", "Niederschlag", "Regen",
+        "Temperatur_Mittel", "Sonnenstunden_Mittel", "Regenwahrscheinlichkeit",
+        "Messtage", "Regenserie",
+    ]
+    df = _wd.als_dataframe()
+    if df.empty:
+        return pd.DataFrame(columns=spalten)
+
+    # Tageswerte pro Standort (mehrere Messungen an einem Tag werden zusammengefasst)
+    df["Datum"] = df["Datum"].dt.normalize()
+    df["Standort"] = df["Standort"].fillna("")
+    tage = (
+        df.groupby(["Standort", "Datum"], sort=True)
+        .agg(
+            Temperatur=("Temperatur", "mean"),
+            Sonnenstunden=("Sonnenstunden", "mean"),
+            Niederschlag=("Niederschlag", "max"),
+        )
+        .reset_index()
+    )
+    tage["Regen"] = tage["Niederschlag"].fillna(0) > 0
+
+    # Gleitende Fenster über Kalendertage, alle Standorte in einem groupby
+    rollend = (
+        tage.set_index("Datum")
+        .groupby("Standort", sort=True)[["Temperatur", "Sonnenstunden", "Regen"]]
+        .rolling(f"{fenster}D")
+    )
+    mittel = rollend.mean()
+    tage["Temperatur_Mittel"] = mittel["Temperatur"].to_numpy().round(1)
+    tage["Sonnenstunden_Mittel"] = mittel["Sonnenstunden"].to_numpy().round(1)
+    tage["Regenwahrscheinlichkeit"] = (mittel["Regen"].to_numpy() * 100).round(1)
+    tage["Messtage"] = rollend["Regen"].count().to_numpy().astype(int)
+
+    # Regenserie: neuer Block bei Trockentag, Standortwechsel oder Lücke im Kalender
+    neuer_block = (
+        ~tage["Regen"]
+        | (tage["Standort"] != tage["Standort"].shift())
+        | (tage["Datum"].diff() != pd.Timedelta(days=1))
+    )
+    tage["Regenserie"] = tage["Regen"].astype(int).groupby(neuer_block.cumsum()).cumsum()
+    return tage[spalten]
+
+
+PROGNOSE_METHODEN = ["Mittelwert-Prognose", "Trendbasierte Prognose", "Überraschungsprognose"]
+PROGNOSE_FENSTER = 7  # die Methoden verwenden die letzten 7 Werte
+
+
+def prognose_rueckblick(y, position, tage=3, niederschlag=False, seed=0):
+    """
+    Berechnet alle rollierenden Prognosen einer (oder mehrerer aneinandergehängter) Zeitreihen
+    auf einmal – mit denselben Regeln wie `prognose_mittelwert`, `prognose_trend` und
+    `prognose_ueberraschung`, aber ohne Aufruf pro Tag.
+
+    Parameter:
+        y (np.ndarray): Tageswerte, nach Standort und Datum sortiert.
+        position (np.ndarray): Position jedes Werts innerhalb seines Standorts (0, 1, 2, ...).
+        tage (int): Prognosehorizont.
+        niederschlag (bool): Negative Prognosen auf 0 setzen (wie `is_precipitation`).
+        seed (int): Startwert der Zufallsschwankung (Überraschung), damit Ergebnisse stabil sind.
+
+    Rückgabe:
+        dict: Methode -> Matrix (n × tage) mit der Prognose, die am Tag i für i+1 ... i+tage
+              erstellt worden wäre.
+
+    Funktionsweise:
+        - Die letzten PROGNOSE_FENSTER Werte jedes Tages werden als Matrix (n × 7) aufgebaut;
+          Werte eines anderen Standorts bzw. vor Beginn der Reihe sind NaN.
+        - Mittelwert: Zeilenmittel. Trend: lineare Regression je Zeile in geschlossener Form
+          (Summen über x, y, x·y, x² nur der vorhandenen Werte) – entspricht `np.polyfit`
+          über die vorhandenen Werte an ihren Fensterpositionen.
+    """
+    k = PROGNOSE_FENSTER
+    n_zeilen = len(y)
+    fenster = np.full((n_zeilen, k), np.nan)
+    for spalte in range(k):
+        versatz = k - 1 - spalte
+        gueltig = position >= versatz
+        fenster[versatz:, spalte][gueltig[versatz:]] = y[: n_zeilen - versatz][gueltig[versatz:]]
+    laenge = np.minimum(position + 1, k).astype(np.float64)
+
+    mittel = np.nanmean(fenster, axis=1)
+
+    # Trend: x = 0 ... laenge-1 über die rechten Fensterwerte; Lücken (NaN, z. B. fehlende
+    # Temperatur) zählen weder in den y- noch in den x-Summen
+    x = np.arange(k) - (k - laenge)[:, None]
+    vorhanden = ~np.isnan(fenster)
+    anzahl = vorhanden.sum(axis=1).astype(np.float64)
+    summe_y = np.where(vorhanden, fenster, 0).sum(axis=1)
+    summe_xy = np.where(vorhanden, fenster * x, 0).sum(axis=1)
+    summe_x = (x * vorhanden).sum(axis=1)
+    summe_xx = (x**2 * vorhanden).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        steigung = (anzahl * summe_xy - summe_x * summe_y) / (anzahl * summe_xx - summe_x**2)
+        achse = (summe_y - steigung * summe_x) / anzahl
+    horizont = np.arange(1, tage + 1)
+    trend = achse[:, None] + steigung[:, None] * (laenge[:, None] + horizont)
+    # weniger als 2 Werte -> Mittelwert (wie prognose_trend)
+    trend = np.where((anzahl >= 2)[:, None], trend, mittel[:, None])
+
+    zufall = np.random.default_rng(seed).uniform(-3, 3, (n_zeilen, tage))
+    ergebnis = {
+        "Mittelwert-Prognose": np.repeat(mittel[:, None], tage, axis=1),
+        "Trendbasierte Prognose": trend,
+        "Überraschungsprognose": mittel[:, None] + zufall,
+    }
+    for methode, werte in ergebnis.items():
+        werte = werte.round(1)
+        if niederschlag and methode != "Mittelwert-Prognose":
+            werte = np.maximum(werte, 0)
+        ergebnis[methode] = werte
+    return ergebnis
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+@geteilt("backtest")
+def _backtest_fuer_version(version, _wd, tage):
+    """
+    Berechnet `WetterAnalyse.prognose_backtest` einmal pro Datenversion.
+    `_wd` wird von Streamlit nicht gehasht; das Ergebnis wird ohne Kopie geteilt.
+    """
+    spalten = ["Standort", "Größe", "Methode", "Horizont", "MAE", "RMSE", "Anzahl"]
+    reihen = _wd.rollende_kennzahlen()
+    if reihen.empty:
+        return pd.DataFrame(columns=spalten)
+    reihen = reihen.sort_values(["Standort", "Datum"], kind="stable")
+    standort_codes, standorte = pd.factorize(reihen["Standort"])
+    position = reihen.groupby("Standort").cumcount().to_numpy()
+    laenge = reihen.groupby("Standort")["Standort"].transform("size").to_numpy()
+
+    teile = []
+    for groesse in ["Temperatur", "Niederschlag"]:
+        y = reihen[groesse].to_numpy(np.float64)
+        # Ziel: Wert h Messtage später am selben Standort (sonst NaN)
+        ziele = np.full((len(y), tage), np.nan)
+        for h in range(1, tage + 1):
+            ziele[: len(y) - h, h - 1] = y[h:]
+            ziele[position + h >= laenge, h - 1] = np.nan
+        prognosen = prognose_rueckblick(y, position, tage, niederschlag=groesse == "Niederschlag")
+        for methode, prognose in prognosen.items():
+            fehler = prognose - ziele
+            gueltig = ~np.isnan(fehler)
+            for h in range(tage):
+                maske = gueltig[:, h]
+                codes = standort_codes[maske]
+                f = fehler[maske, h]
+                anzahl = np.bincount(codes, minlength=len(standorte))
+                mae = np.bincount(codes, np.abs(f), minlength=len(standorte))
+                mse = np.bincount(codes, f**2, minlength=len(standorte))
+                gesamt = max(len(f), 1)
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    teile.append(
+                        pd.DataFrame(
+                            {
+                                "Standort": list(standorte) + ["Alle"],
+                                "Größe": groesse,
+                                "Methode": methode,
+                                "Horizont": h + 1,
+                                "MAE": np.r_[mae / anzahl, np.abs(f).sum() / gesamt],
+                                "RMSE": np.sqrt(np.r_[mse / anzahl, (f**2).sum() / gesamt]),
+                                "Anzahl": np.r_[anzahl, len(f)],
+                            }
+                        )
+                    )
+    ergebnis = pd.concat(teile, ignore_index=True)
+    ergebnis = ergebnis[ergebnis["Anzahl"] > 0].reset_index(drop=True)
+    ergebnis[["MAE", "RMSE"]] = ergebnis[["MAE", "RMSE"]].round(2)
+    return ergebnis[spalten]
+
+
+def beste_prognose_methode(wd, ort_filter="Alle", groesse="Temperatur"):
+    """
+    Methode mit dem kleinsten mittleren MAE über alle Horizonte laut Backtest (None ohne Daten).
+    """
+    ergebnis = wd.prognose_backtest()
+    auswahl = ergebnis[(ergebnis["Standort"] == ort_filter) & (ergebnis["Größe"] == groesse)]
+    if auswahl.empty:
+        return None
+    return auswahl.groupby("Methode")["MAE"].mean().idxmin()
+
+
+def backtest_anzeigen(wd, ort_filter="Alle"):
+    """
+    Zeigt die Prognosegüte aller Methoden (MAE/RMSE pro Horizont) aus dem Backtest.
+
+    Funktionsweise:
+        - Jeder Messtag jedes Standorts dient einmal als Prognosezeitpunkt; verglichen wird
+          mit den tatsächlichen Werten der folgenden Messtage.
+        - Ergebnisse sind pro Datenversion gecacht (`WetterAnalyse.prognose_backtest`).
+    """
+    st.subheader("Prognosegüte (Backtest)")
+    ergebnis = wd.prognose_backtest()
+    if ergebnis.empty:
+        st.info("Zu wenige Daten für einen Backtest.")
+        return
+    groesse = st.radio(
+        "Größe", ["Temperatur", "Niederschlag"], horizontal=True, key="backtest_groesse"
+    )
+    auswahl = ergebnis[(ergebnis["Standort"] == ort_filter) & (ergebnis["Größe"] == groesse)]
+    if auswahl.empty:
+        st.info("Zu wenige Daten für einen Backtest.")
+        return
+    tabelle = auswahl.pivot(index="Methode", columns="Horizont", values=["MAE", "RMSE"])
+    tabelle.columns = [f"{wert} +{h} T" for wert, h in tabelle.columns]
+    st.dataframe(tabelle)
+    einheit = "°C" if groesse == "Temperatur" else "mm"
+    beste = beste_prognose_methode(wd, ort_filter, groesse)
+    st.caption(
+        f"Genaueste Methode: {beste} (kleinster mittlerer Fehler in {einheit}, "
+        f"{int(auswahl['Anzahl'].max())} Prognosezeitpunkte)."
+    )
+
+    if ort_filter == "Alle":
+        with st.expander("Pro Standort"):
+            pro_standort = ergebnis[
+                (ergebnis["Standort"] != "Alle") & (ergebnis["Größe"] == groesse)
+            ]
+            st.dataframe(
+                pro_standort.groupby(["Standort", "Methode"])["MAE"]
+                .mean()
+                .round(2)
+                .unstack("Methode")
+            )
+
+
+def rollende_analyse_anzeigen(wd, ort_filter="Alle"):
+    """
+    Zeigt die gleitenden Kennzahlen aller Standorte (aktueller Stand pro Standort)
+    sowie den Verlauf des gleitenden Temperaturmittels.
+    """
+    st.subheader("Gleitende Kennzahlen")
+    fenster = st.selectbox("Fenster (Kalendertage)", [7, 14, 30], key="rollend_fenster")
+    tage = wd.rollende_kennzahlen(fenster)
+    if tage.empty:
+        st.info("Keine Daten vorhanden")
+        return
+
+    # letzter Tag pro Standort plus längste Regenserie
+    letzte = tage.groupby("Standort").tail(1).set_index("Standort")
+    uebersicht = pd.DataFrame(
+        {
+            "Stand": letzte["Datum"].dt.date,
+            f"Ø Temperatur {fenster} T (°C)": letzte["Temperatur_Mittel"],
+            f"Ø Sonne {fenster} T (h)": letzte["Sonnenstunden_Mittel"],
+            "Regenwahrscheinlichkeit (%)": letzte["Regenwahrscheinlichkeit"],
+            "Messtage": letzte["Messtage"],
+            "Aktuelle Regenserie": letzte["Regenserie"],
+            "Längste Regenserie": tage.groupby("Standort")["Regenserie"].max(),
+        }
+    )
+    st.dataframe(uebersicht)
+
+    verlauf = tage if ort_filter == "Alle" else tage[tage["Standort"] == ort_filter]
+    if not verlauf.empty:
+        st.line_chart(
+            verlauf.pivot(index="Datum", columns="Standort", values="Temperatur_Mittel")
+        )
+
+
+VERGLEICH_SPALTEN = [
+    "Standort", "Von", "Bis", "Messtage", "Vollstaendigkeit", "Temperatur_Mittel",
+    "Niederschlag_Summe", "Regentage", "Sonnenstunden_Summe", "Sonnenstunden_Mittel",
+    "Temp_max", "Temp_max_Datum", "Temp_min", "Temp_min_Datum",
+]
+VERGLEICH_ZEITRAEUME = {
+    "Letzte 30 Tage": 30,
+    "Letzte 90 Tage": 90,
+    "Letzte 365 Tage": 365,
+    "Gesamter Zeitraum": None,
+}
+# Anzeige: Kennzahl -> (Spaltenname, höher ist besser für Rang 1)
+VERGLEICH_KENNZAHLEN = {
+    "Ø Temperatur (°C)": ("Temperatur_Mittel", True),
+    "Niederschlag (mm)": ("Niederschlag_Summe", True),
+    "Regentage": ("Regentage", True),
+    "Sonnenstunden (h)": ("Sonnenstunden_Summe", True),
+    "Ø Sonne pro Tag (h)": ("Sonnenstunden_Mittel", True),
+    "Höchste Temperatur (°C)": ("Temp_max", True),
+    "Tiefste Temperatur (°C)": ("Temp_min", False),
+    "Vollständigkeit (%)": ("Vollstaendigkeit", True),
+}
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+@geteilt("vergleich")
+def _vergleich_fuer_version(version, _wd, tage):
+    """
+    Berechnet `WetterAnalyse.standortvergleich` einmal pro Datenversion und Zeitraum.
+
+    Funktionsweise:
+        - Ein groupby über alle Standorte liefert Messtage, Mittel, Summen und Extremwerte;
+          die Tage der Extremwerte kommen aus je einer Sortierung (kein Durchlauf pro Standort).
+        - Vollständigkeit = Tage mit Messung / Kalendertage des Zeitraums (in %).
+        - Bezugstag ist der letzte Messtag aller Standorte, damit auch historische
+          Datenbestände einen sinnvollen Zeitraum ergeben.
+    """
+    df = _wd.als_dataframe()
+    if df.empty:
+        return pd.DataFrame(columns=VERGLEICH_SPALTEN)
+
+    df["Tag"] = df["Datum"].dt.normalize()
+    df["Standort"] = df["Standort"].fillna("")
+    bis = df["Tag"].max()
+    von = df["Tag"].min() if tage is None else bis - pd.Timedelta(days=tage - 1)
+    df = df[df["Tag"] >= von].assign(Regen=lambda d: d["Niederschlag"].fillna(0) > 0)
+
+    vergleich = df.groupby("Standort", sort=True).agg(
+        Von=("Tag", "min"),
+        Bis=("Tag", "max"),
+        Messtage=("Tag", "nunique"),
+        Temperatur_Mittel=("Temperatur", "mean"),
+        Niederschlag_Summe=("Niederschlag", "sum"),
+        Regentage=("Regen", "sum"),
+        Sonnenstunden_Summe=("Sonnenstunden", "sum"),
+        Temp_max=("Temp_max", "max"),
+        Temp_min=("Temp_min", "min"),
+    )
+    vergleich["Vollstaendigkeit"] = (
+        vergleich["Messtage"] / ((bis - von).days + 1) * 100
+    ).round(1)
+    vergleich["Sonnenstunden_Mittel"] = (
+        vergleich["Sonnenstunden_Summe"] / vergleich["Messtage"]
+    ).round(1)
+    vergleich["Temperatur_Mittel"] = vergleich["Temperatur_Mittel"].round(1)
+    vergleich["Niederschlag_Summe"] = vergleich["Niederschlag_Summe"].round(1)
+    vergleich["Sonnenstunden_Summe"] = vergleich["Sonnenstunden_Summe"].round(1)
+    vergleich[["Temp_max", "Temp_min"]] = vergleich[["Temp_max", "Temp_min"]].round(1)
+
+    # Tag des Extremwerts: nach Wert sortieren, letzte bzw. erste Zeile pro Standort
+    for spalte, letzte in [("Temp_max", "last"), ("Temp_min", "first")]:
+        extrem = (
+            df.dropna(subset=[spalte])
+            .sort_values(spalte, kind="stable")
+            .drop_duplicates("Standort", keep=letzte)
+            .set_index("Standort")["Tag"]
+        )
+        vergleich[f"{spalte}_Datum"] = extrem
+    return vergleich.reset_index()[VERGLEICH_SPALTEN]
+
+
+def standortvergleich_anzeigen(wd, ort_filter="Alle"):
+    """
+    Zeigt alle Standorte nebeneinander: Kennzahlen für einen Zeitraum, Rangliste und Tabelle.
+
+    Funktionsweise:
+        - Die Kennzahlen aller Standorte kommen aus einem gruppierten Durchlauf
+          (`WetterAnalyse.standortvergleich`, gecacht pro Datenversion und Zeitraum).
+        - Rangliste nach einer wählbaren Kennzahl (Rang 1 = höchster Wert, bei der
+          Tiefsttemperatur der niedrigste) mit den ersten und letzten Standorten.
+        - Die Tabelle enthält alle Standorte und lässt sich über die Spaltenköpfe sortieren.
+        - Bei partitionierter Ablage werden nur die geladenen Standorte verglichen,
+          außer "Alle Standorte laden" ist gewählt.
+    """
+    st.subheader("Standortvergleich")
+    if wd.partitioniert() and st.checkbox(
+        "Alle Standorte laden (partitionierte Ablage)", key="vergleich_alle_laden"
+    ):
+        wd.partitionen_laden()
+    elif wd.partitioniert():
+        st.caption("Partitionierte Ablage: verglichen werden nur die bereits geladenen Standorte.")
+
+    spalte1, spalte2, spalte3 = st.columns(3)
+    zeitraum = spalte1.selectbox(
+        "Zeitraum", list(VERGLEICH_ZEITRAEUME), index=2, key="vergleich_zeitraum"
+    )
+    kennzahl = spalte2.selectbox(
+        "Rangliste nach", list(VERGLEICH_KENNZAHLEN), key="vergleich_kennzahl"
+    )
+    anzahl = spalte3.selectbox("Plätze", [5, 10, 25], key="vergleich_plaetze")
+
+    vergleich = wd.standortvergleich(VERGLEICH_ZEITRAEUME[zeitraum])
+    if vergleich.empty:
+        st.info("Keine Daten vorhanden")
+        return
+
+    spalte, hoeher_besser = VERGLEICH_KENNZAHLEN[kennzahl]
+    tabelle = vergleich.assign(
+        Rang=vergleich[spalte].rank(ascending=not hoeher_besser, method="min")
+    ).sort_values("Rang", kind="stable", na_position="last")
+    st.caption(
+        f"{len(tabelle)} Standorte, {tabelle['Von'].min().date()} bis {tabelle['Bis'].max().date()}."
+    )
+    if ort_filter in set(tabelle["Standort"]):
+        rang = tabelle.loc[tabelle["Standort"] == ort_filter, "Rang"].iloc[0]
+        if pd.notna(rang):
+            st.write(f"{ort_filter}: Platz {int(rang)} von {len(tabelle)} ({kennzahl})")
+
+    spalte1, spalte2 = st.columns(2)
+    spalte1.markdown(f"**Top {anzahl}**")
+    spalte1.bar_chart(tabelle.head(anzahl).set_index("Standort")[spalte], horizontal=True)
+    spalte2.markdown(f"**Letzte {anzahl}**")
+    spalte2.bar_chart(
+        tabelle.dropna(subset=[spalte]).tail(anzahl).set_index("Standort")[spalte],
+        horizontal=True,
+    )
+
+    st.dataframe(
+        tabelle.rename(
+            columns={v[0]: k for k, v in VERGLEICH_KENNZAHLEN.items()}
+            | {"Temp_max_Datum": "Tag Höchstwert", "Temp_min_Datum": "Tag Tiefstwert"}
+        ),
+        hide_index=True,
+        column_config={
+            "Rang": st.column_config.NumberColumn(format="%d"),
+            "Von": st.column_config.DateColumn(),
+            "Bis": st.column_config.DateColumn(),
+            "Tag Höchstwert": st.column_config.DateColumn(),
+            "Tag Tiefstwert": st.column_config.DateColumn(),
+        },
+    )
+
+
+# Klimanormalen: Glättungsfenster (± Tage um den Kalendertag) und Perzentile
+KLIMA_FENSTER_TAGE = 7
+KLIMA_PERZENTILE = (0.1, 0.9)
+KLIMA_WERTE = ["Temperatur", "Temp_min", "Temp_max", "Niederschlag", "Sonnenstunden"]
+KLIMA_CACHE_EINTRAEGE = 64  # gespeicherte Stände (Standort + Prüfsumme) pro Server-Prozess
+
+
+def klima_tag(datum):
+    """
+    Kalendertag 1–365 für Klimanormalen (vektorisiert); der 29. Februar zählt als 28. Februar.
+    """
+    datum = pd.DatetimeIndex(datum)
+    schaltjahr_spaeter = datum.is_leap_year & (datum.dayofyear >= 60)
+    return (datum.dayofyear - schaltjahr_spaeter.astype(int)).to_numpy()
+
+
+def klima_summe_aendern(summe, werte, delta):
+    """
+    Schreibt die Summen einer Gruppe (Kalendertag bzw. Jahr + Monat) um eine Messung fort.
+
+    Parameter:
+        summe (tuple|None): bisherige Summen (None = leere Gruppe).
+        werte (list): Werte der Messung in der Reihenfolge von KLIMA_WERTE (None = fehlt).
+        delta (int): +1 für eine neue, -1 für eine entfernte Messung.
+
+    Rückgabe:
+        tuple|None: (Anzahl Messungen, Summen je Wert, Anzahl vorhandener Werte je Wert,
+        sortierte Temperaturen für die Perzentile); None, wenn die Gruppe leer ist.
+
+    Hinweis:
+        Die Tupel werden nie verändert, sondern ersetzt; `WetterDaten.kopie` teilt sie daher.
+    """
+    anzahl, summen, vorhanden, temperaturen = summe or (
+        0, (0.0,) * len(KLIMA_WERTE), (0,) * len(KLIMA_WERTE), ()
+    )
+    anzahl += delta
+    if anzahl <= 0:
+        return None
+    gueltig = [w is not None and w == w for w in werte]  # NaN ist ungleich sich selbst
+    summen = tuple(s + delta * w if g else s for s, w, g in zip(summen, werte, gueltig))
+    vorhanden = tuple(v + delta * g for v, g in zip(vorhanden, gueltig))
+    if gueltig[0]:
+        liste = list(temperaturen)
+        if delta > 0:
+            bisect.insort(liste, werte[0])
+        else:
+            liste.remove(werte[0])
+        temperaturen = tuple(liste)
+    return anzahl, summen, vorhanden, temperaturen
+
+
+class Klimanormalen:
+    """
+    Vorberechnete Klimanormalen pro Standort über alle vorhandenen Jahre.
+
+    Tabellen pro Standort:
+        - Tagesnormalen (Kalendertag 1–365): Mittelwerte und Temperatur-Perzentile,
+          geglättet über ± KLIMA_FENSTER_TAGE Tage.
+        - Monatsnormalen (Monat 1–12): Mittel und Perzentile der Monatswerte aller Jahre.
+        - Monatswerte je Jahr (Jahr, Monat): für Mehrjahresvergleiche.
+
+    Funktionsweise:
+        - Grundlage sind die Summen, die `WetterDaten` bei jeder eingefügten, ersetzten oder
+          gelöschten Messung fortschreibt (pro Kalendertag sowie pro Jahr und Monat,
+          `klima_summe_aendern`). Die Messungen selbst werden nicht erneut gelesen.
+        - Mittelwerte, Summen und Anzahlen ergeben sich direkt aus den Summen. Die
+          Temperatur-Perzentile der Tagesnormalen werden aus den je Kalendertag gespeicherten
+          Temperaturen neu bestimmt (eine Temperatur pro Messung, keine Messungszeilen).
+        - Jede Messung zählt als ein Tag (pro Tag & Ort gibt es höchstens eine Messung).
+        - Schlüssel ist (Standort, Prüfsumme der Messungen des Standorts); berechnet wird
+          nur ein Standort, dessen Stand noch nicht vorliegt. Sessions mit unterschiedlichen
+          (auch ungespeicherten) Ständen erhalten so jeweils ihre eigenen Normalen.
+        - Berechnet wird außerhalb der Sperre; höchstens `max_eintraege` Stände, die am
+          längsten ungenutzten fallen heraus.
+        - Ein Objekt pro Server-Prozess (`klimanormalen()`), gemeinsam für alle Sessions.
+    """
+
+    def __init__(self, max_eintraege=KLIMA_CACHE_EINTRAEGE):
+        self.max_eintraege = max_eintraege
+        self._lock = threading.Lock()
+        # (Standort, Prüfsumme) -> (Tagesnormalen, Monatsnormalen, Monatswerte je Jahr)
+        self._normalen = {}
+        self.berechnungen = 0  # Anzahl neu berechneter Standorte (Statistik)
+
+    def fuer_standort(self, wd, standort):
+        """
+        Liefert die Normalen eines Standorts für den Stand von `wd`.
+
+        Rückgabe:
+            tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame] | None: Tagesnormalen,
+            Monatsnormalen und Monatswerte je Jahr; None ohne Messungen des Standorts.
+            Die Tabellen sind geteilt und dürfen nicht verändert werden.
+        """
+        wd.partitionen_laden([standort])
+        summe = wd.standort_pruefsummen().get(standort)
+        if summe is None:
+            return None
+        schluessel = (standort, summe)
+        with self._lock:
+            normalen = self._normalen.pop(schluessel, None)
+            if normalen is not None:
+                self._normalen[schluessel] = normalen  # zuletzt genutzt ans Ende
+                return normalen
+
+        normalen = self._berechnen(*wd.klima_summen(standort))
+        with self._lock:
+            self._normalen[schluessel] = normalen
+            self.berechnungen += 1
+            while len(self._normalen) > self.max_eintraege:
+                self._normalen.pop(next(iter(self._normalen)))
+        return normalen
+
+    @staticmethod
+    def _berechnen(tage_summen, monats_summen):
+        """Berechnet Tages-, Monatsnormalen und Monatswerte aus den Summen eines Standorts."""
+        unten, oben = KLIMA_PERZENTILE
+        leer = (0, (0.0,) * len(KLIMA_WERTE), (0,) * len(KLIMA_WERTE), ())
+
+        # Tagesnormalen: jeder Tag zählt für alle Kalendertage im Fenster ± KLIMA_FENSTER_TAGE
+        tage_liste = [tage_summen.get(tag, leer) for tag in range(1, 366)]
+        summen = np.array([t[1] for t in tage_liste])
+        vorhanden = np.array([t[2] for t in tage_liste], dtype=float)
+        versatz = np.arange(-KLIMA_FENSTER_TAGE, KLIMA_FENSTER_TAGE + 1)
+        fenster_summen = sum(np.roll(summen, -v, axis=0) for v in versatz)
+        fenster_vorhanden = sum(np.roll(vorhanden, -v, axis=0) for v in versatz)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mittel = fenster_summen / fenster_vorhanden
+        tage = pd.DataFrame(mittel, columns=KLIMA_WERTE, index=pd.RangeIndex(1, 366, name="Tag"))
+        temperaturen = [t[3] for t in tage_liste]
+        perzentile = np.full((365, 2), np.nan)
+        for i in range(365):
+            werte = np.concatenate([temperaturen[(i + v) % 365] for v in versatz])
+            if len(werte):
+                perzentile[i] = np.quantile(werte, [unten, oben])
+        tage["Temperatur_unten"], tage["Temperatur_oben"] = perzentile.T
+
+        # Monatswerte je Jahr und daraus die Monatsnormalen
+        schluessel = sorted(monats_summen)
+        monats_liste = [monats_summen[k] for k in schluessel]
+        summen = pd.DataFrame(
+            [m[1] for m in monats_liste],
+            columns=KLIMA_WERTE,
+            index=pd.MultiIndex.from_tuples(schluessel, names=["Jahr", "Monat"]),
+        )
+        vorhanden = pd.DataFrame([m[2] for m in monats_liste], columns=KLIMA_WERTE, index=summen.index)
+        monatswerte = summen[["Temperatur", "Temp_min", "Temp_max"]] / vorhanden[
+            ["Temperatur", "Temp_min", "Temp_max"]
+        ].replace(0, np.nan)
+        monatswerte["Niederschlag"] = summen["Niederschlag"]
+        monatswerte["Sonnenstunden"] = summen["Sonnenstunden"]
+        monatswerte["Messtage"] = [m[0] for m in monats_liste]
+        nach_monat = monatswerte.groupby(level="Monat")
+        monate = nach_monat[["Temperatur", "Niederschlag", "Sonnenstunden"]].mean()
+        for spalte in ["Temperatur", "Niederschlag"]:
+            monate[f"{spalte}_unten"] = nach_monat[spalte].quantile(unten)
+            monate[f"{spalte}_oben"] = nach_monat[spalte].quantile(oben)
+        monate["Jahre"] = nach_monat.size()
+        return tage.round(2), monate.round(2), monatswerte.round(2)
+
+
+@st.cache_resource
+def klimanormalen():
+    """Gemeinsame Klimanormalen pro Server-Prozess (für alle Sessions)."""
+    return Klimanormalen()
+
+
+def klima_anzeigen(wd, ort_filter="Alle"):
+    """
+    Zeigt die Abweichung vom Klimanormal und einen Mehrjahresvergleich für einen Standort.
+
+    Funktionsweise:
+        - Holt die vorberechneten Klimanormalen für den Stand dieser Session
+          (berechnet nur, wenn der Standort in diesem Stand noch nicht vorliegt).
+        - Tageswerte kommen aus `rollende_kennzahlen` (gecacht pro Datenversion).
+        - Vergleicht die Temperatur der letzten Tage mit Normal und Perzentilband.
+        - Stellt Monatsmittel ausgewählter Jahre dem Monatsnormal gegenüber.
+    """
+    st.subheader("Klima: Abweichung vom Normal")
+    orte = wd.standorte()
+    if not orte:
+        st.info("Keine Daten vorhanden")
+        return
+    if ort_filter in orte:
+        standort = ort_filter
+    else:
+        standort = st.selectbox("Standort", orte, key="klima_standort")
+
+    normalen = klimanormalen().fuer_standort(wd, standort)
+    if normalen is None:
+        st.info("Keine Daten vorhanden")
+        return
+    tagesnormalen, monatsnormalen, monatswerte = normalen
+
+    # Abweichung der letzten Tage vom Tagesnormal
+    zeitraum = st.selectbox("Zeitraum (Tage)", [30, 90, 365, 3650], index=2, key="klima_zeitraum")
+    tage = wd.rollende_kennzahlen()
+    tage = tage[tage["Standort"] == standort]
+    tage = tage[tage["Datum"] > tage["Datum"].max() - pd.Timedelta(days=zeitraum)]
+    normal = tagesnormalen.loc[klima_tag(tage["Datum"])]
+    unten, oben = KLIMA_PERZENTILE
+    vergleich = pd.DataFrame(
+        {
+            "Temperatur": tage["Temperatur"].to_numpy(),
+            "Normal": normal["Temperatur"].to_numpy(),
+            f"P{unten * 100:.0f}": normal["Temperatur_unten"].to_numpy(),
+            f"P{oben * 100:.0f}": normal["Temperatur_oben"].to_numpy(),
+        },
+        index=tage["Datum"],
+    )
+    abweichung = vergleich["Temperatur"] - vergleich["Normal"]
+    spalte1, spalte2, spalte3 = st.columns(3)
+    spalte1.metric("Ø Abweichung", f"{abweichung.mean():+.1f} °C")
+    spalte2.metric(
+        f"Tage über P{oben * 100:.0f}",
+        f"{(vergleich['Temperatur'] > vergleich[f'P{oben * 100:.0f}']).mean() * 100:.0f} %",
+    )
+    spalte3.metric("Jahre im Normal", monatswerte.index.get_level_values("Jahr").nunique())
+    st.line_chart(vergleich)
+
+    # Mehrjahresvergleich der Monatsmittel
+    jahre = sorted(monatswerte.index.get_level_values("Jahr").unique(), reverse=True)
+    auswahl = st.multiselect("Jahre vergleichen", jahre, default=jahre[:3], key="klima_jahre")
+    monate = monatswerte["Temperatur"].unstack("Jahr").reindex(range(1, 13))
+    tabelle = monate[auswahl].rename(columns=str)
+    tabelle["Normal"] = monatsnormalen["Temperatur"]
+    st.line_chart(tabelle)
+
+
+# Langzeitdiagramm: Zielpunkte pro Reihe (≈ Pixelbreite) und Verdichtung pro Stufe
+DIAGRAMM_PUNKTE = 1000
+STUFEN_FAKTOR = 4
+
+
+def lttb(x, y, ziel):
+    """
+    Largest-Triangle-Three-Buckets: wählt `ziel` Punkte, die den Verlauf optisch erhalten.
+
+    Parameter:
+        x (np.ndarray[float]): aufsteigende x-Werte.
+        y (np.ndarray[float]): y-Werte ohne NaN.
+        ziel (int): gewünschte Punktzahl.
+
+    Rückgabe:
+        np.ndarray[int]: Indizes der gewählten Punkte (inkl. erstem und letztem Punkt).
+    """
+    n = len(x)
+    if ziel >= n or ziel < 3:
+        return np.arange(n)
+    breite = (n - 2) / (ziel - 2)
+    grenzen = (np.arange(ziel - 1) * breite).astype(int) + 1
+    grenzen[-1] = n - 1
+    indizes = np.empty(ziel, dtype=int)
+    indizes[0], indizes[-1] = 0, n - 1
+    a = 0
+    for i in range(ziel - 2):
+        start, ende = grenzen[i], grenzen[i + 1]
+        naechstes_ende = grenzen[i + 2] if i + 2 < len(grenzen) else n
+        mx = x[ende:naechstes_ende].mean()
+        my = y[ende:naechstes_ende].mean()
+        flaeche = np.abs(
+            (x[a] - mx) * (y[start:ende] - y[a]) - (x[a] - x[start:ende]) * (my - y[a])
+        )
+        a = start + int(flaeche.argmax())
+        indizes[i + 1] = a
+    return indizes
+
+
+def minmax_stufe(datum, werte, tage):
+    """
+    Min/Max-Verdichtung: behält pro Block von `tage` Tagen den kleinsten und größten Punkt.
+
+    Rückgabe:
+        tuple[np.ndarray, np.ndarray]: Datum und Werte der behaltenen Punkte (zeitlich sortiert).
+    """
+    block = (datum - datum[0]) // np.timedelta64(tage, "D")
+    reihe = pd.Series(werte)
+    gruppen = reihe.groupby(block)
+    behalten = np.union1d(gruppen.idxmin().to_numpy(), gruppen.idxmax().to_numpy())
+    return datum[behalten], werte[behalten]
+
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+@geteilt("zeitreihen")
+def _zeitreihen_stufen(version, _wd, standort):
+    """
+    Mehrstufige Zeitreihen eines Standorts, einmal pro Datenversion berechnet.
+
+    Rückgabe:
+        dict[str, list[tuple[np.ndarray, np.ndarray]]]: Messwert -> Stufen (Datum, Werte);
+        Stufe 0 sind die Tageswerte, jede weitere ist um STUFEN_FAKTOR stärker verdichtet.
+    """
+    tage = _wd.rollende_kennzahlen()
+    tage = tage[tage["Standort"] == standort]
+    stufen = {}
+    for spalte in LANGZEIT_WERTE:
+        reihe = tage[["Datum", spalte]].dropna()
+        datum = reihe["Datum"].to_numpy(dtype="datetime64[ns]")
+        werte = reihe[spalte].to_numpy(dtype=float)
+        stufen[spalte] = [(datum, werte)]
+        blocktage = STUFEN_FAKTOR
+        while len(werte) > 2 * DIAGRAMM_PUNKTE:
+            datum, werte = minmax_stufe(datum, werte, blocktage)
+            stufen[spalte].append((datum, werte))
+            blocktage *= STUFEN_FAKTOR
+    return stufen
+
+
+def reihe_fuer_ausschnitt(stufen, von, bis, punkte=DIAGRAMM_PUNKTE):
+    """
+    Liefert höchstens `punkte` Punkte für den Zeitraum [von, bis].
+
+    Wählt die feinste Stufe, die im Ausschnitt nicht mehr als 2 × `punkte` Punkte hat
+    (bei starkem Zoom also die vollen Tageswerte), und verdichtet den Rest mit LTTB.
+    """
+    von, bis = np.datetime64(von, "ns"), np.datetime64(bis, "ns")
+    for datum, werte in stufen:
+        links = np.searchsorted(datum, von, side="left")
+        rechts = np.searchsorted(datum, bis, side="right")
+        if rechts - links <= 2 * punkte:
+            break
+    datum, werte = datum[links:rechts], werte[links:rechts]
+    auswahl = lttb(datum.astype("int64").astype(float), werte, punkte)
+    return datum[auswahl], werte[auswahl]
+
+
+def vega_langzeit(reihen):
+    """Vega-Lite-Diagramm des Langzeitverlaufs; Zoom/Verschieben per Maus entlang der Zeitachse."""
+    auswahl = alt.selection_point(fields=["Standort"], bind="legend")
+    zoom = alt.selection_interval(bind="scales", encodings=["x"])
+    return (
+        alt.Chart(reihen)
+        .mark_line(strokeWidth=0.8)
+        .encode(
+            x=alt.X("Datum:T", title=None),
+            y=alt.Y("Wert:Q", title=None),
+            color="Standort:N",
+            opacity=alt.condition(auswahl, alt.value(1.0), alt.value(0.15)),
+            tooltip=["Standort", alt.Tooltip("Datum:T", format="%d.%m.%Y"), "Wert:Q"],
+        )
+        .properties(height=150)
+        .add_params(auswahl, zoom)
+        .facet(row=alt.Row("Messwert:N", sort=list(LANGZEIT_WERTE), title=None))
+        .resolve_scale(y="independent")
+    )
+
+
+def langzeit_diagramm(wd, ort_filter="Alle", zeichner=None):
+    """
+    Zeigt Temperatur, Niederschlag und Sonnenstunden über den gesamten Zeitraum.
+
+    Funktionsweise:
+        - Standorte wählbar (Vorauswahl: Diagramm-Ort), Zoom über einen Datumsbereich.
+        - Jede Reihe wird auf etwa DIAGRAMM_PUNKTE Punkte verdichtet (vorberechnete
+          Min/Max-Stufen + LTTB); Tageswerte werden nur für kleine Ausschnitte geladen.
+        - Gezeichnet wird über `zeichner` (DiagrammZeichner; Vega-Lite oder Matplotlib).
+    """
+    st.subheader("Langzeitverlauf")
+    orte = wd.standorte()
+    if not orte:
+        st.info("Keine Daten vorhanden")
+        return
+    auswahl = st.multiselect(
+        "Standorte",
+        orte,
+        default=[ort_filter] if ort_filter in orte else orte[:1],
+        key="langzeit_orte",
+    )
+    if not auswahl:
+        return
+    wd.partitionen_laden(auswahl)
+
+    stufen = {ort: _zeitreihen_stufen(wd.version, wd, ort) for ort in auswahl}
+    tage = [s["Temperatur"][0][0] for s in stufen.values() if len(s["Temperatur"][0][0])]
+    if not tage:
+        st.info("Keine Daten vorhanden")
+        return
+    anfang = pd.Timestamp(min(t[0] for t in tage)).date()
+    ende = pd.Timestamp(max(t[-1] for t in tage)).date()
+    if anfang < ende:
+        von, bis = st.slider(
+            "Zeitraum", min_value=anfang, max_value=ende, value=(anfang, ende), key="langzeit_zoom"
+        )
+    else:
+        von, bis = anfang, ende
+    bis = pd.Timestamp(bis) + pd.Timedelta(days=1) - pd.Timedelta(1, "ns")
+
+    reihen = pd.concat(
+        [
+            pd.DataFrame({"Datum": datum, "Wert": werte, "Standort": ort, "Messwert": spalte})
+            for spalte in LANGZEIT_WERTE
+            for ort in auswahl
+            for datum, werte in [reihe_fuer_ausschnitt(stufen[ort][spalte], von, bis)]
+        ],
+        ignore_index=True,
+    )
+    (zeichner or DiagrammZeichner()).zeigen("langzeit", reihen)
+    st.caption(f"{len(reihen)} Punkte gezeichnet")
+
+
+# Diagrammart -> Vega-Lite-Diagramm (Gegenstück zu diagramme.FIGUREN)
+VEGA_DIAGRAMME = {
+    "prognose": vega_prognose,
+    "7tage": vega_7tage,
+    "monatsvergleich": vega_monatsvergleich,
+    "langzeit": vega_langzeit,
+}
+
+# Anzahl Worker-Prozesse für Matplotlib-Diagramme (0 = im Skript-Thread zeichnen;
+# Standard: bis zu 4, auf Einkern-Rechnern keine, da der Pool dort nur Overhead wäre)
+DIAGRAMM_PROZESSE = st.secrets["Legacy91988"].get(
+    "diagramm_prozesse", min(4, os.cpu_count() or 1) if (os.cpu_count() or 1) > 1 else 0
+)
+
+
+def tagesverlauf_anzeigen(ort_filter="Alle", stunden_zurueck=48):
+    """
+    Zeigt die stündlichen Beobachtungen der letzten `stunden_zurueck` Stunden für einen Standort.
+    Wird nur angezeigt, wenn es für den Standort Stundenwerte gibt.
+    """
+    if ort_filter == "Alle":
+        return
+    von = datetime.datetime.now() - datetime.timedelta(hours=stunden_zurueck)
+    verlauf = stundenwerte_laden().beobachtungen(ort_filter, von=von)
+    if verlauf.empty:
+        return
+    st.subheader(f"Tagesverlauf (stündlich, letzte {stunden_zurueck} h)")
+    st.line_chart(verlauf.set_index("Zeit")[["Temperatur", "Niederschlag"]])
+
+
+@st.cache_resource
+def diagramm_pool():
+    """
+    Ein Prozesspool pro Server-Prozess für die Matplotlib-Diagramme.
+
+    Hinweise:
+        - "spawn" statt "fork": der Streamlit-Server hat viele Threads, ein fork wäre unsicher.
+        - `diagramme.vorbereiten` importiert Matplotlib einmal pro Worker; die Worker werden
+          sofort gestartet, damit der erste Durchlauf die Startzeit nicht bezahlt.
+    """
+    if DIAGRAMM_PROZESSE <= 0:
+        return None
+    pool = ProcessPoolExecutor(
+        max_workers=DIAGRAMM_PROZESSE,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=diagramme.vorbereiten,
+    )
+    for _ in range(DIAGRAMM_PROZESSE):
+        pool.submit(diagramme.vorbereiten)
+    return pool
+
 
-        # Filter nach Ort
-        if ort_filter != "Alle":
-            df = df[df["Standort"] == ort_filter]
-            if df.empty:
-                st.info("Keine Daten für diesen Ort.")
-                return
+def diagramm_schluessel(art, daten, parameter):
+    """
+    Schlüssel eines Diagramm-Bilds in der gemeinsamen Ablage.
 
-        # Filter nach Quelle
-        quelle_filter = st.selectbox(
-            "Quelle auswählen:",
-            ["Alle", "manuell", "simuliert", "live"],
-            key="quelle_monatsvergleich",
-        )
-        if quelle_filter != "Alle":
-            df = df[df["Quelle"] == quelle_filter]
-            if df.empty:
-                st.info(f"Keine Daten für Quelle '{quelle_filter}'.")
-                return
+    Die Daten sind schon aggregiert und hängen nur von Datenversion und Auswahl ab; der Hash
+    über alle Zellen (`pd.util.hash_pandas_object`) ist daher die Version des Bilds.
+    """
+    pruefsumme = hashlib.sha1(
+        repr((art, sorted(parameter.items()), list(daten.columns), list(daten.dtypes.astype(str))))
+        .encode("utf-8")
+    )
+    pruefsumme.update(pd.util.hash_pandas_object(daten, index=True).to_numpy().tobytes())
+    return f"png:{pruefsumme.hexdigest()}"
 
-        # Jahr & Monat extrahieren
-        df["Jahr"] = df["Datum"].dt.year
-        df["Monat"] = df["Datum"].dt.month
-        aktuelles_jahr = datetime.datetime.now().year
-        letztes_jahr = aktuelles_jahr - 1
 
-        # Summen für aktuelles Jahr
-        nied_sum = (
-            df[df["Jahr"] == aktuelles_jahr]
-            .groupby("Monat")["Niederschlag"]
-            .sum()
-            .reindex(range(1, 13), fill_value=0)
-        )
-        sonne_sum = (
-            df[df["Jahr"] == aktuelles_jahr]
-            .groupby("Monat")["Sonnenstunden"]
-            .sum()
-            .reindex(range(1, 13), fill_value=0)
-        )
+class DiagrammZeichner:
+    """
+    Zeichnet Diagramme aus aggregierten Daten mit dem gewählten Backend.
 
-        # Summen für letztes Jahr
-        nied_letztes = (
-            df[df["Jahr"] == letztes_jahr]
-            .groupby("Monat")["Niederschlag"]
-            .sum()
-            .reindex(range(1, 13), fill_value=0)
-        )
-        sonne_letztes = (
-            df[df["Jahr"] == letztes_jahr]
-            .groupby("Monat")["Sonnenstunden"]
-            .sum()
-            .reindex(range(1, 13), fill_value=0)
-        )
+    - "vega-lite": die Spezifikation wird sofort ausgegeben und im Browser gerendert.
+    - "matplotlib": für jedes Diagramm wird ein Platzhalter reserviert und das PNG im
+      Prozesspool erzeugt; `abschliessen()` füllt die Platzhalter in der Reihenfolge,
+      in der die Bilder fertig werden. Ohne Pool wird direkt gezeichnet.
 
-        if (
-            nied_sum.sum() == 0
-            and sonne_sum.sum() == 0
-            and nied_letztes.sum() == 0
-            and sonne_letztes.sum() == 0
-        ):
-            st.info("Keine Messwerte für die Monatsvergleiche.")
+    Beim vollständigen Seitenaufbau sammelt `main()` die Diagramme aller Abschnitte und ruft
+    `abschliessen()` einmal am Ende auf (die Bilder entstehen parallel). Läuft danach nur ein
+    einzelner Abschnitt erneut (Fragment-Rerun), schließt er über `abschnitt_beenden()` selbst ab.
+
+    Mit gemeinsamer Ablage (`ablage`) werden fertige PNGs dort abgelegt (`diagramm_schluessel`)
+    und von allen Prozessen wiederverwendet, statt sie erneut zu zeichnen.
+    """
+
+    def __init__(self, backend="vega-lite", pool=None, ablage=None):
+        self.backend = backend
+        self.pool = pool
+        self.ablage = ablage
+        self.sammeln = True  # False nach dem Seitenaufbau: Abschnitte schließen selbst ab
+        self._offen = {}  # Future -> (Platzhalter, Schlüssel, Art, Daten, Parameter)
+
+    def _bild_zeigen(self, platz, schluessel, bild):
+        platz.image(bild)
+        if schluessel is not None:
+            self.ablage.setzen(schluessel, bild)
+
+    def zeigen(self, art, daten, **parameter):
+        if self.backend != "matplotlib":
+            st.altair_chart(VEGA_DIAGRAMME[art](daten, **parameter))
+            return
+        platz = st.empty()
+        schluessel = None
+        if self.ablage is not None:
+            schluessel = diagramm_schluessel(art, daten, parameter)
+            bild = self.ablage.holen(schluessel)
+            if bild is not None:
+                platz.image(bild)
+                return
+        if self.pool is None:
+            self._bild_zeigen(platz, schluessel, diagramme.png(art, daten, **parameter))
+            return
+        platz.caption("Diagramm wird erstellt …")
+        try:
+            future = self.pool.submit(diagramme.png, art, daten, **parameter)
+        except RuntimeError:  # Pool beendet/defekt (BrokenProcessPool ist ein RuntimeError)
+            self._bild_zeigen(platz, schluessel, diagramme.png(art, daten, **parameter))
             return
+        self._offen[future] = (platz, schluessel, art, daten, parameter)
+
+    def abschliessen(self):
+        """Füllt die Platzhalter, sobald die Diagramme fertig sind."""
+        offen, self._offen = self._offen, {}
+        for future in as_completed(offen):
+            platz, schluessel, art, daten, parameter = offen[future]
+            try:
+                bild = future.result()
+            except Exception:  # z. B. abgestürzter Worker: im Skript-Thread nachholen
+                bild = diagramme.png(art, daten, **parameter)
+            self._bild_zeigen(platz, schluessel, bild)
+
+    def abschnitt_beenden(self):
+        """Schließt die Diagramme eines einzeln neu gezeichneten Abschnitts ab."""
+        if not self.sammeln:
+            self.abschliessen()
+
+
+def datenstand_anzeigen():
+    """
+    Zeigt an, wie alt die angezeigten Daten sind und ob GitHub erreichbar ist.
+    """
+    speicher = manifest_speicher()
+    if speicher.schnappschuss()[0] is None:
+        speicher = daten_speicher()
+    version, _, zeitpunkt, quelle = speicher.schnappschuss()
+    if version is None:
+        st.caption("Noch keine Wetterdaten vorhanden.")
+    else:
+        alter = datetime.timedelta(seconds=int(time.time() - zeitpunkt))
+        if quelle == "lokal":
+            st.caption(
+                f"Datenstand: lokaler Schnappschuss (vor {alter}) – Abgleich mit GitHub läuft im Hintergrund."
+            )
+        else:
+            st.caption(f"Datenstand: GitHub, zuletzt abgeglichen vor {alter}.")
+    fehler = speicher.fehler or partition_cache().fehler
+    if fehler:
+        st.warning(f"GitHub derzeit nicht erreichbar – es werden die vorhandenen Daten angezeigt. ({fehler})")
+    ablage = gemeinsame_ablage()
+    if ablage is not None and ablage.fehler:
+        st.caption(f"Gemeinsamer Cache nicht erreichbar – dieser Prozess lädt und rechnet selbst. ({ablage.fehler})")
+
+
+# zeigt den Status der Hintergrund-Uploads an (aktualisiert sich selbst, ohne die Seite neu zu laden)
+@st.fragment(run_every=2)
+def upload_status():
+    """
+    Zeigt laufende und abgeschlossene GitHub-Uploads dieser Session an.
 
-        monate = [
-            "Jan",
-            "Feb",
-            "Mär",
-            "Apr",
-            "Mai",
-            "Jun",
-            "Jul",
-            "Aug",
-            "Sep",
-            "Okt",
-            "Nov",
-            "Dez",
-        ]
+    Funktionsweise:
+        - Läuft als Fragment alle 2 Sekunden, unabhängig vom Rest der Seite.
+        - Erfolgreiche Uploads werden nach 10 Sekunden ausgeblendet.
+        - Fehlgeschlagene Uploads bleiben mit einem Button für einen erneuten Versuch stehen.
+    """
+    uploads = st.session_state.get("uploads", [])
+    jetzt = time.time()
+    uploads[:] = [
+        h
+        for h in uploads
+        if h.status() != "erfolgreich" or h.beendet is None or jetzt - h.beendet < 10
+    ]
+
+    for i, h in enumerate(list(uploads)):
+        status = h.status()
+        if status == "laeuft":
+            st.info(f"⏳ Upload läuft ({h.beschreibung}) – seit {jetzt - h.gestartet:.0f} s")
+        elif status == "erfolgreich":
+            if h.future.result().status_code == 304:
+                st.info(f"Keine Änderung gegenüber GitHub – Upload übersprungen. ({h.beschreibung})")
+            else:
+                st.success(f"Wetterdaten erfolgreich auf GitHub aktualisiert! ({h.beschreibung})")
+            if h.debug:
+                st.text_area(
+                    "🔍 GitHub-Payload (Debug)",
+                    h.paket.nutzlast.decode("utf-8"),
+                    height=250,
+                    key=f"upload_payload_{id(h)}",
+                )
+        else:
+            st.error(h.meldung())
+            if st.button("Erneut hochladen", key=f"upload_retry_{id(h)}"):
+                uploads[i] = upload_manager().starten(h.paket, h.pfad, h.beschreibung)
+                st.rerun(scope="fragment")
 
-        x = np.arange(len(monate))
-        width = 0.35
 
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 4))
+# ein Abschnitt des Dashboards als eigenes Fragment (Widget-Änderungen laufen nur hier neu)
+@st.fragment
+def dashboard_abschnitt(anzeigen, *args, zeichner=None):
+    """
+    Führt eine Anzeige-Funktion des Dashboards als eigenes Fragment aus.
+
+    Parameter:
+        anzeigen (callable): Anzeige-Funktion des Abschnitts (z. B. `wd.plot_3tage_prognose`).
+        *args: Argumente der Anzeige-Funktion (z. B. wd, ort_filter).
+        zeichner (DiagrammZeichner | None): wird als letztes Argument übergeben, falls gesetzt.
+
+    Funktionsweise:
+        - Beim vollständigen Seitenaufbau läuft der Abschnitt wie bisher mit.
+        - Ändert der Benutzer ein Widget des Abschnitts (z. B. die Prognose-Methode), läuft
+          nur dieses Fragment erneut – mit den Argumenten des letzten Seitenaufbaus.
+          Daten laden, CSV, die übrigen Diagramme und die Tabelle werden nicht neu berechnet.
+        - Matplotlib-Diagramme eines einzeln neu gezeichneten Abschnitts werden hier
+          abgeschlossen (`DiagrammZeichner.abschnitt_beenden`).
+
+    Hinweis:
+        - Aktionen, die Daten ändern (z. B. Löschen in der Tabelle), lösen danach einen
+          vollständigen Rerun aus, damit alle Abschnitte den neuen Stand zeigen.
+    """
+    if zeichner is None:
+        anzeigen(*args)
+        return
+    anzeigen(*args, zeichner)
+    zeichner.abschnitt_beenden()
 
-        # Niederschlag: aktuell vs letztes Jahr
-        ax1.bar(
-            x - width / 2,
-            nied_sum.values,
-            width=width,
-            label=f"{aktuelles_jahr}",
-            color="blue",
-        )
-        ax1.bar(
-            x + width / 2,
-            nied_letztes.values,
-            width=width,
-            label=f"{letztes_jahr}",
-            color="orange",
-            alpha=0.7,
-        )
-        ax1.set_xticks(x)
-        ax1.set_xticklabels(monate)
-        ax1.set_ylabel("mm")
-        ax1.set_title("Monatlicher Niederschlag")
-        ax1.legend()
-
-        # Sonnenstunden: aktuell vs letztes Jahr
-        ax2.bar(
-            x - width / 2,
-            sonne_sum.values,
-            width=width,
-            label=f"{aktuelles_jahr}",
-            color="yellow",
-        )
-        ax2.bar(
-            x + width / 2,
-            sonne_letztes.values,
-            width=width,
-            label=f"{letztes_jahr}",
-            color="green",
-            alpha=0.7,
-        )
-        ax2.set_xticks(x)
-        ax2.set_xticklabels(monate)
-        ax2.set_ylabel("h")
-        ax2.set_title("Monatliche Sonnenstunden")
-        ax2.legend()
 
-        plt.tight_layout()
-        st.pyplot(fig)
+def regenwahrscheinlichkeit_anzeigen(wd, ort_filter="Alle"):
+    """Zeigt die Regenwahrscheinlichkeit der letzten 7 Tage."""
+    regen_wahrscheinlichkeit = wd.regenwahrscheinlichkeit(tage=7, ort_filter=ort_filter)
+    st.write(
+        f" Regenwahrscheinlichkeit in den letzten 7 Tagen: {regen_wahrscheinlichkeit}%"
+    )
 
 
 # zeigt Debug - Infos an
-def dev_mode_dashboard(wd, live_data=None):
+def dev_mode_dashboard(wd):
     """
     Zeigt alle Debug-Infos im Dev-Mode an.
     - wd: WetterDaten/WetterAnalyse Objekt
-    - live_data: optional dict mit Live-API Rohdaten
     """
     if not st.session_state.get("dev_mode", False):
         return  # Nur anzeigen, wenn Dev-Mode aktiv
@@ -929,28 +4155,29 @@ def dev_mode_dashboard(wd, live_data=None):
     st.subheader("GitHub: geladene Messungen")
     st.text_area("GitHub-Daten", str([m.als_dict() for m in wd.messungen]), height=200)
 
-    # Live-API Rohdaten + Sonnenstunden
-    if live_data:
-        st.subheader("Live-Daten API Rohwerte")
-        st.json(live_data)
-
-        try:
-            sunrise_ts = live_data["sys"]["sunrise"]
-            sunset_ts = live_data["sys"]["sunset"]
-            clouds = live_data.get("clouds", {}).get("all", 100)
-            sunrise = datetime.datetime.fromtimestamp(sunrise_ts)
-            sunset = datetime.datetime.fromtimestamp(sunset_ts)
-            tageslaenge = (sunset - sunrise).total_seconds() / 3600
-            sonnenstunden = round((1 - clouds / 100) * tageslaenge, 1)
-
-            # Ergebnisse anzeigen
-            st.write(f"- Sonnenaufgang: {sunrise}")
-            st.write(f"- Sonnenuntergang: {sunset}")
-            st.write(f"- Tageslänge: {tageslaenge:.2f} h")
-            st.write(f"- Bewölkung: {clouds}%")
-            st.write(f"- Berechnete Sonnenstunden: {sonnenstunden} h")
-        except Exception as e:
-            st.error(f"Fehler bei Sonnenstunden-Berechnung: {e}")
+    # OWM-Cache des Ingestion-Workers (die App selbst fragt OpenWeatherMap nicht ab)
+    st.subheader("OpenWeatherMap-Cache (Worker)")
+    stat = owm_statistik_laden()
+    if stat is None:
+        st.info("Noch keine Statistik – der Worker (`python cli.py worker`) ist noch nicht gelaufen.")
+    else:
+        st.write(
+            f"- Treffer: {stat['treffer']} | Fehlschläge: {stat['fehlschlaege']} | "
+            f"Gebündelt: {stat['gebuendelt']} | Trefferquote: {stat['trefferquote']}%"
+        )
+        stand = datetime.datetime.fromtimestamp(stat["zeit"]).strftime("%d.%m.%Y %H:%M")
+        st.write(f"- Gespeicherte Orte: {stat['eintraege']} (TTL {OWM_CACHE_TTL} s) | Stand: {stand}")
+
+    # Gemeinsame Ablage (Cache über alle Server-Prozesse)
+    ablage = gemeinsame_ablage()
+    if ablage is not None:
+        st.subheader("Gemeinsame Ablage")
+        stat = ablage.uebersicht()
+        st.write(
+            f"- {type(ablage).__name__} | Treffer: {stat['treffer']} | Fehlschläge: "
+            f"{stat['fehlschlaege']} | Trefferquote: {stat['trefferquote']}%"
+        )
+        st.write(f"- Selbst berechnet: {stat['berechnet']} | Auf anderen Prozess gewartet: {stat['gewartet']}")
 
     # Simulationsdaten
     st.subheader("Simulations-Daten")
@@ -980,8 +4207,11 @@ def manuelle_eingabe(wd):
     Funktionsweise:
         - Zeigt einen Streamlit-Editor für Datum, Min/Max-Temperatur, Niederschlag, Sonnenstunden und Standort.
         - Berechnet optional den Durchschnitt aus Temp_min und Temp_max.
-        - Prüft auf Duplikate (gleicher Tag + Ort) und ermöglicht, vorhandene Einträge zu überschreiben.
-        - Speichert neue oder aktualisierte Messungen im WetterDaten-Objekt.
+        - Prüft alle Zeilen vektorisiert (`eingabe_pruefen`) und zeigt Fehler gesammelt in einem Bericht;
+          bei Fehlern wird nichts gespeichert.
+        - Erkennt Duplikate (gleicher Tag + Ort) mit einem Abgleich gegen den Tagesindex und ersetzt
+          sie nur, wenn "Vorhandene Einträge ersetzen" aktiviert ist.
+        - Speichert neue oder aktualisierte Messungen in einem Batch im WetterDaten-Objekt.
         - Optional: Exportiert die Daten zu GitHub (Debug-Modus, falls aktiv).
         - Setzt die Eingabefelder für die nächste Messung zurück.
     """
@@ -1007,57 +4237,59 @@ def manuelle_eingabe(wd):
         key="manuelle_editor_input",
     )
 
+    ersetzen = st.checkbox(
+        "Vorhandene Einträge (gleicher Tag + Ort) ersetzen", key="manuell_ersetzen"
+    )
+
     # Speichern-Button
     if st.button("Speichern", key="btn_speichern_manuell"):
-        neue_messungen = []
+        daten, fehler = eingabe_pruefen(edited_df)
+        if not fehler.empty:
+            st.error(
+                f"{fehler['Zeile'].nunique()} Zeile(n) fehlerhaft – es wurde nichts gespeichert."
+            )
+            st.dataframe(fehler, hide_index=True)
+            return
+        if daten.empty:
+            st.info("Keine Zeilen zum Speichern.")
+            return
+
+        # Temperatur = Mittel aus Temp_min und Temp_max (nur wenn beide vorhanden)
+        daten["Temperatur"] = (daten["Temp_min"] + daten["Temp_max"]) / 2
+        daten["Niederschlag"] = daten["Niederschlag"].fillna(0)
+        # Prüfen auf Duplikate (Datum + Ort) – ein Abgleich gegen den Tagesindex
+        vorhanden = wd.tage_vorhanden(daten["Standort"], daten["Datum"].dt.date)
 
-        for _, row in edited_df.iterrows():
+        daten = daten.astype(object).where(daten.notna(), None)
+        neue_messungen, duplicate_entries = [], []
+        for zeile, doppelt in zip(daten.to_dict("records"), vorhanden):
             messung = WetterMessung(
-                datum=row["Datum"],
-                temp_min=float(row["Temp_min"]) if pd.notna(row["Temp_min"]) else None,
-                temp_max=float(row["Temp_max"]) if pd.notna(row["Temp_max"]) else None,
-                temperatur=(
-                    (float(row["Temp_min"]) + float(row["Temp_max"])) / 2
-                    if pd.notna(row["Temp_min"]) and pd.notna(row["Temp_max"])
-                    else None
-                ),
-                niederschlag=(
-                    float(row["Niederschlag"]) if pd.notna(row["Niederschlag"]) else 0
-                ),
-                sonnenstunden=(
-                    float(row["Sonnenstunden"])
-                    if pd.notna(row["Sonnenstunden"])
-                    else None
-                ),
+                datum=zeile["Datum"],
+                temp_min=zeile["Temp_min"],
+                temp_max=zeile["Temp_max"],
+                temperatur=zeile["Temperatur"],
+                niederschlag=zeile["Niederschlag"],
+                sonnenstunden=zeile["Sonnenstunden"],
                 quelle=Quelle.MANUELL,
-                standort=row.get("Standort", ""),
+                standort=zeile["Standort"],
             )
-            neue_messungen.append(messung)
+            (duplicate_entries if doppelt else neue_messungen).append(messung)
 
-        # Prüfen auf Duplikate (Datum + Ort)
-        duplicate_entries = [
-            m for m in neue_messungen if wd.existiert_eintrag(m.datum, m.standort)
-        ]
-        if duplicate_entries:
+        if duplicate_entries and not ersetzen:
             st.warning(
-                f"{len(duplicate_entries)} Einträge existieren bereits für das Datum/den Ort!"
+                f"{len(duplicate_entries)} Einträge existieren bereits für das Datum/den Ort "
+                "und wurden übersprungen."
             )
-            overwrite = st.checkbox("Vorhandene Einträge ersetzen?")
-            if overwrite:
-                for m in duplicate_entries:
-                    wd.ersetze_eintrag(m.datum, m.standort, m)
-                # Entferne die ersetzten aus neue_messungen, um sie nicht erneut hinzuzufügen
-                neue_messungen = [
-                    m for m in neue_messungen if m not in duplicate_entries
-                ]
-
-        # Alle neuen (nicht-doppelten) Messungen hinzufügen
-        for m in neue_messungen:
-            wd.hinzufuegen(m)
+            duplicate_entries = []
+
+        # Ersetzungen und neue Messungen in einem Durchlauf übernehmen
+        wd.aenderungen_anwenden(einfuegen=neue_messungen, ersetzen=duplicate_entries)
 
         # GitHub Push: nur debug_mode=True, wenn Dev-Mode aktiv
         wd.export_github_json(debug_mode=st.session_state.get("dev_mode", False))
-        st.success("Wetterdaten gespeichert!")
+        st.success(
+            f"Wetterdaten gespeichert! ({len(neue_messungen)} neu, {len(duplicate_entries)} ersetzt)"
+        )
 
         # Eingabe zurücksetzen
         st.session_state.manuelle_input_df = pd.DataFrame(
@@ -1084,7 +4316,8 @@ def wettersimulation(wd):
             - Für jeden Tag wird eine zufällige Messung erzeugt:
                 - Temperatur (15–30 °C)
                 - Niederschlag (0–10 mm)
-                - Sonnenstunden (0–12 h)
+                - Sonnenstunden aus der Tageslänge am Ort (`sonne`, alle Tage in einem Aufruf),
+                  an nassen Tagen im Mittel weniger
             - Quelle der Messungen wird als 'simuliert' markiert.
             - Die erzeugten Messungen werden dem WetterDaten-Objekt hinzugefügt.
             - Optional: Alle simulierten Daten werden auf GitHub gespeichert.
@@ -1097,89 +4330,504 @@ def wettersimulation(wd):
     tage = st.number_input("Tage", 1, 30, 7)
     if st.button("Simulieren"):
         heute = datetime.datetime.now()
+        # Datum rückwärts berechnen
+        daten = [heute - datetime.timedelta(days=i) for i in range(tage)]
+        niederschlag = [round(random.uniform(0, 10), 1) for _ in daten]
+        sonnenstunden = sonne.sonnenstunden_schaetzen(
+            standort_breite(ort), daten, niederschlag=niederschlag
+        )
         # Für jeden Tag eine zufällige Messung erzeugen
-        for i in range(tage):
-            # Datum rückwärts berechnen
-            datum = heute - datetime.timedelta(days=i)
-            wd.hinzufuegen(
-                WetterMessung(
-                    datum,
-                    round(random.uniform(15, 30), 1),  # Temperatur
-                    round(random.uniform(0, 10), 1),  # Niederschlag
-                    round(random.uniform(0, 12), 1),  # Sonnenstunden
-                    quelle=Quelle.SIMULIERT,
-                    standort=ort,
-                )
+        simuliert = [
+            WetterMessung(
+                datum,
+                round(random.uniform(15, 30), 1),  # Temperatur
+                nied,  # Niederschlag
+                float(sonne_h),  # Sonnenstunden
+                quelle=Quelle.SIMULIERT,
+                standort=ort,
             )
+            for datum, nied, sonne_h in zip(daten, niederschlag, sonnenstunden)
+        ]
+        wd.aenderungen_anwenden(einfuegen=simuliert)
         # Alle simulierten Daten auf GitHub speichern
         wd.export_github_json()
         st.success(f"{tage} Tage simuliert!")
 
 
-def live_wetterdaten(wd, ort):
+OWM_BASE_URL = st.secrets["Legacy91988"].get(
+    "owm_base_url", "http://api.openweathermap.org"
+)  # für Tests z. B. "http://127.0.0.1:8765" (siehe stub_server.py)
+OWM_CACHE_TTL = st.secrets["Legacy91988"].get("owm_cache_ttl", 600)  # Sekunden
+OWM_CACHE_DATEI = ".owm_cache.json"
+OWM_STATISTIK_DATEI = ".owm_cache_statistik.json"  # Statistik des Workers für das Dev-Dashboard
+OWM_STAEDTE_DATEI = ".owm_staedte.json"
+OWM_GRUPPE_MAX = 20  # maximale Anzahl IDs pro /group-Anfrage
+# Breitengrade für die Sonnenstunden-Schätzung: feste Zuordnung Standort -> Breite (Grad),
+# sonst die Koordinaten der OWM-Stadtauflösung, sonst STANDARD_BREITE (Mitte Deutschlands)
+STANDORT_BREITEN = dict(st.secrets["Legacy91988"].get("standort_breiten", {}))
+STANDARD_BREITE = st.secrets["Legacy91988"].get("standard_breite", 51.0)
+
+
+class OWMCache:
     """
-    Holt aktuelle Wetterdaten für einen Ort:
-    - Temperatur, Niederschlag, Sonnenstunden
-    - Speichert die Messung in wd
-    - Gibt die Rohdaten der API zurück
+    TTL-Cache für OpenWeatherMap-Antworten, pro Ort.
+
+    OpenWeatherMap aktualisiert die Beobachtungen nur etwa alle 10 Minuten. Der Cache
+    liefert innerhalb der TTL die gespeicherte Antwort, statt erneut anzufragen.
+
+    Funktionsweise:
+        - Schlüssel ist der normalisierte Ortsname (ohne Leerzeichen am Rand, ohne Groß/Klein).
+        - Nur erfolgreiche Antworten (mit Temperatur) werden gespeichert.
+        - Laufen mehrere Anfragen für denselben Ort gleichzeitig, wartet jede weitere auf
+          die erste, statt selbst eine HTTP-Anfrage zu stellen.
+        - Die Einträge werden in `datei` gespeichert und überstehen so Neustarts.
+        - Die Statistik wird in `statistik_datei` fortgeschrieben (`statistik_speichern`,
+          nach jedem Lauf von `cli.py worker`); das Dev-Dashboard liest sie von dort.
+
+    Attribute:
+        statistik (dict): Zähler für treffer, fehlschlaege und gebuendelt.
     """
 
-    # API-Key aus Secrets
-    OWM_API_KEY = st.secrets["Legacy91988"]["OWM_API_KEY"]
-    if not OWM_API_KEY:
-        st.error("OpenWeatherMap API-Key ist nicht gesetzt!")
-        return None
-    # API-Request
-    url = f"http://api.openweathermap.org/data/2.5/weather?q={ort}&appid={OWM_API_KEY}&units=metric&lang=de"
+    def __init__(
+        self, ttl_sekunden=OWM_CACHE_TTL, datei=OWM_CACHE_DATEI, statistik_datei=OWM_STATISTIK_DATEI
+    ):
+        self.ttl_sekunden = ttl_sekunden
+        self.datei = datei
+        self.statistik_datei = statistik_datei
+        self.statistik = {"treffer": 0, "fehlschlaege": 0, "gebuendelt": 0}
+        self._lock = threading.Lock()
+        self._eintraege = {}  # Schlüssel -> {"zeit": Zeitstempel, "daten": Antwort}
+        self._laufend = {}  # Schlüssel -> Future der laufenden Anfrage
+        self._datei_laden()
+        # Zähler früherer Läufe weiterführen (z. B. bei `cli.py worker --einmal` per Cron)
+        gespeichert = owm_statistik_laden(statistik_datei) or {}
+        for art in self.statistik:
+            self.statistik[art] = int(gespeichert.get(art, 0))
+
+    @staticmethod
+    def schluessel(ort):
+        return ort.strip().casefold()
+
+    def _frisch(self, eintrag, jetzt=None):
+        return (jetzt or time.time()) - eintrag["zeit"] < self.ttl_sekunden
+
+    def _datei_laden(self):
+        try:
+            with open(self.datei, encoding="utf-8") as f:
+                eintraege = json.load(f)
+        except (OSError, ValueError):
+            return
+        jetzt = time.time()
+        self._eintraege = {k: e for k, e in eintraege.items() if self._frisch(e, jetzt)}
+
+    def speichern(self):
+        """Schreibt die Einträge atomar in die Cache-Datei."""
+        with self._lock:
+            eintraege = dict(self._eintraege)
+        try:
+            datei_atomar_schreiben(self.datei, json.dumps(eintraege).encode("utf-8"))
+        except OSError:
+            pass  # Cache ist nur eine Optimierung
+
+    def get(self, ort):
+        """Gibt die gespeicherte Antwort zurück, falls sie noch frisch ist (zählt als Treffer), sonst None."""
+        with self._lock:
+            eintrag = self._eintraege.get(self.schluessel(ort))
+            if eintrag and self._frisch(eintrag):
+                self.statistik["treffer"] += 1
+                return eintrag["daten"]
+            return None
+
+    def zaehlen(self, art, anzahl=1):
+        """Erhöht einen Statistik-Zähler (z. B. für Gruppenabfragen außerhalb von `abrufen`)."""
+        with self._lock:
+            self.statistik[art] += anzahl
+
+    def setzen(self, ort, daten, speichern=True):
+        """Speichert eine erfolgreiche Antwort für `ort`."""
+        with self._lock:
+            self._eintraege[self.schluessel(ort)] = {"zeit": time.time(), "daten": daten}
+        if speichern:
+            self.speichern()
+
+    def abrufen(self, ort, laden):
+        """
+        Liefert die Antwort für `ort` aus dem Cache oder über `laden()`.
+
+        Parameter:
+            ort (str): Ortsname.
+            laden (callable): Führt die eigentliche HTTP-Anfrage aus und gibt das JSON zurück.
+
+        Rückgabe:
+            dict: Antwort der API (aus dem Cache oder frisch geladen).
+        """
+        key = self.schluessel(ort)
+        with self._lock:
+            eintrag = self._eintraege.get(key)
+            if eintrag and self._frisch(eintrag):
+                self.statistik["treffer"] += 1
+                return eintrag["daten"]
+            laufend = self._laufend.get(key)
+            if laufend is not None:
+                self.statistik["gebuendelt"] += 1
+            else:
+                self.statistik["fehlschlaege"] += 1
+                future = self._laufend[key] = Future()
+
+        # Es läuft bereits eine Anfrage für diesen Ort: auf deren Ergebnis warten
+        if laufend is not None:
+            return laufend.result()
+
+        try:
+            daten = laden()
+        except Exception as e:
+            with self._lock:
+                self._laufend.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        if daten.get("main", {}).get("temp") is not None:
+            self.setzen(ort, daten)
+        with self._lock:
+            self._laufend.pop(key, None)
+        future.set_result(daten)
+        return daten
+
+    def uebersicht(self):
+        """Statistik inkl. Trefferquote und Anzahl gespeicherter Einträge."""
+        with self._lock:
+            stat = dict(self.statistik)
+            stat["eintraege"] = len(self._eintraege)
+        anfragen = stat["treffer"] + stat["fehlschlaege"] + stat["gebuendelt"]
+        stat["trefferquote"] = (
+            round((stat["treffer"] + stat["gebuendelt"]) / anfragen * 100, 1)
+            if anfragen
+            else 0.0
+        )
+        return stat
+
+    def statistik_speichern(self):
+        """Schreibt `uebersicht()` mit Zeitstempel atomar in die Statistik-Datei."""
+        stat = self.uebersicht()
+        stat["zeit"] = time.time()
+        try:
+            datei_atomar_schreiben(self.statistik_datei, json.dumps(stat).encode("utf-8"))
+        except OSError:
+            pass  # Statistik ist nur zur Anzeige
+
+
+def owm_statistik_laden(datei=OWM_STATISTIK_DATEI):
+    """
+    Liest die zuletzt gespeicherte OWM-Cache-Statistik (`OWMCache.statistik_speichern`).
+
+    Rückgabe:
+        dict|None: Zähler, Trefferquote, Einträge und Zeitstempel; None, wenn es keine gibt.
+    """
     try:
-        data = requests.get(url, timeout=5).json()
-    except Exception as e:
-        st.error(f"Fehler beim Abrufen der Live-Daten: {e}")
+        with open(datei, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
         return None
 
-    # Werte aus JSON extrahieren
-    temp = data.get("main", {}).get("temp")
-    niederschlag = data.get("rain", {}).get("1h", 0)
 
-    if temp is None:
-        msg = data.get("message", "Keine Temperaturdaten erhalten.")
-        st.error(f"OpenWeatherMap-Fehler: {msg}")
-        return data
+class StadtAufloesung:
+    """
+    Zuordnung Standort-Name -> OpenWeatherMap-Stadt (ID und Koordinaten).
 
-    # Sonnenstunden berechnen
-    try:
-        sunrise_ts = data["sys"]["sunrise"]
-        sunset_ts = data["sys"]["sunset"]
-        clouds = data.get("clouds", {}).get("all", 100)  # Bewölkung in %
-        sunrise = datetime.datetime.fromtimestamp(sunrise_ts)
-        sunset = datetime.datetime.fromtimestamp(sunset_ts)
-        tageslaenge = (sunset - sunrise).total_seconds() / 3600  # Stunden
-        sonnenstunden = round((1 - clouds / 100) * tageslaenge, 1)
-    except Exception as e:
-        st.warning(f"Sonnenstunden konnten nicht berechnet werden: {e}")
-        sonnenstunden = 0
-
-    # Messung erstellen
-    messung = WetterMessung(
-        datum=datetime.datetime.now(),
-        temperatur=temp,
-        niederschlag=niederschlag,
-        sonnenstunden=sonnenstunden,
-        quelle=Quelle.LIVE,
-        standort=ort,
+    Ein Name wird nur einmal aufgelöst (über die erste `/weather?q=`-Antwort). Danach
+    wird per ID abgefragt, wodurch mehrere Orte gemeinsam über `/group` abgerufen
+    werden können. Die Zuordnung wird in `datei` gespeichert.
+    """
+
+    def __init__(self, datei=OWM_STAEDTE_DATEI):
+        self.datei = datei
+        self._lock = threading.Lock()
+        try:
+            with open(self.datei, encoding="utf-8") as f:
+                self._staedte = json.load(f)
+        except (OSError, ValueError):
+            self._staedte = {}  # Schlüssel -> {"id", "name", "lat", "lon"}
+
+    def get(self, ort):
+        """Gibt die aufgelöste Stadt für `ort` zurück oder None."""
+        with self._lock:
+            return self._staedte.get(OWMCache.schluessel(ort))
+
+    def merken(self, ort, daten):
+        """Übernimmt ID und Koordinaten aus einer erfolgreichen `/weather`-Antwort."""
+        if daten.get("id") is None:
+            return
+        key = OWMCache.schluessel(ort)
+        stadt = {
+            "id": daten["id"],
+            "name": daten.get("name", ort),
+            "lat": daten.get("coord", {}).get("lat"),
+            "lon": daten.get("coord", {}).get("lon"),
+        }
+        with self._lock:
+            if self._staedte.get(key) == stadt:
+                return
+            self._staedte[key] = stadt
+            staedte = dict(self._staedte)
+        self._speichern(staedte)
+
+    def vergessen(self, ort):
+        """Entfernt die Zuordnung (z. B. wenn OWM die ID nicht mehr kennt); der nächste Abruf löst neu auf."""
+        with self._lock:
+            if self._staedte.pop(OWMCache.schluessel(ort), None) is None:
+                return
+            staedte = dict(self._staedte)
+        self._speichern(staedte)
+
+    def _speichern(self, staedte):
+        try:
+            datei_atomar_schreiben(self.datei, daten_serialisieren(staedte))
+        except OSError:
+            pass
+
+
+@st.cache_resource
+def owm_cache():
+    """Ein gemeinsamer OWM-Cache pro Server-Prozess (für alle Sessions)."""
+    return OWMCache()
+
+
+@st.cache_resource
+def owm_staedte():
+    """Gemeinsame Stadt-Auflösung pro Server-Prozess."""
+    return StadtAufloesung()
+
+
+def owm_abrufen(ort, api_key):
+    """
+    Fragt das aktuelle Wetter für einen Ort bei OpenWeatherMap ab (`/weather`).
+
+    Antworten werden über `owm_cache()` für OWM_CACHE_TTL Sekunden wiederverwendet.
+    Ist der Ort bereits aufgelöst, wird per Stadt-ID statt per Namen abgefragt.
+
+    Rückgabe:
+        dict: Rohdaten der API (bei Fehlern mit "cod" und "message").
+
+    Fehler:
+        requests.RequestException bei Netzwerkfehlern.
+    """
+    stadt = owm_staedte().get(ort)
+    params = {"appid": api_key, "units": "metric", "lang": "de"}
+    if stadt:
+        params["id"] = stadt["id"]
+    else:
+        params["q"] = ort
+
+    def laden():
+        daten = requests.get(
+            f"{OWM_BASE_URL}/data/2.5/weather", params=params, timeout=5
+        ).json()
+        if daten.get("main", {}).get("temp") is not None:
+            owm_staedte().merken(ort, daten)
+        return daten
+
+    return owm_cache().abrufen(ort, laden)
+
+
+def owm_abrufen_mehrere(orte, api_key):
+    """
+    Fragt das aktuelle Wetter für mehrere Orte mit möglichst wenigen Anfragen ab.
+
+    Funktionsweise:
+        - Frische Antworten kommen aus `owm_cache()`.
+        - Noch nicht aufgelöste Orte werden einzeln per Namen abgefragt (einmalig).
+        - Alle übrigen Orte werden per ID über `/group` abgefragt, bis zu
+          OWM_GRUPPE_MAX Städte pro Anfrage.
+
+    Rückgabe:
+        dict: Ort -> Rohdaten (gleiches Format wie `/weather`). Jeder angefragte Ort ist
+        enthalten; fehlt seine ID in der Gruppenantwort, steht dort eine Fehlermeldung im
+        OWM-Format ({"cod": "404", "message": ...}) statt der Wetterdaten, und die
+        Zuordnung des Orts wird verworfen.
+
+    Fehler:
+        requests.RequestException bei Netzwerk- oder HTTP-Fehlern der Gruppenabfrage.
+    """
+    ergebnis = {}
+    nach_id = {}  # Stadt-ID -> Liste der Orte mit dieser ID
+    for ort in dict.fromkeys(orte):
+        daten = owm_cache().get(ort)
+        if daten is not None:
+            ergebnis[ort] = daten
+            continue
+        stadt = owm_staedte().get(ort)
+        if stadt is None:
+            ergebnis[ort] = owm_abrufen(ort, api_key)
+        else:
+            nach_id.setdefault(stadt["id"], []).append(ort)
+
+    ids = list(nach_id)
+    for i in range(0, len(ids), OWM_GRUPPE_MAX):
+        teil = ids[i : i + OWM_GRUPPE_MAX]
+        resp = requests.get(
+            f"{OWM_BASE_URL}/data/2.5/group",
+            params={
+                "id": ",".join(str(x) for x in teil),
+                "appid": api_key,
+                "units": "metric",
+                "lang": "de",
+            },
+            timeout=10,
+        )
+        resp.raise_for_status()
+        owm_cache().zaehlen("fehlschlaege", len(teil))
+        geliefert = set()
+        for daten in resp.json().get("list", []):
+            geliefert.add(daten.get("id"))
+            for ort in nach_id.get(daten.get("id"), []):
+                owm_cache().setzen(ort, daten, speichern=False)
+                ergebnis[ort] = daten
+        owm_cache().speichern()
+        for stadt_id in teil:
+            if stadt_id not in geliefert:
+                for ort in nach_id[stadt_id]:
+                    owm_staedte().vergessen(ort)  # beim nächsten Abruf per Namen neu auflösen
+                    ergebnis[ort] = {
+                        "cod": "404",
+                        "message": f"Stadt-ID {stadt_id} fehlt in der Gruppenantwort",
+                    }
+
+    return ergebnis
+
+
+def standort_breite(standort):
+    """
+    Breitengrad eines Standorts für die Tageslänge (ohne API-Aufruf).
+
+    Reihenfolge: STANDORT_BREITEN (secrets), Koordinaten aus der OWM-Stadtauflösung
+    (nach einer Live-Abfrage bekannt), sonst STANDARD_BREITE.
+    """
+    if standort in STANDORT_BREITEN:
+        return float(STANDORT_BREITEN[standort])
+    stadt = owm_staedte().get(standort) if standort else None
+    if stadt and stadt.get("lat") is not None:
+        return float(stadt["lat"])
+    return STANDARD_BREITE
+
+
+def standort_breiten(standorte):
+    """Breitengrade für eine Spalte/Liste von Standorten (jeder Standort wird einmal aufgelöst)."""
+    standorte = pd.Series(standorte)
+    return standorte.map({s: standort_breite(s) for s in standorte.unique()}).to_numpy(float)
+
+
+def sonnenstunden_aus_owm(data, standort=None, datum=None):
+    """
+    Berechnet die Sonnenstunden aus der Bewölkung einer OpenWeatherMap-Antwort.
+
+    Funktionsweise:
+        - Tageslänge astronomisch aus Breite und Datum (`sonne.tageslaenge`); die Breite
+          stammt aus `coord.lat` der Antwort, sonst aus `standort_breite`.
+        - Reduziert um den Bewölkungsgrad (clouds.all in %, fehlt er: 100 %).
+        - Sonnenauf- und -untergang der API werden nicht mehr benötigt.
+    """
+    breite = data.get("coord", {}).get("lat")
+    if breite is None:
+        breite = standort_breite(standort or data.get("name"))
+    clouds = data.get("clouds", {}).get("all", 100)  # Bewölkung in %
+    return sonne.sonnenstunden_schaetzen(
+        breite, datum or datetime.date.today(), bewoelkung=clouds
     )
-    # Prüfen, ob für heute schon ein Eintrag existiert
-    if not wd.existiert_eintrag(messung.datum, ort):
-        wd.hinzufuegen(messung)
-        wd.export_github_json(debug_mode=st.session_state.get("dev_mode", False))
-        st.success(
-            f"Live-Daten für {ort} hinzugefügt: {temp}°C, {niederschlag}mm, {sonnenstunden}h Sonne"
+
+
+def live_daten_anzeigen():
+    """
+    Zeigt die zuletzt vom Ingestion-Worker (`python cli.py worker`) erfassten Live-Daten an:
+    pro Standort den heutigen, aus den Stundenwerten abgeleiteten Tageswert und die Zeit
+    der letzten Beobachtung.
+
+    Hinweise:
+        - Die App ruft selbst keine Live-Daten ab und schreibt keine: OpenWeatherMap-Abruf,
+          Stundenwerte und Tagesmessungen übernimmt allein der Worker außerhalb des
+          Web-Prozesses. Ein sofortiger Abruf ist über `python cli.py worker --einmal` möglich.
+    """
+    konfiguration = st.secrets.get("worker", {})
+    standorte = list(konfiguration.get("standorte", []))
+    if standorte:
+        st.caption(
+            f"Ingestion-Worker: {', '.join(standorte)} – Zeitplan „{konfiguration.get('zeitplan', '0 6 * * *')}“"
         )
     else:
-        st.info(f"Für {ort} existiert bereits ein Eintrag für heute.")
+        st.info("Kein Ingestion-Worker konfiguriert ([worker] standorte in secrets.toml).")
+
+    tage = stundenwerte_laden().tageswerte(von=datetime.date.today())
+    heute = tage[tage["Datum"] == pd.Timestamp(datetime.date.today())]
+    if heute.empty:
+        st.info("Heute wurden noch keine Live-Daten erfasst.")
+    else:
+        st.dataframe(
+            heute[["Standort", "Zuletzt", "Temperatur", "Temp_min", "Temp_max",
+                   "Niederschlag", "Sonnenstunden", "Beobachtungen"]],
+            hide_index=True,
+        )
+    st.caption("Sofortiger Abruf außerhalb des Zeitplans:")
+    st.code(f'python cli.py worker --einmal --standorte "{",".join(standorte) or "Ort1,Ort2"}"')
+
+
+def csv_import(wd):
+    """
+    Stellt ein Interface für den Import historischer CSV-Dateien (Backfill) bereit.
+
+    Parameter:
+        wd (WetterDaten | WetterAnalyse): Objekt, in das die Messungen übernommen werden.
+
+    Funktionsweise:
+        - Upload einer CSV-Datei (eigener CSV-Export oder DWD-Tageswerte).
+        - Optional: fester Standort für alle Zeilen (z. B. bei DWD-Stations-IDs).
+        - Import blockweise über `csv_backfill`, Duplikate (Tag + Ort) werden übersprungen.
+        - Jeder Block wird sofort gespeichert und wieder freigegeben (`block_speichern`,
+          wie `cli.py backfill`); der Import läuft in einer eigenen Kopie (`importziel`),
+          die Seite zeigt die neuen Messungen nach dem nächsten Laden.
+    """
+    st.subheader("Historische Daten importieren (CSV)")
+    datei = st.file_uploader("CSV-Datei", type=["csv", "txt"], key="csv_import_datei")
+    format = st.selectbox(
+        "Format",
+        list(CSV_FORMATE),
+        format_func=lambda f: {"wetterweiser": "Wetterweiser-CSV", "dwd": "DWD Tageswerte"}.get(f, f),
+        key="csv_import_format",
+    )
+    standort = st.text_input("Standort für alle Zeilen (optional)", key="csv_import_ort")
+
+    if datei is not None and st.button("Importieren", key="btn_csv_import"):
+        fortschritt = st.empty()
+        ziel = wd.importziel()
+        speicher = speicher_je_ablage()
+        gespeichert = 0
+
+        def nach_batch(batch):
+            nonlocal gespeichert
+            resp = ziel.block_speichern()
+            if resp.status_code not in [200, 201, 304]:
+                raise RuntimeError(f"GitHub-Update fehlgeschlagen: {resp.status_code} – {resp.text}")
+            speicher[ziel.nutzlast_pfad].uebernehmen(ziel.nutzlast)  # neuer Stand für alle Sessions
+            gespeichert += len(batch)
+            fortschritt.write(f"{gespeichert} Messungen gespeichert …")
+
+        try:
+            statistik = ziel.csv_backfill(
+                datei, format=format, standort=standort or None, nach_batch=nach_batch
+            )
+        except Exception as e:
+            st.error(f"Fehler beim CSV-Import: {e}")
+            if gespeichert:
+                st.info(f"{gespeichert} Messungen wurden bereits gespeichert.")
+            return
 
-    # Rohdaten für Dev-Mode zurückgeben
-    return data
+        st.write(
+            f"Gelesen: {statistik['gelesen']} | Übernommen: {statistik['uebernommen']} | "
+            f"Duplikate: {statistik['duplikate']} | Ungültig: {statistik['ungueltig']}"
+        )
+        if statistik["uebernommen"]:
+            st.success(
+                f"{statistik['uebernommen']} Messungen importiert! "
+                "Sie erscheinen nach dem nächsten Laden der Seite."
+            )
 
 
 def download_wetterdaten_csv(wd):
@@ -1190,115 +4838,186 @@ def download_wetterdaten_csv(wd):
         wd (WetterDaten | WetterAnalyse): Objekt, aus dem die Wetterdaten als DataFrame extrahiert werden.
 
     Funktionsweise:
-        - Wandelt alle gespeicherten Messungen in ein pandas DataFrame um.
         - Prüft, ob Daten vorhanden sind; falls nicht, wird eine Info-Meldung angezeigt.
-        - Wandelt das DataFrame in CSV-Format um.
         - Stellt einen Download-Button in Streamlit bereit, mit dem der Benutzer die CSV-Datei herunterladen kann.
+        - Die CSV wird erst beim Klick erzeugt (alle Messungen als DataFrame -> CSV);
+          ein normaler Rerun der Seite baut sie nicht auf. Der Klick selbst löst keinen Rerun aus.
+        - Bei partitionierter Ablage werden dafür die noch nicht geladenen Partitionen in
+          einer Kopie nachgeladen; die Seite selbst behält ihre Auswahl.
     """
 
     st.subheader("Wetterdaten als CSV herunterladen")
-    # Alle Messungen als DataFrame
-    df = wd.als_dataframe()
-    if df.empty:
+    if not wd.messungen and not wd.standorte():
         st.info("Keine Daten vorhanden zum Download")
         return
-    # DataFrame in Csv Format umwandeln
-    csv_data = df.to_csv(index=False)
-    # Download-Button in Streamlit anzeigen
+
+    def csv_erzeugen():
+        alle = wd.kopie()
+        alle.partitionen_laden()  # alle Standorte, nicht nur die angezeigten
+        return alle.als_dataframe().to_csv(index=False)
+
+    # Download-Button in Streamlit anzeigen (CSV wird erst beim Klick erzeugt)
     st.download_button(
         label="Download als CSV",
-        data=csv_data,
+        data=csv_erzeugen,
         file_name="wetterdaten.csv",
         mime="text/csv",
+        on_click="ignore",
+    )
+
+
+TABELLEN_SPALTEN = [
+    "ID",
+    "Standort",
+    "Datum",
+    "Temperatur",
+    "Niederschlag",
+    "Sonnenstunden",
+    "Quelle",
+]
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _tabelle_gefiltert(version, _wd, ort, quelle, suche, sortierung, absteigend):
+    """
+    Filtert, durchsucht und sortiert die Messungen einmal pro Datenversion und Filter.
+
+    Das Ergebnis wird ohne Kopie geteilt (`st.cache_resource`); Aufrufer schneiden nur die
+    aktuelle Seite heraus und dürfen es nicht verändern.
+    """
+    df = _wd.als_dataframe()
+    if df.empty:
+        return df
+    df = df[TABELLEN_SPALTEN]
+    if ort != "Alle":
+        df = df[df["Standort"] == ort]
+    if quelle != "Alle":
+        df = df[df["Quelle"] == quelle]
+    if suche:
+        treffer = np.zeros(len(df), dtype=bool)
+        for spalte in ["Standort", "Quelle", "ID"]:
+            treffer |= df[spalte].astype(str).str.contains(suche, case=False, regex=False).to_numpy()
+        treffer |= df["Datum"].dt.strftime("%d.%m.%Y").str.contains(suche, regex=False).to_numpy()
+        df = df[treffer]
+    return df.sort_values(sortierung, ascending=not absteigend, kind="stable").reset_index(
+        drop=True
     )
 
 
 # Funktion: Messungen anzeigen & (im Dev-Mode) löschen
 def anzeigen_und_loeschen(wd):
     """
-    Zeigt alle Wetter-Messungen in einer Tabelle an und ermöglicht im Dev-Mode das Löschen einzelner Einträge.
+    Zeigt die Wetter-Messungen seitenweise an und ermöglicht im Dev-Mode das Löschen von Einträgen.
 
     Parameter:
         wd (WetterDaten | WetterAnalyse): Objekt, das die Wetter-Messungen enthält.
 
     Funktionsweise:
-        - Wandelt alle Messungen in ein DataFrame um und zeigt es sortiert nach Datum.
-        - Ermöglicht die Filterung nach Ort.
+        - Filter nach Ort und Quelle, Textsuche (Standort, Quelle, ID, Datum) und Sortierung
+          werden serverseitig angewendet und pro Datenversion gecached (`_tabelle_gefiltert`).
+        - An den Browser wird nur die aktuelle Seite geschickt; der Aufwand pro Rerun hängt
+          von der Seitengröße ab, nicht von der Anzahl der Messungen.
         - Im Dev-Mode:
-            - Zeigt ein Multiselect für die Auswahl von Einträgen zum Löschen.
-            - Löscht ausgewählte Einträge aus dem Objekt und optional auf GitHub.
-            - Aktualisiert die Tabelle nach dem Löschen automatisch.
+            - Einträge der aktuellen Seite per Checkbox auswählen und löschen.
+            - Oder alle Treffer des aktuellen Filters auf einmal löschen (mit Bestätigung).
+            - Die Löschungen werden mit einem Export auf GitHub gespeichert.
     """
     st.subheader("Messungen anzeigen")
-    df = wd.als_dataframe()
-    if df.empty:
+    # Ergebnis einer Löschung aus dem vorigen Durchlauf (danach wurde die ganze Seite neu geladen)
+    geloescht = st.session_state.pop("geloeschte_messungen", None)
+    if geloescht is not None:
+        if st.session_state.get("dev_mode", False):
+            st.text_area(
+                "GitHub-Payload (Debug) – gelöschte Messungen",
+                json.dumps(geloescht, indent=2),
+                height=200,
+            )
+        st.success(f"{len(geloescht)} Messung(en) gelöscht!")
+    if not wd.messungen:
         st.info("Keine Daten vorhanden.")
         return
 
-    # Filter nach Ort
-    orte = df["Standort"].unique()
-    ort_filter = st.selectbox("Ort auswählen:", np.append("Alle", orte))
+    # Filter, Suche und Sortierung
+    spalte1, spalte2, spalte3 = st.columns(3)
+    ort_filter = spalte1.selectbox("Ort auswählen:", ["Alle"] + wd.standorte())
     if ort_filter != "Alle":
-        df = df[df["Standort"] == ort_filter]
+        wd.partitionen_laden([ort_filter])
+    elif wd.partitioniert():
+        st.caption("Partitionierte Ablage: „Alle“ zeigt nur die bereits geladenen Standorte.")
+    quelle_filter = spalte2.selectbox(
+        "Quelle:", ["Alle", "manuell", "simuliert", "live"], key="tabelle_quelle"
+    )
+    suche = spalte3.text_input("Suche:", key="tabelle_suche").strip()
 
-    # Tabelle anzeigen
-    st.dataframe(
-        df[
-            [
-                "ID",
-                "Standort",
-                "Datum",
-                "Temperatur",
-                "Niederschlag",
-                "Sonnenstunden",
-                "Quelle",
-            ]
-        ].sort_values("Datum", ascending=False)
+    spalte1, spalte2, spalte3 = st.columns(3)
+    sortierung = spalte1.selectbox(
+        "Sortieren nach:", TABELLEN_SPALTEN[1:] + ["ID"], key="tabelle_sortierung"
+    )
+    absteigend = spalte2.radio(
+        "Reihenfolge:", ["absteigend", "aufsteigend"], horizontal=True, key="tabelle_richtung"
+    ) == "absteigend"
+    seitengroesse = spalte3.selectbox(
+        "Zeilen pro Seite:", [25, 50, 100, 250], key="tabelle_seitengroesse"
     )
 
+    df = _tabelle_gefiltert(
+        wd.version, wd, ort_filter, quelle_filter, suche, sortierung, absteigend
+    )
+    if df.empty:
+        st.info("Keine Messungen für diesen Filter.")
+        return
+
+    seiten = max(1, -(-len(df) // seitengroesse))
+    seite = st.number_input(
+        f"Seite (von {seiten}, {len(df)} Treffer):", 1, seiten, 1, key="tabelle_seite"
+    )
+    seite_df = df.iloc[(seite - 1) * seitengroesse : seite * seitengroesse]
+
+    # Tabelle anzeigen (nur die aktuelle Seite)
+    if not st.session_state.get("dev_mode", False):
+        st.dataframe(seite_df, hide_index=True)
+        return
+
     # Dev-Mode: Einträge löschen
-    if st.session_state.get("dev_mode", False):
-        st.markdown("### 🗑️ Einträge löschen (Dev-Mode)")
-
-        df_sorted = df.sort_values("Datum", ascending=False)
-        eintraege = [
-            f"{row['ID']} | {row['Standort']} | {row['Datum'].strftime('%d.%m.%Y')} | "
-            f"{row['Temperatur']}°C | {row['Niederschlag']}mm | {row['Sonnenstunden']}h | {row['Quelle']}"
-            for _, row in df_sorted.iterrows()
-        ]
+    auswahl_df = st.data_editor(
+        seite_df.assign(Löschen=False),
+        hide_index=True,
+        disabled=TABELLEN_SPALTEN,
+        key=f"tabelle_editor_{wd.version}_{seite}_{seitengroesse}",
+    )
+    st.markdown("### 🗑️ Einträge löschen (Dev-Mode)")
+    zu_loeschen = auswahl_df.loc[auswahl_df["Löschen"], "ID"].tolist()
+
+    spalte1, spalte2 = st.columns(2)
+    if spalte1.button(
+        f"Ausgewählte löschen ({len(zu_loeschen)})",
+        key="dev_delete_button",
+        disabled=not zu_loeschen,
+    ):
+        messungen_loeschen(wd, zu_loeschen)
 
-        if eintraege:
-            auswahl = st.multiselect(
-                "Einträge zum Löschen auswählen:",
-                options=eintraege,
-                key="dev_delete_multiselect",
-            )
+    bestaetigt = spalte2.checkbox(
+        f"Alle {len(df)} Treffer des aktuellen Filters löschen", key="dev_delete_filter"
+    )
+    if bestaetigt and spalte2.button("Filter-Treffer löschen", key="dev_delete_filter_button"):
+        messungen_loeschen(wd, df["ID"].tolist())
 
-            if auswahl and st.button("Löschen", key="dev_delete_button"):
-                geloeschte_messungen = []
-
-                for eintrag in auswahl:
-                    eintrag_id = eintrag.split(" | ")[0]
-                    # Vorher speichern für Debug
-                    messung = next((m for m in wd.messungen if m.id == eintrag_id), None)
-                    if messung:
-                        geloeschte_messungen.append(messung.als_dict())
-                    # Dann löschen
-                    wd.loeschen(eintrag_id)
-
-                # GitHub-Push optional, Debug anzeigen
-                if st.session_state.get("dev_mode", False):
-                    st.text_area(
-                        "GitHub-Payload (Debug) – zu löschende Messungen",
-                        json.dumps(geloeschte_messungen, indent=2),
-                        height=200
-                    )
 
-                wd.export_github_json(debug_mode=st.session_state.get("dev_mode", False))
-                st.success(f"{len(auswahl)} Messung(en) gelöscht!")
+def messungen_loeschen(wd, ids):
+    """
+    Löscht die Messungen mit den angegebenen IDs und speichert die Änderung auf GitHub.
+
+    Danach wird die ganze Seite neu geladen (die Tabelle läuft als Fragment, die übrigen
+    Abschnitte sollen den neuen Stand zeigen). Die Bestätigung – im Dev-Mode mit der Liste
+    der gelöschten Messungen – zeigt `anzeigen_und_loeschen` im nächsten Durchlauf an.
+    """
+    ergebnis = wd.aenderungen_anwenden(loeschen=ids)
+    st.session_state["geloeschte_messungen"] = [m.als_dict() for m in ergebnis["entfernt"]]
+
+    wd.export_github_json(debug_mode=st.session_state.get("dev_mode", False))
 
-                # Soft-Rerun Trigger: Tabelle wird neu geladen
-                st.session_state["reload"] = not st.session_state.get("reload", False)
+    # vollständiger Rerun (nicht nur das Fragment der Tabelle)
+    st.rerun()
 
 
 # Haupt-App
@@ -1307,18 +5026,21 @@ def main():
     Hauptfunktion der Wetterweiser-App (Streamlit).
 
     Funktionsweise:
-        - Initialisiert den Dev-Mode und einen Soft-Rerun-Trigger.
+        - Initialisiert den Dev-Mode.
         - Fragt optional ein Entwickler-Passwort ab, um den Debug-Modus zu aktivieren.
-        - Lädt Wetterdaten von GitHub als WetterAnalyse-Objekt.
+        - Lädt Wetterdaten als WetterAnalyse-Objekt (sofort aus dem Schnappschuss,
+          Abgleich mit GitHub im Hintergrund) und zeigt den Datenstand an.
         - Zeigt Dev-Mode Dashboard mit Debug-Infos (falls aktiviert).
-        - Bietet drei Modi zum Hinzufügen von Daten:
+        - Bietet vier Modi zum Hinzufügen von Daten:
             1. Manuelle Eingabe
             2. Simulation zufälliger Wetterdaten
-            3. Live-Abfrage von Wetterdaten über API
-        - Ermöglicht den Download aller Wetterdaten als CSV.
-        - Zeigt Diagramme und Statistiken:
+            3. Anzeige der Live-Daten, die der Ingestion-Worker erfasst hat (nur lesend)
+            4. Import historischer CSV-Dateien
+        - Ermöglicht den Download aller Wetterdaten als CSV (erzeugt erst beim Klick).
+        - Zeigt Diagramme und Statistiken, jeweils als eigenes Fragment (`dashboard_abschnitt`):
             - 3-Tage Prognose
             - Regenwahrscheinlichkeit der letzten 7 Tage
+            - Standortvergleich mit Rangliste (alle Standorte in einem Durchlauf)
             - Vergleich der letzten 7 Tage
             - Monatsvergleich
             - Jahresstatistik
@@ -1333,9 +5055,6 @@ def main():
     # Dev-Mode Initialisierung
     if "dev_mode" not in st.session_state:
         st.session_state.dev_mode = False
-    if "reload" not in st.session_state:
-        st.session_state["reload"] = False
-    _ = st.session_state["reload"]  # Trigger für Soft-Rerun
 
     # Entwickler-Passwort abfragen
     eingabe = st.sidebar.text_input("Entwickler-Passwort", type="password")
@@ -1348,48 +5067,99 @@ def main():
             st.sidebar.success("Dev-Mode aktiv")
 
     # Wetterdaten laden (als WetterAnalyse-Objekt)
-    wd = WetterAnalyse.load_github_data(debug=st.session_state.dev_mode)
+    # bei partitionierter Ablage nur den gewählten Diagramm-Ort laden
+    wd = WetterAnalyse.load_github_data(
+        debug=st.session_state.dev_mode, ort_filter=st.session_state.get("ort_filter")
+    )
+    datenstand_anzeigen()
 
-    # Dev-Mode Dashboard initial anzeigen
-    live_data = None
-    dev_mode_dashboard(wd, live_data=live_data)
+    # Platz für den Status der Hintergrund-Uploads (wird am Ende befüllt)
+    upload_bereich = st.container()
+
+    # Platz für das Dev-Mode Dashboard (wird nach den Eingaben befüllt)
+    dev_bereich = st.container()
 
     # Daten hinzufügen
     st.subheader("Daten hinzufügen")
-    modus = st.radio("Modus", ("Manuelle Eingabe", "Simulation", "Live-Abfrage"))
+    modus = st.radio(
+        "Modus", ("Manuelle Eingabe", "Simulation", "Live-Daten", "CSV-Import")
+    )
 
     if modus == "Manuelle Eingabe":
         manuelle_eingabe(wd)
     elif modus == "Simulation":
         wettersimulation(wd)
-    elif modus == "Live-Abfrage":
-        ort = st.text_input("Ort für Live-Abfrage", "Musterstadt")
-        if st.button("Live-Daten abrufen"):
-            live_data = live_wetterdaten(wd, ort)
-            dev_mode_dashboard(wd, live_data=live_data)
+    elif modus == "Live-Daten":
+        live_daten_anzeigen()
+    elif modus == "CSV-Import":
+        csv_import(wd)
 
-    # CSV-Download
-    download_wetterdaten_csv(wd)
+    # Dev-Mode Dashboard (einmal pro Durchlauf, nach den Eingaben)
+    with dev_bereich:
+        dev_mode_dashboard(wd)
+
+    # CSV-Download (eigenes Fragment, CSV erst beim Klick)
+    dashboard_abschnitt(download_wetterdaten_csv, wd)
 
     # Diagramme und Statistiken
-    df = wd.als_dataframe()
-    orte = df["Standort"].unique() if not df.empty else []
+    orte = wd.standorte()
     ort_filter = st.selectbox(
         "Diagramm-Ort auswählen",
-        options=np.append("Alle", orte) if len(orte) > 0 else ["Alle"],
+        options=["Alle"] + orte,
+        index=1 if wd.partitioniert() and orte else 0,
+        key="ort_filter",
     )
+    # "Alle" braucht bei partitionierter Ablage sämtliche Partitionen (ohne Manifest: nichts zu tun)
+    wd.partitionen_laden(None if ort_filter == "Alle" else [ort_filter])
 
-    wd.plot_3tage_prognose(ort_filter)
-    regen_wahrscheinlichkeit = wd.regenwahrscheinlichkeit(tage=7, ort_filter=ort_filter)
-    st.write(
-        f" Regenwahrscheinlichkeit in den letzten 7 Tagen: {regen_wahrscheinlichkeit}%"
+    backends = list(DIAGRAMM_BACKENDS.values())
+    if DIAGRAMM_BACKEND in backends:
+        standard_backend = DIAGRAMM_BACKEND
+    else:
+        standard_backend = "vega-lite"
+        st.warning(
+            f"Unbekanntes diagramm_backend '{DIAGRAMM_BACKEND}' in secrets.toml "
+            f"(erlaubt: {', '.join(backends)}) – es wird {standard_backend} verwendet."
+        )
+    backend = DIAGRAMM_BACKENDS[
+        st.radio(
+            "Diagramm-Darstellung",
+            list(DIAGRAMM_BACKENDS),
+            index=backends.index(standard_backend),
+            horizontal=True,
+            key="diagramm_backend",
+        )
+    ]
+
+    zeichner = DiagrammZeichner(
+        backend, diagramm_pool() if backend == "matplotlib" else None, gemeinsame_ablage()
     )
-    wd.plot_7tage_vergleich(ort_filter)
-    wd.plot_monatsvergleich(ort_filter)
-    wd.jahresstatistik(ort_filter)
+
+    # jeder Abschnitt ist ein eigenes Fragment: ändert der Benutzer dort ein Widget
+    # (z. B. die Prognose-Methode), wird nur dieser Abschnitt neu berechnet
+    dashboard_abschnitt(wd.plot_3tage_prognose, ort_filter, zeichner=zeichner)
+    dashboard_abschnitt(regenwahrscheinlichkeit_anzeigen, wd, ort_filter)
+    dashboard_abschnitt(rollende_analyse_anzeigen, wd, ort_filter)
+    dashboard_abschnitt(backtest_anzeigen, wd, ort_filter)
+    dashboard_abschnitt(standortvergleich_anzeigen, wd, ort_filter)
+    dashboard_abschnitt(wd.plot_7tage_vergleich, ort_filter, zeichner=zeichner)
+    dashboard_abschnitt(wd.plot_monatsvergleich, ort_filter, zeichner=zeichner)
+    dashboard_abschnitt(klima_anzeigen, wd, ort_filter)
+    dashboard_abschnitt(langzeit_diagramm, wd, ort_filter, zeichner=zeichner)
+    dashboard_abschnitt(tagesverlauf_anzeigen, ort_filter)
+    dashboard_abschnitt(wd.jahresstatistik, ort_filter)
+    # Matplotlib-Diagramme aus dem Prozesspool einsetzen, sobald sie fertig sind;
+    # spätere Fragment-Reruns eines Abschnitts schließen ihre Diagramme selbst ab
+    zeichner.abschliessen()
+    zeichner.sammeln = False
 
     # Messungen anzeigen & ggf. löschen
-    anzeigen_und_loeschen(wd)
+    dashboard_abschnitt(anzeigen_und_loeschen, wd)
+
+    # Status der Hintergrund-Uploads (auch für Uploads, die in diesem Durchlauf gestartet wurden)
+    if st.session_state.get("uploads"):
+        with upload_bereich:
+            upload_status()
 
 
 # Programm starten
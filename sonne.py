@@ -0,0 +1,108 @@
+"""
+Astronomische Tageslänge und Schätzung der Sonnenstunden – ohne Netzwerk, vektorisiert.
+
+Das Modul importiert weder Streamlit noch pandas. Alle Funktionen nehmen Breitengrade und
+Daten als Skalare oder Arrays (auch pandas-Spalten) und rechnen in einem NumPy-Aufruf;
+Breite und Datum werden dabei gegeneinander gebroadcastet (z. B. ein Standort, viele Tage).
+
+Grundlage sind die Näherungsformeln der NOAA für die Deklination der Sonne (Fehler unter
+0,1°). Sonnenauf- und -untergang gelten bei einer Sonnenhöhe von -0,833° (Refraktion und
+Radius der Sonnenscheibe), wie bei Wetterdiensten üblich. Polartag und Polarnacht ergeben
+24 bzw. 0 Stunden.
+"""
+
+import numpy as np  # vektorisierte Berechnung
+
+HORIZONT_GRAD = -0.833  # Sonnenhöhe bei Auf- und Untergang
+
+# Relative Sonnenscheindauer (Anteil der Tageslänge) ohne Bewölkungsangabe:
+# Beta-Verteilungen (a, b) für trockene und nasse Tage, Mittelwert 0,5 bzw. 0,25
+ANTEIL_TROCKEN = (2.0, 2.0)
+ANTEIL_NASS = (1.0, 3.0)
+NASS_AB_MM = 0.2  # Tage ab diesem Niederschlag gelten als nass
+
+
+def _tag_im_jahr(datum):
+    tage = np.asarray(datum, dtype="datetime64[D]")
+    return (tage - tage.astype("datetime64[Y]")).astype(int) + 1
+
+
+def deklination(datum):
+    """
+    Deklination der Sonne in Bogenmaß (NOAA-Näherung über den Jahreswinkel).
+
+    Parameter:
+        datum: Datum/Zeitpunkt oder Array davon (datetime, np.datetime64, pandas).
+    """
+    gamma = 2 * np.pi / 365 * (_tag_im_jahr(datum) - 1)
+    return (
+        0.006918
+        - 0.399912 * np.cos(gamma)
+        + 0.070257 * np.sin(gamma)
+        - 0.006758 * np.cos(2 * gamma)
+        + 0.000907 * np.sin(2 * gamma)
+        - 0.002697 * np.cos(3 * gamma)
+        + 0.00148 * np.sin(3 * gamma)
+    )
+
+
+def tageslaenge(breite, datum):
+    """
+    Astronomische Tageslänge in Stunden (Sonnenaufgang bis -untergang).
+
+    Parameter:
+        breite (float | array): geographische Breite in Grad (Süden negativ).
+        datum: Datum/Zeitpunkt oder Array davon.
+
+    Rückgabe:
+        np.ndarray | float: Stunden (0–24), Form wie `breite` und `datum` gebroadcastet.
+    """
+    phi = np.radians(np.asarray(breite, dtype=float))
+    delta = deklination(datum)
+    cos_omega = (np.sin(np.radians(HORIZONT_GRAD)) - np.sin(phi) * np.sin(delta)) / (
+        np.cos(phi) * np.cos(delta)
+    )
+    # |cos| > 1: Sonne geht nicht auf (Polarnacht) bzw. nicht unter (Polartag)
+    stunden = 2 * np.degrees(np.arccos(np.clip(cos_omega, -1.0, 1.0))) / 15
+    return stunden if stunden.ndim else float(stunden)
+
+
+def sonnenstunden_schaetzen(breite, datum, bewoelkung=None, niederschlag=None, rng=None):
+    """
+    Schätzt die Sonnenstunden aus der Tageslänge.
+
+    Parameter:
+        breite (float | array): geographische Breite in Grad.
+        datum: Datum/Zeitpunkt oder Array davon.
+        bewoelkung (float | array | None): Bewölkung in % (z. B. OpenWeatherMap `clouds.all`).
+            Ist sie bekannt, gilt Sonnenstunden = (1 - Bewölkung) × Tageslänge.
+        niederschlag (float | array | None): Niederschlag in mm; nur ohne Bewölkung genutzt,
+            nasse Tage bekommen im Mittel weniger Sonne.
+        rng (np.random.Generator | None): Zufallsgenerator für die Schätzung ohne Bewölkung.
+
+    Rückgabe:
+        np.ndarray | float: Sonnenstunden, auf 0,1 h gerundet, nie länger als der Tag.
+
+    Hinweise:
+        - Ohne Bewölkung wird der Sonnenschein-Anteil aus einer Beta-Verteilung gezogen
+          (ANTEIL_TROCKEN / ANTEIL_NASS); das ergibt plausible Werte für Simulationen und
+          historische Daten ohne Sonnenscheindauer, passend zu Breite und Jahreszeit.
+    """
+    laenge = np.asarray(tageslaenge(breite, datum))
+    if bewoelkung is not None:
+        anteil = 1 - np.clip(np.asarray(bewoelkung, dtype=float), 0, 100) / 100
+    else:
+        rng = rng or np.random.default_rng()
+        nass = (
+            np.asarray(niederschlag, dtype=float) >= NASS_AB_MM
+            if niederschlag is not None
+            else np.zeros(laenge.shape, dtype=bool)
+        )
+        form = np.broadcast_shapes(laenge.shape, nass.shape)
+        anteil = rng.beta(
+            np.where(nass, ANTEIL_NASS[0], ANTEIL_TROCKEN[0]),
+            np.where(nass, ANTEIL_NASS[1], ANTEIL_TROCKEN[1]),
+            size=form,
+        )
+    sonne = np.round(anteil * laenge, 1)
+    return sonne if sonne.ndim else float(sonne)
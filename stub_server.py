@@ -0,0 +1,256 @@
+"""
+Lokaler Stub-Server für Tests ohne echte Dienste.
+
+Bildet die verwendeten OpenWeatherMap-Endpunkte nach:
+    GET /data/2.5/weather?q=<Ort> | ?id=<ID>
+    GET /data/2.5/group?id=<ID>,<ID>,...   (max. 20 IDs; unbekannte IDs fehlen wie bei OWM
+                                            in der Antwort)
+    GET /__statistik                       Anzahl der Aufrufe pro Endpunkt (JSON)
+
+und die GitHub-Contents-API (Dateien nur im Speicher):
+    GET /repos/<owner>/<repo>/contents/<pfad>   Inhalt (Base64) + Git-Blob-SHA, 404 wenn unbekannt;
+                                                über `max_inhalt` (1 MB) wie GitHub ohne Inhalt
+                                                (encoding "none"), mit dem Accept-Header
+                                                application/vnd.github.raw+json als Rohdaten
+    PUT /repos/<owner>/<repo>/contents/<pfad>   201 (neu) / 200 (geändert); 409, wenn die
+                                                mitgeschickte SHA nicht mehr aktuell ist,
+                                                422, wenn sie bei einer vorhandenen Datei fehlt
+
+Die Werte sind deterministisch pro Ort. Orte, die mit "unbekannt" beginnen, liefern 404.
+
+Aufruf:
+    python stub_server.py --port 8765 [--github-datei wetterdaten.json] [--verzoegerung-ms 50]
+
+In secrets.toml dann:
+    [Legacy91988]
+    owm_base_url = "http://127.0.0.1:8765"
+    github_api_url = "http://127.0.0.1:8765"
+"""
+
+import argparse  # Kommandozeilen-Argumente
+import base64  # Dateiinhalte wie bei GitHub kodieren
+import hashlib  # Git-Blob-SHA
+import json  # Antworten als JSON
+import os  # Dateinamen für --github-datei
+import threading  # Zähler-Sperre
+import time  # Zeitstempel für Sonnenauf-/untergang
+import zlib  # deterministische IDs aus Ortsnamen
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+OWM_GRUPPE_MAX = 20
+
+
+def git_blob_sha(inhalt):
+    """SHA, die GitHub für einen Dateiinhalt meldet."""
+    return hashlib.sha1(b"blob %d\0" % len(inhalt) + inhalt).hexdigest()
+
+
+class StubZustand:
+    """Gemeinsamer Zustand des Stub-Servers (bekannte Städte, GitHub-Dateien und Aufrufzähler)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.staedte = {}  # ID -> Name
+        self.aufrufe = {}  # Endpunkt -> Anzahl
+        self.dateien = {}  # Pfad im Repository -> Inhalt (bytes)
+        self.verzoegerung = 0.0  # künstliche Antwortzeit in Sekunden (Netzwerk nachbilden)
+        self.max_inhalt = 1024 * 1024  # größere Dateien liefert die Contents-API ohne Inhalt
+
+    def zuruecksetzen(self):
+        """Löscht Dateien und Zähler (z. B. zwischen zwei Lasttest-Läufen)."""
+        with self.lock:
+            self.dateien.clear()
+            self.aufrufe.clear()
+
+    def datei_setzen(self, pfad, inhalt):
+        with self.lock:
+            self.dateien[pfad] = inhalt
+
+    def datei(self, pfad):
+        with self.lock:
+            return self.dateien.get(pfad)
+
+    def datei_schreiben(self, pfad, inhalt, sha):
+        """
+        Schreibt eine Datei wie die Contents-API (Optimistic Concurrency über die SHA).
+
+        Rückgabe:
+            int: HTTP-Status (201 neu, 200 geändert, 409 veraltete SHA, 422 SHA fehlt).
+        """
+        with self.lock:
+            alt = self.dateien.get(pfad)
+            if alt is not None and not sha:
+                return 422
+            if alt is not None and sha != git_blob_sha(alt):
+                return 409
+            self.dateien[pfad] = inhalt
+            return 201 if alt is None else 200
+
+    def zaehlen(self, endpunkt):
+        with self.lock:
+            self.aufrufe[endpunkt] = self.aufrufe.get(endpunkt, 0) + 1
+
+    def stadt_id(self, name):
+        sid = zlib.crc32(name.strip().casefold().encode()) % 9_000_000 + 1_000_000
+        with self.lock:
+            self.staedte[sid] = name.strip()
+        return sid
+
+    def wetter(self, sid):
+        """Deterministische `/weather`-Antwort für eine Stadt-ID."""
+        with self.lock:
+            name = self.staedte.get(sid, f"Stadt {sid}")
+        heute = int(time.time()) // 86400 * 86400
+        return {
+            "coord": {"lat": 45 + sid % 1000 / 100, "lon": 5 + sid % 700 / 100},
+            "weather": [{"main": "Clouds", "description": "Bewölkt"}],
+            "main": {
+                "temp": round(5 + sid % 200 / 10, 1),
+                "temp_min": round(2 + sid % 200 / 10, 1),
+                "temp_max": round(8 + sid % 200 / 10, 1),
+            },
+            "rain": {"1h": round(sid % 30 / 10, 1)},
+            "clouds": {"all": sid % 101},
+            "sys": {"sunrise": heute + 6 * 3600, "sunset": heute + 19 * 3600},
+            "id": sid,
+            "name": name,
+            "cod": 200,
+        }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    zustand = StubZustand()
+
+    def log_message(self, format, *args):
+        pass  # keine Ausgabe pro Anfrage
+
+    def _github_pfad(self, url):
+        # /repos/<owner>/<repo>/contents/<pfad> -> <pfad> (sonst None)
+        teile = url.path.split("/", 5)
+        if len(teile) == 6 and teile[1] == "repos" and teile[4] == "contents":
+            return teile[5]
+        return None
+
+    def _antwort(self, status, daten):
+        inhalt = json.dumps(daten).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(inhalt)))
+        self.end_headers()
+        self.wfile.write(inhalt)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        z = self.zustand
+
+        if url.path == "/__statistik":
+            with z.lock:
+                return self._antwort(200, dict(z.aufrufe))
+
+        if z.verzoegerung:
+            time.sleep(z.verzoegerung)
+
+        pfad = self._github_pfad(url)
+        if pfad is not None:
+            z.zaehlen("github_get")
+            inhalt = z.datei(pfad)
+            if inhalt is None:
+                return self._antwort(404, {"message": "Not Found"})
+            if self.headers.get("Accept") == "application/vnd.github.raw+json":
+                self.send_response(200)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(len(inhalt)))
+                self.end_headers()
+                return self.wfile.write(inhalt)
+            gross = len(inhalt) > z.max_inhalt
+            return self._antwort(
+                200,
+                {
+                    "path": pfad,
+                    "sha": git_blob_sha(inhalt),
+                    "size": len(inhalt),
+                    "encoding": "none" if gross else "base64",
+                    # mit Zeilenumbrüchen wie GitHub
+                    "content": "" if gross else base64.encodebytes(inhalt).decode(),
+                },
+            )
+
+        if url.path == "/data/2.5/weather":
+            z.zaehlen("weather")
+            if "id" in params:
+                return self._antwort(200, z.wetter(int(params["id"])))
+            ort = params.get("q", "")
+            if not ort or ort.casefold().startswith("unbekannt"):
+                return self._antwort(404, {"cod": "404", "message": "city not found"})
+            return self._antwort(200, z.wetter(z.stadt_id(ort)))
+
+        if url.path == "/data/2.5/group":
+            z.zaehlen("group")
+            ids = [int(x) for x in params.get("id", "").split(",") if x]
+            if not ids or len(ids) > OWM_GRUPPE_MAX:
+                return self._antwort(400, {"cod": "400", "message": "bad id list"})
+            with z.lock:
+                bekannt = [sid for sid in ids if sid in z.staedte]
+            liste = [z.wetter(sid) for sid in bekannt]
+            return self._antwort(200, {"cnt": len(liste), "list": liste})
+
+        self._antwort(404, {"message": "Not Found"})
+
+    def do_PUT(self):
+        url = urlparse(self.path)
+        z = self.zustand
+        pfad = self._github_pfad(url)
+        if pfad is None:
+            return self._antwort(404, {"message": "Not Found"})
+        if z.verzoegerung:
+            time.sleep(z.verzoegerung)
+
+        z.zaehlen("github_put")
+        laenge = int(self.headers.get("Content-Length", 0))
+        try:
+            daten = json.loads(self.rfile.read(laenge))
+            inhalt = base64.b64decode(daten["content"])
+        except (ValueError, KeyError):
+            return self._antwort(400, {"message": "Problems parsing JSON"})
+
+        status = z.datei_schreiben(pfad, inhalt, daten.get("sha"))
+        if status == 409:
+            z.zaehlen("github_409")
+            return self._antwort(409, {"message": f"{pfad} does not match"})
+        if status == 422:
+            return self._antwort(422, {"message": "Invalid request: sha wasn't supplied."})
+        self._antwort(status, {"content": {"path": pfad, "sha": git_blob_sha(inhalt)}})
+
+
+def starten(port=0):
+    """
+    Startet den Stub-Server in einem Hintergrund-Thread.
+
+    Rückgabe:
+        ThreadingHTTPServer: laufender Server (`server.server_address` enthält den Port).
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lokaler Stub für OpenWeatherMap und GitHub")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--github-datei",
+        action="append",
+        default=[],
+        metavar="DATEI",
+        help="lokale Datei als Startinhalt der GitHub-Ablage (Pfad = Dateiname)",
+    )
+    parser.add_argument("--verzoegerung-ms", type=float, default=0)
+    args = parser.parse_args()
+    for datei in args.github_datei:
+        with open(datei, "rb") as f:
+            StubHandler.zustand.datei_setzen(os.path.basename(datei), f.read())
+    StubHandler.zustand.verzoegerung = args.verzoegerung_ms / 1000
+    print(f"Stub-Server läuft auf http://127.0.0.1:{args.port}")
+    ThreadingHTTPServer(("127.0.0.1", args.port), StubHandler).serve_forever()
@@ -0,0 +1,50 @@
+"""
+Gemeinsame Test-Umgebung: Stub-Server für GitHub/OpenWeatherMap und ein temporäres
+Arbeitsverzeichnis mit `.streamlit/secrets.toml`.
+
+Hinweise:
+    - Streamlit liest secrets.toml relativ zum Arbeitsverzeichnis; deshalb wird vor dem
+      ersten Import von `main` dorthin gewechselt (wie in `lasttest.py`).
+    - Die App schreibt ihre lokalen Schnappschüsse ins Arbeitsverzeichnis, nicht ins Repository.
+"""
+
+import os  # Arbeitsverzeichnis
+import sys  # Importpfad des Repositorys
+import tempfile  # temporäres Arbeitsverzeichnis
+
+import pytest  # Fixtures
+
+VERZEICHNIS = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, VERZEICHNIS)
+
+import stub_server  # lokale Stand-ins für GitHub und OpenWeatherMap  # noqa: E402
+
+SERVER = stub_server.starten()
+ARBEITSVERZEICHNIS = tempfile.mkdtemp(prefix="wetterweiser-tests-")
+os.makedirs(os.path.join(ARBEITSVERZEICHNIS, ".streamlit"))
+with open(os.path.join(ARBEITSVERZEICHNIS, ".streamlit", "secrets.toml"), "w") as f:
+    f.write(
+        f"""[Legacy91988]
+Wetterweiser = "tests/wetterweiser"
+github_token = ""
+OWM_API_KEY = "tests"
+github_api_url = "http://127.0.0.1:{SERVER.server_address[1]}"
+owm_base_url = "http://127.0.0.1:{SERVER.server_address[1]}"
+
+[dev]
+debug_password = "tests"
+"""
+    )
+os.chdir(ARBEITSVERZEICHNIS)
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    """Leerer Stub-Zustand pro Test; Backoff bei SHA-Konflikten ohne Wartezeit."""
+    import main
+
+    monkeypatch.setattr(main, "EXPORT_BACKOFF_SEKUNDEN", 0)
+    zustand = stub_server.StubHandler.zustand
+    zustand.zuruecksetzen()
+    yield zustand
+    zustand.zuruecksetzen()
@@ -0,0 +1,32 @@
+"""Stale-while-revalidate-Stand (`DatenSpeicher`)."""
+
+import main
+
+
+def test_abruf_ueberholt_neueren_stand_nicht(stub, monkeypatch):
+    alt = main.daten_serialisieren([{"ID": "alt"}])
+    neu = main.daten_serialisieren([{"ID": "alt"}, {"ID": "neu"}])
+    stub.datei_setzen("speicher.json", alt)
+    speicher = main.DatenSpeicher("speicher.json")
+    laden = main.github_datei_laden
+
+    def langsam_laden(pfad):
+        antwort = laden(pfad)  # alter Stand ist schon unterwegs …
+        speicher.uebernehmen(neu)  # … als ein Upload den neuen Stand übernimmt
+        return antwort
+
+    monkeypatch.setattr(main, "github_datei_laden", langsam_laden)
+    speicher.aktualisieren()
+
+    version, eintraege, _, _ = speicher.schnappschuss()
+    assert version == main.git_blob_sha(neu)
+    assert eintraege == [{"ID": "alt"}, {"ID": "neu"}]
+
+
+def test_abruf_uebernimmt_neuen_remote_stand(stub):
+    stub.datei_setzen("speicher.json", main.daten_serialisieren([{"ID": "a"}]))
+    speicher = main.DatenSpeicher("speicher.json")
+    speicher.aktualisieren()
+    assert speicher.schnappschuss()[1] == [{"ID": "a"}]
+    with open("speicher.json", "rb") as f:
+        assert f.read() == stub.datei("speicher.json")  # lokaler Schnappschuss
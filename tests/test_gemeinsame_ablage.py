@@ -0,0 +1,60 @@
+"""Gemeinsame Ablage: Sperren mit Marke und Statistik beim Warten."""
+
+import threading  # zweiter "Prozess", der rechnet
+import time  # Ablauf der Sperre abwarten
+
+import pytest  # Backends als Parameter
+
+import gemeinsame_ablage
+
+
+def redis_ablage(monkeypatch):
+    redis = pytest.importorskip("redis")
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")  # Lua-Skripte in fakeredis
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(redis.Redis, "from_url", lambda url, **_: fakeredis.FakeRedis(server=server))
+    return gemeinsame_ablage.ablage_oeffnen("redis://localhost:6379/0")
+
+
+@pytest.fixture(params=["speicher", "sqlite", "redis"])
+def ablage(request, tmp_path, monkeypatch):
+    if request.param == "speicher":
+        return gemeinsame_ablage.ablage_oeffnen("speicher://")
+    if request.param == "sqlite":
+        return gemeinsame_ablage.ablage_oeffnen(f"sqlite:///{tmp_path / 'ablage.db'}")
+    return redis_ablage(monkeypatch)
+
+
+def test_sperre_nur_einmal_vergeben(ablage):
+    marke = ablage.sperren("a")
+    assert marke is not None
+    assert ablage.sperren("a") is None
+    ablage.freigeben("a", marke)
+    assert ablage.sperren("a") is not None
+
+
+def test_freigeben_loescht_keine_fremde_sperre(ablage):
+    alt = ablage.sperren("a", sekunden=1)
+    time.sleep(1.1)  # abgelaufen -> ein anderer Prozess übernimmt
+    neu = ablage.sperren("a")
+    assert neu is not None
+
+    ablage.freigeben("a", alt)  # verspätete Freigabe des ersten Inhabers
+    assert ablage.sperren("a") is None
+    ablage.freigeben("a", neu)
+    assert ablage.sperren("a") is not None
+
+
+def test_warten_zaehlt_keine_fehlgriffe(ablage):
+    marke = ablage.sperren("wert")
+
+    def anderer_prozess():
+        time.sleep(0.3)
+        ablage.objekt_setzen("wert", 42)
+        ablage.freigeben("wert", marke)
+
+    threading.Thread(target=anderer_prozess).start()
+    assert ablage.holen_oder_berechnen("wert", lambda: pytest.fail("nicht selbst rechnen")) == 42
+    stat = ablage.uebersicht()
+    assert (stat["fehlschlaege"], stat["gewartet"], stat["berechnet"]) == (1, 1, 0)
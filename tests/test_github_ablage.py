@@ -0,0 +1,193 @@
+"""Zusammenführen mit Tombstones, konfliktfreies Schreiben und partitionierte Ablage."""
+
+import argparse  # Argumente wie von der Kommandozeile
+import json  # Dateien des Stub-Servers lesen
+
+import pytest  # Fehlerfälle
+
+import cli
+import main
+
+
+def eintrag(id, datum, standort="Gommern", temperatur=10.0):
+    return main.WetterMessung(
+        datum, temperatur=temperatur, niederschlag=1.0, sonnenstunden=5.0,
+        id=id, standort=standort,
+    ).als_dict()
+
+
+def remote(stub, pfad):
+    inhalt = stub.datei(pfad)
+    return None if inhalt is None else json.loads(inhalt)
+
+
+def geladen(eintraege):
+    wd = main.WetterAnalyse()
+    wd.eintraege_uebernehmen(eintraege)
+    return wd
+
+
+def test_zusammenfuehren_tombstones_und_fremde_aenderungen():
+    wd = geladen([eintrag("a", "2024-01-01"), eintrag("b", "2024-01-02")])
+    ersatz = main.WetterMessung("2024-01-02", temperatur=20.0, id="b", standort="Gommern")
+    neu = main.WetterMessung("2024-01-03", temperatur=3.0, id="c", standort="Gommern")
+    wd.aenderungen_anwenden(einfuegen=[neu], ersetzen=[ersatz], loeschen=["a"])
+
+    # "x" wurde inzwischen von einer anderen Instanz ergänzt
+    stand = [eintrag("a", "2024-01-01"), eintrag("b", "2024-01-02"), eintrag("x", "2024-01-05")]
+    ergebnis = {e["ID"]: e for e in wd.zusammenfuehren(stand)}
+
+    assert set(ergebnis) == {"b", "c", "x"}
+    assert ergebnis["b"]["Temperatur"] == 20.0
+
+
+def test_zusammenfuehren_nur_fuer_standort():
+    wd = geladen([])
+    wd.aenderungen_anwenden(
+        einfuegen=[
+            main.WetterMessung("2024-01-01", id="g", standort="Gommern"),
+            main.WetterMessung("2024-01-01", id="m", standort="Magdeburg"),
+        ]
+    )
+    assert [e["ID"] for e in wd.zusammenfuehren([], standort="Magdeburg")] == ["m"]
+
+
+def test_github_speichern_behaelt_aenderungen_beider_instanzen(stub):
+    stub.datei_setzen(
+        main.GITHUB_JSON_PATH,
+        main.daten_serialisieren([eintrag("a", "2024-01-01"), eintrag("b", "2024-01-02")]),
+    )
+    erste = geladen(remote(stub, main.GITHUB_JSON_PATH))
+    zweite = geladen(remote(stub, main.GITHUB_JSON_PATH))
+
+    erste.aenderungen_anwenden(loeschen=["a"])
+    zweite.aenderungen_anwenden(einfuegen=[main.WetterMessung("2024-01-03", id="c", standort="Gommern")])
+    assert erste.github_speichern().status_code == 200
+    assert zweite.github_speichern().status_code == 200
+
+    assert sorted(e["ID"] for e in remote(stub, main.GITHUB_JSON_PATH)) == ["b", "c"]
+    assert sorted(m.id for m in zweite.messungen) == ["b", "c"]  # fremde Löschung übernommen
+    assert not zweite.hat_aenderungen()
+
+
+def test_github_speichern_gleicher_tag_beider_instanzen(stub):
+    stub.datei_setzen(main.GITHUB_JSON_PATH, main.daten_serialisieren([eintrag("a", "2024-01-01")]))
+    erste = geladen(remote(stub, main.GITHUB_JSON_PATH))
+    zweite = geladen(remote(stub, main.GITHUB_JSON_PATH))
+
+    erste.hinzufuegen(main.WetterMessung("2024-01-02", temperatur=1.0, standort="Gommern"))
+    zweite.hinzufuegen(main.WetterMessung("2024-01-02 18:00", temperatur=2.0, standort="Gommern"))
+    assert erste.github_speichern().status_code == 200
+    assert zweite.github_speichern().status_code == 200
+
+    # die zuletzt gespeicherte Änderung gewinnt, pro Tag & Ort bleibt eine Messung
+    stand = remote(stub, main.GITHUB_JSON_PATH)
+    assert sorted((e["Datum"][:10], e["Temperatur"]) for e in stand) == [
+        ("2024-01-01", 10.0), ("2024-01-02", 2.0),
+    ]
+    assert sorted(m.id for m in zweite.messungen) == sorted(e["ID"] for e in stand)
+
+
+def test_konfliktfrei_schreiben_wiederholt_bei_409(stub):
+    stub.datei_setzen("liste.json", b"[1]")
+    aufrufe = []
+
+    def zusammenfuehren(daten):
+        aufrufe.append(daten)
+        if len(aufrufe) == 1:
+            stub.datei_setzen("liste.json", b"[1,2]")  # Schreiben einer anderen Instanz
+        return daten + [3]
+
+    resp, daten, _ = main.github_konfliktfrei_schreiben("liste.json", zusammenfuehren)
+
+    assert resp.status_code == 200
+    assert aufrufe == [[1], [1, 2]]
+    assert remote(stub, "liste.json") == daten == [1, 2, 3]
+    assert stub.aufrufe["github_409"] == 1
+
+
+def test_konfliktfrei_schreiben_ohne_aenderung_ohne_put(stub):
+    stub.datei_setzen("liste.json", main.daten_serialisieren([1]))
+    resp, _, _ = main.github_konfliktfrei_schreiben("liste.json", lambda daten: daten)
+    assert resp.status_code == 304
+    assert "github_put" not in stub.aufrufe
+
+
+def test_konfliktfrei_schreiben_leerer_inhalt_ist_kein_404(stub):
+    stub.datei_setzen("liste.json", b"")
+    with pytest.raises(ValueError):
+        main.github_konfliktfrei_schreiben("liste.json", lambda daten: [1])
+    assert stub.datei("liste.json") == b""
+
+
+def test_partitionen_anlegen_schreibt_manifest(stub):
+    wd = geladen(
+        [
+            eintrag("g1", "2024-01-01"),
+            eintrag("g2", "2024-01-04"),
+            eintrag("m1", "2024-02-01", standort="Magdeburg"),
+        ]
+    )
+    assert wd.partitionen_anlegen().status_code == 201
+
+    manifest = remote(stub, main.MANIFEST_PATH)["partitionen"]
+    assert sorted(manifest) == ["Gommern", "Magdeburg"]
+    gommern = manifest["Gommern"]
+    assert gommern["pfad"] == main.partition_pfad("Gommern")
+    assert (gommern["anzahl"], gommern["von"], gommern["bis"]) == (2, "2024-01-01", "2024-01-04")
+    assert gommern["sha"] == main.git_blob_sha(stub.datei(gommern["pfad"]))
+    assert {e["Standort"] for e in remote(stub, manifest["Magdeburg"]["pfad"])} == {"Magdeburg"}
+    assert stub.datei(main.GITHUB_JSON_PATH) is None  # Altbestand wird nicht angefasst
+
+
+def test_partitionen_speichern_nur_betroffene_standorte(stub):
+    wd = geladen([eintrag("g1", "2024-01-01"), eintrag("m1", "2024-02-01", standort="Magdeburg")])
+    wd.partitionen_anlegen()
+    magdeburg = stub.datei(main.partition_pfad("Magdeburg"))
+    stub.aufrufe.clear()
+
+    wd.aenderungen_anwenden(loeschen=["g1"])
+    assert wd.github_speichern().status_code == 200
+
+    assert stub.aufrufe["github_put"] == 2  # Partition Gommern + Manifest
+    assert stub.datei(main.partition_pfad("Magdeburg")) == magdeburg
+    # leere Partition fällt aus dem Manifest
+    assert list(remote(stub, main.MANIFEST_PATH)["partitionen"]) == ["Magdeburg"]
+
+
+def test_backfill_speichert_jeden_block(stub, tmp_path, monkeypatch):
+    stub.datei_setzen(main.GITHUB_JSON_PATH, main.daten_serialisieren([eintrag("a", "2024-01-01")]))
+    datei = tmp_path / "archiv.csv"
+    datei.write_text(
+        "Datum,Standort,Temperatur,Niederschlag,Sonnenstunden\n"
+        "2024-01-01,Gommern,1.0,0,1\n"  # schon im Bestand
+        "2024-01-02,Gommern,2.0,0,1\n"
+        "2024-01-03,Gommern,3.0,0,1\n"
+        "2024-01-03,Gommern,9.0,0,1\n"  # doppelt in der Datei
+        "2024-01-04,Gommern,4.0,0,1\n"
+    )
+    im_speicher = []
+    freigeben = main.WetterDaten.gespeicherte_freigeben
+
+    def beobachten(self):
+        anzahl = freigeben(self)
+        im_speicher.append(len(self.messungen))
+        return anzahl
+
+    monkeypatch.setattr(main.WetterDaten, "gespeicherte_freigeben", beobachten)
+
+    def nicht_uebernehmen(self, *args, **kwargs):
+        raise AssertionError("Remote-Stand darf beim Backfill nicht übernommen werden")
+
+    monkeypatch.setattr(main.WetterDaten, "stand_uebernehmen", nicht_uebernehmen)
+    cli.backfill_ausfuehren(
+        argparse.Namespace(
+            datei=str(datei), format="wetterweiser", spalte=[], einheit=[],
+            standort=None, chunk_zeilen=2,
+        )
+    )
+
+    assert stub.aufrufe["github_put"] == 3  # ein Export pro Block
+    assert im_speicher == [0, 0, 0, 0]
+    tage = {e["Datum"][:10]: e["Temperatur"] for e in remote(stub, main.GITHUB_JSON_PATH)}
+    assert tage == {"2024-01-01": 10.0, "2024-01-02": 2.0, "2024-01-03": 3.0, "2024-01-04": 4.0}
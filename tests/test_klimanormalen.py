@@ -0,0 +1,83 @@
+"""Klimanormalen pro Standort und Datenstand (`Klimanormalen`)."""
+
+import pandas as pd  # Kalendertag
+
+import main
+
+
+def bestand(temperatur):
+    wd = main.WetterAnalyse()
+    wd.eintraege_uebernehmen(
+        [
+            main.WetterMessung(
+                f"{jahr}-07-01", temperatur=temperatur, niederschlag=0.0, sonnenstunden=8.0,
+                id=f"g{jahr}", standort="Gommern",
+            ).als_dict()
+            for jahr in (2022, 2023)
+        ]
+    )
+    return wd
+
+
+def test_sessions_mit_eigenem_stand_verdraengen_sich_nicht():
+    normalen = main.Klimanormalen()
+    gespeichert, bearbeitet = bestand(20.0), bestand(20.0)
+    bearbeitet.ersetze_eintrag(
+        pd.Timestamp("2023-07-01"), "Gommern",
+        main.WetterMessung("2023-07-01", temperatur=30.0, id="neu", standort="Gommern"),
+    )
+
+    for _ in range(3):  # abwechselnde Reruns zweier Sessions
+        tage_gespeichert = normalen.fuer_standort(gespeichert, "Gommern")[0]
+        tage_bearbeitet = normalen.fuer_standort(bearbeitet, "Gommern")[0]
+
+    assert normalen.berechnungen == 2
+    tag = main.klima_tag(pd.DatetimeIndex(["2023-07-01"]))[0]
+    assert tage_gespeichert.loc[tag, "Temperatur"] == 20.0
+    assert tage_bearbeitet.loc[tag, "Temperatur"] == 25.0
+    assert normalen.fuer_standort(gespeichert, "Magdeburg") is None
+
+
+def test_begrenzte_anzahl_staende():
+    normalen = main.Klimanormalen(max_eintraege=1)
+    erster, zweiter = bestand(10.0), bestand(20.0)
+    normalen.fuer_standort(erster, "Gommern")
+    normalen.fuer_standort(zweiter, "Gommern")
+    normalen.fuer_standort(erster, "Gommern")
+    assert normalen.berechnungen == 3
+
+
+def test_pruefsumme_erkennt_vertauschte_werte():
+    erster, zweiter = main.WetterAnalyse(), main.WetterAnalyse()
+    a = main.WetterMessung("2023-07-01", temperatur=10.0, id="a", standort="Gommern")
+    b = main.WetterMessung("2023-07-02", temperatur=20.0, id="b", standort="Gommern")
+    erster.aenderungen_anwenden(einfuegen=[a, b])
+    zweiter.aenderungen_anwenden(einfuegen=[b, a])
+    assert erster.standort_pruefsummen() == zweiter.standort_pruefsummen()  # Reihenfolge egal
+
+    zweiter.aenderungen_anwenden(
+        ersetzen=[
+            main.WetterMessung("2023-07-01", temperatur=20.0, id="a", standort="Gommern"),
+            main.WetterMessung("2023-07-02", temperatur=10.0, id="b", standort="Gommern"),
+        ]
+    )
+    assert erster.standort_pruefsummen() != zweiter.standort_pruefsummen()
+
+
+def test_summen_fortgeschrieben_wie_neu_aufgebaut():
+    fortgeschrieben = bestand(20.0)
+    fortgeschrieben.aenderungen_anwenden(
+        einfuegen=[main.WetterMessung("2024-02-29", temperatur=3.0, temp_min=None, standort="Gommern")],
+        ersetzen=[main.WetterMessung("2023-07-01", temperatur=30.0, id="neu", standort="Gommern")],
+        loeschen=["g2022"],
+    )
+    neu = main.WetterAnalyse()
+    neu.aenderungen_anwenden(einfuegen=fortgeschrieben.messungen)
+
+    assert fortgeschrieben.klima_summen("Gommern") == neu.klima_summen("Gommern")
+    tage, monate, monatswerte = main.Klimanormalen().fuer_standort(fortgeschrieben, "Gommern")
+    assert tage.loc[main.klima_tag(pd.DatetimeIndex(["2024-07-01"]))[0], "Temperatur"] == 30.0
+    assert tage.loc[59, "Temperatur_unten"] == 3.0  # 29. Februar zählt als 28. Februar
+    assert list(monatswerte.index) == [(2023, 7), (2024, 2)]
+    assert monatswerte.loc[(2024, 2), "Messtage"] == 1
+    assert pd.isna(monatswerte.loc[(2024, 2), "Temp_min"])
@@ -0,0 +1,22 @@
+"""Vektorisierte Prognose-Rückblicke (`prognose_rueckblick`)."""
+
+import numpy as np  # Vergleich mit np.polyfit
+
+import main
+
+
+def test_trend_mit_luecke_wie_polyfit():
+    y = np.array([1.0, 3.0, np.nan, 4.0, 8.0, np.nan, 9.0, 12.0, 11.0, np.nan, 15.0])
+    position = np.arange(len(y))
+    trend = main.prognose_rueckblick(y, position, tage=2)["Trendbasierte Prognose"]
+
+    k = main.PROGNOSE_FENSTER
+    for i in range(len(y)):
+        fenster = y[max(0, i - k + 1) : i + 1]
+        x = np.arange(len(fenster))
+        vorhanden = ~np.isnan(fenster)
+        if vorhanden.sum() < 2:
+            continue
+        gerade = np.poly1d(np.polyfit(x[vorhanden], fenster[vorhanden], 1))
+        erwartet = gerade(len(fenster) + np.arange(1, 3))
+        np.testing.assert_allclose(trend[i], erwartet, atol=0.05 + 1e-9)  # auf 0.1 gerundet
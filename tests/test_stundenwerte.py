@@ -0,0 +1,98 @@
+"""Stundenwerte in Monatsdateien pro Standort und große Dateien über die Contents-API."""
+
+import json  # Dateien des Stub-Servers lesen
+
+import cli
+import main
+
+
+def remote(stub, pfad):
+    inhalt = stub.datei(pfad)
+    return None if inhalt is None else json.loads(inhalt)
+
+
+def test_grosse_datei_ueber_raw_medientyp(stub, monkeypatch):
+    monkeypatch.setattr(stub, "max_inhalt", 10)
+    inhalt = main.daten_serialisieren(list(range(100)))
+    stub.datei_setzen("gross.json", inhalt)
+
+    assert main.github_datei_laden("gross.json") == (inhalt, main.git_blob_sha(inhalt))
+
+    # eine große Datei wird zusammengeführt, nicht als "neu" überschrieben
+    resp, daten, _ = main.github_konfliktfrei_schreiben("gross.json", lambda remote: remote + [100])
+    assert resp.status_code == 200
+    assert remote(stub, "gross.json") == daten == list(range(101))
+
+
+def test_speichern_schreibt_nur_betroffene_monatsdateien(stub):
+    stunden = main.StundenWerte()
+    stunden.hinzufuegen("Gommern", "2025-01-31 23:10", 1.0)
+    stunden.hinzufuegen("Gommern", "2025-02-01 00:10", 2.0)
+    stunden.hinzufuegen("Magdeburg", "2025-02-01 00:10", 3.0)
+    assert stunden.github_speichern().status_code == 201
+
+    manifest = remote(stub, main.STUNDEN_MANIFEST_PFAD)["partitionen"]
+    assert {s: list(m) for s, m in manifest.items()} == {
+        "Gommern": ["2025-01", "2025-02"],
+        "Magdeburg": ["2025-02"],
+    }
+    januar = manifest["Gommern"]["2025-01"]
+    assert januar["pfad"] == main.stunden_partition_pfad("Gommern", "2025-01")
+    assert januar["anzahl"] == 1
+    assert januar["sha"] == main.git_blob_sha(stub.datei(januar["pfad"]))
+    assert stub.datei(main.STUNDEN_PFAD) is None
+
+    stub.aufrufe.clear()
+    neu = cli.stunden_laden()
+    neu.hinzufuegen("Magdeburg", "2025-02-01 01:10", 4.0)
+    assert neu.github_speichern().status_code == 200
+    assert stub.aufrufe["github_put"] == 2  # eine Monatsdatei + Manifest
+    assert remote(stub, main.stunden_partition_pfad("Magdeburg", "2025-02"))["Magdeburg"][
+        "Temperatur"
+    ] == [3.0, 4.0]
+
+
+def test_laedt_nur_benoetigte_monate(stub):
+    stunden = main.StundenWerte()
+    for monat in range(1, 7):
+        stunden.hinzufuegen("Gommern", f"2025-{monat:02d}-15 12:00", float(monat))
+    stunden.github_speichern()
+
+    geladen = cli.stunden_laden()
+    assert geladen.hat_beobachtung("Gommern", "2025-06-15 12:30")
+    assert not geladen.hat_beobachtung("Gommern", "2025-06-15 13:30")
+    assert geladen._geladen == {("Gommern", "2025-06")}
+
+    tage = geladen.tageswerte(von="2025-05-01")
+    assert tage["Temperatur"].tolist() == [5.0, 6.0]
+    assert geladen.anzahl() == 6
+
+
+def test_bisherige_datei_wird_migriert(stub):
+    alt = main.StundenWerte()
+    alt.hinzufuegen("Gommern", "2025-03-01 08:00", 5.0)
+    alt.hinzufuegen("Gommern", "2025-03-01 09:00", 6.0)
+    stub.datei_setzen(main.STUNDEN_PFAD, main.daten_serialisieren(alt.als_json()))
+
+    stunden = cli.stunden_laden()
+    assert stunden.hat_beobachtung("Gommern", "2025-03-01 08:30")
+    stunden.hinzufuegen("Gommern", "2025-03-01 09:00", 7.0)  # ersetzt die Stunde
+    stunden.hinzufuegen("Gommern", "2025-04-01 09:00", 8.0)
+    stunden.github_speichern()
+
+    migriert = cli.stunden_laden()
+    assert migriert.beobachtungen("Gommern")["Temperatur"].tolist() == [5.0, 7.0, 8.0]
+    assert stub.datei(main.STUNDEN_PFAD) is not None  # bleibt als Sicherung liegen
+
+
+def test_worker_lauf_schreibt_monatsdatei(stub, caplog):
+    worker = cli.IngestionWorker({"standorte": ["Gommern", "Magdeburg"]}, "tests")
+    with caplog.at_level("INFO", logger="wetterweiser.worker"):
+        assert worker.lauf() == 2
+    assert "OWM-Cache: {" in caplog.text
+    assert main.owm_statistik_laden()["fehlschlaege"] >= 1  # für das Dev-Dashboard gespeichert
+    assert worker.lauf() == 0  # diese Stunde schon beobachtet
+
+    tage = remote(stub, main.GITHUB_JSON_PATH)
+    assert sorted(e["Standort"] for e in tage) == ["Gommern", "Magdeburg"]
+    assert sorted(remote(stub, main.STUNDEN_MANIFEST_PFAD)["partitionen"]) == ["Gommern", "Magdeburg"]
@@ -0,0 +1,15 @@
+"""Hintergrund-Uploads (`UploadManager`)."""
+
+import main
+
+
+def test_upload_beendet_gesetzt_sobald_erledigt(stub):
+    wd = main.WetterAnalyse()
+    wd.aenderungen_anwenden(einfuegen=[main.WetterMessung("2024-01-01", id="a", standort="Gommern")])
+
+    handle = main.UploadManager().starten(wd.aenderungen_abgeben())
+    handle.future.result(timeout=30)
+
+    assert handle.status() == "erfolgreich"
+    assert handle.beendet is not None and handle.beendet >= handle.gestartet
+    assert stub.datei(main.GITHUB_JSON_PATH) is not None
@@ -0,0 +1,144 @@
+"""Verdichtung alter Tageswerte (Archiv, Monats- und Jahreswerte) und ihre Aufhebung."""
+
+import argparse  # Argumente wie von der Kommandozeile
+import datetime  # aktuelles Jahr
+import json  # Dateien des Stub-Servers lesen
+
+import pandas as pd  # erwartete Tage
+
+import cli
+import main
+
+
+def eintrag(id, datum, standort="Gommern", temperatur=10.0, niederschlag=1.0):
+    return main.WetterMessung(
+        datum, temperatur=temperatur, temp_min=temperatur - 5, temp_max=temperatur + 5,
+        niederschlag=niederschlag, sonnenstunden=5.0, id=id, standort=standort,
+    ).als_dict()
+
+
+def remote(stub, pfad):
+    inhalt = stub.datei(pfad)
+    return None if inhalt is None else json.loads(inhalt)
+
+
+def test_verdichten_monat_und_jahr():
+    wd = main.WetterAnalyse()
+    wd.eintraege_uebernehmen(
+        [
+            eintrag("a", "2010-01-01", temperatur=0.0, niederschlag=2.0),
+            eintrag("b", "2010-01-02", temperatur=10.0, niederschlag=3.0),
+            eintrag("c", "2010-02-01", temperatur=4.0, niederschlag=0.0),
+        ]
+    )
+    df = wd.als_dataframe()
+
+    monate = main.verdichten(df).set_index("Monat")
+    assert list(monate.index) == [1, 2]
+    assert monate.loc[1, "Tage"] == 2
+    assert monate.loc[1, "Niederschlag_summe"] == 5.0
+    assert monate.loc[1, "Temperatur_mittel"] == 5.0
+    assert monate.loc[1, "Temp_max_Datum"] == pd.Timestamp("2010-01-02")
+    assert monate.loc[1, "Temp_min_Datum"] == pd.Timestamp("2010-01-01")
+
+    jahr = main.verdichten(df, monatlich=False).iloc[0]
+    assert (jahr["Jahr"], jahr["Tage"], jahr["Niederschlag_summe"]) == (2010, 3, 5.0)
+
+
+def test_archiv_zusammenfuehren_ist_idempotent():
+    archiv = main.archiv_zusammenfuehren(None, [eintrag("b", "2010-01-02"), eintrag("a", "2010-01-01")])
+    assert [e["ID"] for e in archiv] == ["a", "b"]
+    # gleiche ID oder gleicher Tag & Ort kommen nicht doppelt hinein
+    wieder = main.archiv_zusammenfuehren(archiv, [eintrag("a", "2010-01-01"), eintrag("z", "2010-01-02")])
+    assert wieder == archiv
+
+
+def test_verdichtung_zusammenfuehren_ersetzt_jahre():
+    alt = {
+        "monate": [
+            {"Standort": "G", "Quelle": "manuell", "Jahr": 2005, "Monat": 1, "Tage": 1},
+            {"Standort": "G", "Quelle": "manuell", "Jahr": 2010, "Monat": 1, "Tage": 1},
+        ],
+        "jahre": [{"Standort": "G", "Quelle": "manuell", "Jahr": 2010, "Tage": 1}],
+        "archiv": {"2010": {"pfad": "archiv/2010.json", "anzahl": 1}},
+    }
+    neu = main.verdichtung_zusammenfuehren(
+        alt,
+        monate=[{"Standort": "G", "Quelle": "manuell", "Jahr": 2010, "Monat": 1, "Tage": 2}],
+        jahre=[{"Standort": "G", "Quelle": "manuell", "Jahr": 2010, "Tage": 2}],
+        archiv={"2010": {"pfad": "archiv/2010.json", "anzahl": 2}},
+        ersetzte_jahre=[2010],
+        monat_ab_jahr=2008,
+    )
+    assert neu["monate"] == [{"Standort": "G", "Quelle": "manuell", "Jahr": 2010, "Monat": 1, "Tage": 2}]
+    assert neu["jahre"][0]["Tage"] == 2
+    assert neu["archiv"]["2010"]["anzahl"] == 2
+
+    aufgehoben = main.verdichtung_zusammenfuehren(neu, archiv={"2010": None}, ersetzte_jahre=[2010])
+    assert aufgehoben == {"monate": [], "jahre": [], "archiv": {}}
+
+
+def bestand_anlegen(stub, eintraege):
+    stub.datei_setzen(main.GITHUB_JSON_PATH, main.daten_serialisieren(eintraege))
+
+
+def test_verdichten_ausfuehren_gegen_stub(stub):
+    jahr = datetime.date.today().year
+    bestand_anlegen(
+        stub,
+        [
+            eintrag("a", "2010-01-01"),
+            eintrag("b", "2010-03-01", standort="Magdeburg"),
+            eintrag("c", "2011-06-01"),
+            eintrag("d", f"{jahr}-01-01"),
+        ],
+    )
+    args = argparse.Namespace(roh_jahre=1, monat_jahre=1)
+    cli.verdichten_ausfuehren(args)
+
+    assert [e["ID"] for e in remote(stub, main.GITHUB_JSON_PATH)] == ["d"]
+    assert [e["ID"] for e in remote(stub, main.archiv_pfad(2010))] == ["a", "b"]
+    verdichtet = remote(stub, main.VERDICHTET_PFAD)
+    assert verdichtet["archiv"] == {
+        "2010": {"pfad": "archiv/2010.json", "anzahl": 2},
+        "2011": {"pfad": "archiv/2011.json", "anzahl": 1},
+    }
+    assert verdichtet["monate"] == []  # außerhalb der Monats-Stufe nur Jahreswerte
+    assert sorted((e["Standort"], e["Jahr"]) for e in verdichtet["jahre"]) == [
+        ("Gommern", 2010), ("Gommern", 2011), ("Magdeburg", 2010),
+    ]
+
+    # ein zweiter Lauf findet nichts mehr und ändert nichts
+    stub.aufrufe.clear()
+    cli.verdichten_ausfuehren(args)
+    assert "github_put" not in stub.aufrufe
+
+
+def test_verdichtung_aufheben_behaelt_belegte_tage_im_archiv(stub):
+    bestand_anlegen(stub, [eintrag("a", "2010-01-01"), eintrag("b", "2010-01-02")])
+    cli.verdichten_ausfuehren(argparse.Namespace(roh_jahre=1, monat_jahre=1))
+
+    # inzwischen wurde der 02.01.2010 im Bestand neu erfasst (andere Messung)
+    bestand = remote(stub, main.GITHUB_JSON_PATH)
+    bestand_anlegen(stub, bestand + [eintrag("neu", "2010-01-02", temperatur=20.0)])
+
+    cli.verdichtung_aufheben(argparse.Namespace(ab_jahr=2010))
+
+    assert sorted(e["ID"] for e in remote(stub, main.GITHUB_JSON_PATH)) == ["a", "neu"]
+    assert [e["ID"] for e in remote(stub, main.archiv_pfad(2010))] == ["b"]
+    verdichtet = remote(stub, main.VERDICHTET_PFAD)
+    assert verdichtet["archiv"] == {"2010": {"pfad": "archiv/2010.json", "anzahl": 1}}
+    assert verdichtet["jahre"] == []
+
+
+def test_verdichten_loescht_nur_archivierte_tageswerte(stub):
+    bestand_anlegen(stub, [eintrag("a", "2010-01-01")])
+    args = argparse.Namespace(roh_jahre=1, monat_jahre=1)
+    cli.verdichten_ausfuehren(args)
+
+    # gleicher Tag & Ort, aber andere Messung -> darf nicht verloren gehen
+    bestand_anlegen(stub, [eintrag("zweit", "2010-01-01", temperatur=3.0)])
+    cli.verdichten_ausfuehren(args)
+
+    assert [e["ID"] for e in remote(stub, main.GITHUB_JSON_PATH)] == ["zweit"]
+    assert [e["ID"] for e in remote(stub, main.archiv_pfad(2010))] == ["a"]